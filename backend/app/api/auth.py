@@ -9,12 +9,14 @@ from app.database import get_db
 from app.models.user import User, UserRole
 from app.models.league import League
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from app.core.dependencies import get_current_active_user
+from app.core.league_scope import invalidate_league_membership, load_league_membership
 
 router = APIRouter()
 
@@ -94,7 +96,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # 创建新用户
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     user_role = UserRole.PLAYER if user_data.role == "player" else UserRole.TEAM_ADMIN
     new_user = User(
         username=user_data.username,
@@ -129,7 +131,7 @@ async def login(
     """用户登录（支持选择league和角色）"""
     user = db.query(User).filter(User.username == login_data.username).first()
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -195,6 +197,11 @@ async def login(
             # 如果没有提供role，使用用户的默认role
             selected_role = user.role.value
     
+    # bcrypt 计算成本调整后，签发令牌前用新成本重新哈希密码（停用账户和无效的league/角色选择不会触发）
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(login_data.password)
+        db.commit()
+    
     # 创建访问令牌（包含选择的league_id和role）
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -203,7 +210,9 @@ async def login(
             "role": selected_role,  # 使用选择的角色
             "league_id": selected_league_id,  # 使用选择的league_id
             "user_id": user.id,
-            "original_role": user.role.value  # 保存原始角色
+            "original_role": user.role.value,  # 保存原始角色
+            "home_league_id": user.league_id,  # 主league_id（只读接口无需查询数据库）
+            "active": user.is_active
         },
         expires_delta=access_token_expires
     )
@@ -236,15 +245,7 @@ async def get_my_leagues(
         leagues = db.query(League).filter(League.is_active == True).all()
     else:
         # 普通用户：从多对多关系和主league_id获取
-        league_ids = set()
-        
-        # 从多对多关系获取
-        if current_user.leagues:
-            league_ids.update([league.id for league in current_user.leagues])
-        
-        # 从主league_id获取（向后兼容）
-        if current_user.league_id:
-            league_ids.add(current_user.league_id)
+        league_ids = load_league_membership(db, current_user)
         
         if not league_ids:
             return []
@@ -285,13 +286,8 @@ async def switch_league(
     
     # 检查用户是否有权限访问该league
     if current_user.role != UserRole.ADMIN:
-        # 检查多对多关系
-        has_access = league_id in [l.id for l in current_user.leagues]
-        # 检查主league_id（向后兼容）
-        if not has_access and current_user.league_id == league_id:
-            has_access = True
-        
-        if not has_access:
+        # 检查多对多关系和主league_id（向后兼容）
+        if league_id not in load_league_membership(db, current_user):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User does not have access to this league"
@@ -325,7 +321,9 @@ async def switch_league(
             "role": selected_role,
             "league_id": league_id,
             "user_id": current_user.id,
-            "original_role": current_user.role.value
+            "original_role": current_user.role.value,
+            "home_league_id": current_user.league_id,
+            "active": current_user.is_active
         },
         expires_delta=access_token_expires
     )
@@ -392,6 +390,7 @@ async def enroll_league(
         current_user.league_id = league_id
     
     db.commit()
+    invalidate_league_membership(current_user.id)
     db.refresh(current_user)
     
     return {"message": f"Successfully enrolled in league: {league.name}"}
@@ -432,6 +431,7 @@ async def unenroll_league(
             current_user.league_id = None
     
     db.commit()
+    invalidate_league_membership(current_user.id)
     
     return {"message": f"Successfully unenrolled from league: {league.name}"}
 
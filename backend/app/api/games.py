@@ -1,5 +1,6 @@
 """比赛API路由"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -7,7 +8,11 @@ from app.database import get_db
 from app.models.game import Game, GamePlayer, GameStatus, SeasonType
 from app.models.team import Team
 from app.models.user import User
-from app.core.dependencies import get_current_active_user, get_current_league_id, get_current_role
+from app.core.dependencies import get_current_active_user, get_current_league_id, get_current_role, get_league_scope, get_read_league_scope
+from app.core.league_scope import LeagueScope
+from app.core.pagination import keyset_paginate, set_next_cursor
+from app.services.purge import request_purge, soft_delete_games
+from app.services.standings import record_game_result, remove_game_results
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -43,43 +48,24 @@ class GameResponse(BaseModel):
 
 @router.get("/", response_model=List[GameResponse])
 async def get_games(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor 的值）"),
     season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
-    """获取比赛列表（只能看到自己league的比赛）"""
-    # 管理员可以看到所有比赛，普通用户只能看到自己league的比赛
-    query = db.query(Game)
-    
-    # 获取当前使用的league_id和role（优先使用token中的临时值）
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
+    """获取比赛列表（只能看到自己league的比赛）
     
-    if current_role != "admin":
-        # 如果用户切换了league（token中有_temp_league_id），只显示该league的数据
-        # 否则显示用户所有加入的league的数据
-        if current_league_id and hasattr(current_user, '_temp_league_id') and current_user._temp_league_id is not None:
-            # 用户切换了league，只显示当前选择的league
-            query = query.filter(Game.league_id == current_league_id)
-        else:
-            # 用户没有切换league，显示所有用户加入的league的数据
-            league_ids = set()
-            
-            # 从多对多关系获取
-            if current_user.leagues:
-                league_ids.update([league.id for league in current_user.leagues])
-            
-            # 从主league_id获取（向后兼容）
-            if current_user.league_id:
-                league_ids.add(current_user.league_id)
-            
-            if not league_ids:
-                return []  # 用户没有关联league，返回空列表
-            
-            # 过滤多个league
-            query = query.filter(Game.league_id.in_(list(league_ids)))
+    结果按 (日期, ID) 倒序；如果本页已满，响应头 X-Next-Cursor 给出下一页的游标。
+    """
+    # 管理员可以看到所有比赛，普通用户只能看到自己league的比赛
+    # 如果用户切换了league（token中有league_id），只显示该league的数据，
+    # 否则显示用户所有加入的league的数据
+    if not scope.is_admin and not scope.league_ids:
+        return []  # 用户没有关联league，返回空列表
+    query = scope.filter(db.query(Game), Game.league_id)
     
     # 按season_type筛选
     if season_type:
@@ -93,7 +79,8 @@ async def get_games(
         season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
         query = query.filter(Game.season_type == season_enum)
     
-    games = query.order_by(Game.date.desc()).offset(skip).limit(limit).all()
+    games = keyset_paginate(query, [Game.date, Game.id], cursor, limit, skip=skip, descending=True).all()
+    set_next_cursor(response, games, limit, lambda game: (game.date, game.id))
     return games
 
 
@@ -101,21 +88,11 @@ async def get_games(
 async def get_game(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取比赛详情"""
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
     # 权限检查：普通用户只能查看自己league的比赛
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限访问此比赛"
-        )
+    game = scope.require_game(game_id, detail="没有权限访问此比赛", current_league_only=True)
     
     return game
 
@@ -212,7 +189,7 @@ async def create_game(
 async def start_game(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """开始比赛（球队管理员和管理员）"""
     game = db.query(Game).filter(Game.id == game_id).first()
@@ -220,21 +197,19 @@ async def start_game(
         raise HTTPException(status_code=404, detail="比赛不存在")
     
     # 权限检查：球员不能操作比赛
-    current_role = get_current_role(current_user)
-    if current_role == "player":
+    if scope.role == "player":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="球员没有权限操作比赛"
         )
     
     # 权限检查：球队管理员和管理员只能操作自己league的比赛
-    current_league_id = get_current_league_id(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限操作此比赛"
-        )
+    scope.check(game.league_id, detail="没有权限操作此比赛", current_league_only=True)
+    scope.check_writable(game)
     
+    if game.status == GameStatus.FINISHED:
+        # 已结束的比赛重新开始，移除积分榜使用的最终比分
+        remove_game_results(db, [game.id])
     game.status = GameStatus.LIVE
     db.commit()
     return {"message": "比赛已开始", "status": game.status}
@@ -244,7 +219,7 @@ async def start_game(
 async def pause_game(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """暂停比赛（球队管理员和管理员）"""
     game = db.query(Game).filter(Game.id == game_id).first()
@@ -252,21 +227,19 @@ async def pause_game(
         raise HTTPException(status_code=404, detail="比赛不存在")
     
     # 权限检查：球员不能操作比赛
-    current_role = get_current_role(current_user)
-    if current_role == "player":
+    if scope.role == "player":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="球员没有权限操作比赛"
         )
     
     # 权限检查：球队管理员和管理员只能操作自己league的比赛
-    current_league_id = get_current_league_id(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限操作此比赛"
-        )
+    scope.check(game.league_id, detail="没有权限操作此比赛", current_league_only=True)
+    scope.check_writable(game)
     
+    if game.status == GameStatus.FINISHED:
+        # 已结束的比赛重新开始，移除积分榜使用的最终比分
+        remove_game_results(db, [game.id])
     game.status = GameStatus.PAUSED
     db.commit()
     return {"message": "比赛已暂停", "status": game.status}
@@ -276,7 +249,7 @@ async def pause_game(
 async def finish_game(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """结束比赛（球队管理员和管理员）"""
     game = db.query(Game).filter(Game.id == game_id).first()
@@ -284,22 +257,19 @@ async def finish_game(
         raise HTTPException(status_code=404, detail="比赛不存在")
     
     # 权限检查：球员不能操作比赛
-    current_role = get_current_role(current_user)
-    if current_role == "player":
+    if scope.role == "player":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="球员没有权限操作比赛"
         )
     
     # 权限检查：球队管理员和管理员只能操作自己league的比赛
-    current_league_id = get_current_league_id(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限操作此比赛"
-        )
+    scope.check(game.league_id, detail="没有权限操作此比赛", current_league_only=True)
+    scope.check_writable(game)
     
     game.status = GameStatus.FINISHED
+    # 写入最终比分（积分榜增量更新）
+    record_game_result(db, game)
     db.commit()
     return {"message": "比赛已结束", "status": game.status}
 
@@ -308,40 +278,24 @@ async def finish_game(
 async def delete_game(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
-    """删除比赛"""
-    from app.models.statistic import Statistic
-    from app.models.player_time import PlayerTime
-    
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
+    """删除比赛
+
+    只标记比赛已删除（所有查询立即排除），统计记录、出场时间等由后台清理任务分批删除。
+    """
     # 权限检查：普通用户只能删除自己league的比赛
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限删除此比赛"
-        )
-    
-    # 显式删除相关数据（确保数据同步）
-    # 删除统计数据
-    stats_count = db.query(Statistic).filter(Statistic.game_id == game_id).delete()
+    scope.require_game(game_id, detail="没有权限删除此比赛", current_league_only=True)
     
-    # 删除球员时间记录
-    player_times_count = db.query(PlayerTime).filter(PlayerTime.game_id == game_id).delete()
-    
-    # 删除比赛（GamePlayer会通过cascade自动删除）
-    db.delete(game)
+    # 标记删除并移除积分榜使用的比分
+    counts = soft_delete_games(db, [game_id])
     db.commit()
+    request_purge()
     
     return {
         "message": "比赛已删除",
-        "deleted_stats": stats_count,
-        "deleted_player_times": player_times_count
+        "deleted_stats": counts["statistics"],
+        "deleted_player_times": counts["player_times"]
     }
 
 
@@ -349,47 +303,26 @@ async def delete_game(
 async def batch_delete_games(
     game_ids: List[int],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
-    """批量删除比赛"""
-    from app.models.statistic import Statistic
-    from app.models.player_time import PlayerTime
-    
+    """批量删除比赛（一次标记所有比赛，记录由后台清理任务分批删除）"""
     games = db.query(Game).filter(Game.id.in_(game_ids)).all()
     if not games:
         raise HTTPException(status_code=404, detail="未找到要删除的比赛")
     
     # 权限检查：普通用户只能删除自己league的比赛
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin":
-        for game in games:
-            if game.league_id != current_league_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"没有权限删除比赛 {game.id}"
-                )
-    
-    total_stats_deleted = 0
-    total_player_times_deleted = 0
-    
     for game in games:
-        # 显式删除相关数据
-        stats_count = db.query(Statistic).filter(Statistic.game_id == game.id).delete()
-        player_times_count = db.query(PlayerTime).filter(PlayerTime.game_id == game.id).delete()
-        
-        total_stats_deleted += stats_count
-        total_player_times_deleted += player_times_count
-        
-        # 删除比赛（GamePlayer会通过cascade自动删除）
-        db.delete(game)
+        scope.check(game.league_id, detail=f"没有权限删除比赛 {game.id}", current_league_only=True)
     
+    # 标记删除并移除积分榜使用的比分
+    counts = soft_delete_games(db, [game.id for game in games])
     db.commit()
+    request_purge()
     
     return {
         "message": f"已删除 {len(games)} 场比赛",
-        "deleted_stats": total_stats_deleted,
-        "deleted_player_times": total_player_times_deleted
+        "deleted_stats": counts["statistics"],
+        "deleted_player_times": counts["player_times"]
     }
 
 
@@ -397,24 +330,14 @@ async def batch_delete_games(
 async def get_game_statistics_summary(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取比赛统计摘要（包括比分）"""
     from app.models.statistic import Statistic
     from app.models.player import Player
     
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
     # 权限检查：普通用户只能查看自己league的比赛统计
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限访问此比赛统计"
-        )
+    game = scope.require_game(game_id, detail="没有权限访问此比赛统计", current_league_only=True)
     
     # 获取所有统计数据
     stats = db.query(Statistic).filter(Statistic.game_id == game_id).all()
@@ -448,3 +371,61 @@ async def get_game_statistics_summary(
         "total_stats": len(stats)
     }
 
+
+@router.get("/{game_id}/timeline")
+async def get_game_timeline(
+    game_id: int,
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取比赛得分时间线（累计比分、领先变换、平局、最大领先、最大得分攻势）
+
+    points 中每项依次为 columns 对应的 [elapsed(秒), quarter, home, away, lead]，
+    lead 为主队比分减客队比分。
+    """
+    from app.services.timeline import get_game_timeline as build_timeline
+    
+    # 权限检查：普通用户只能查看自己league的比赛
+    game = scope.require_game(game_id, detail="没有权限访问此比赛数据", current_league_only=True)
+    
+    return build_timeline(db, game)
+
+
+@router.get("/{game_id}/report.pdf")
+async def get_game_report_pdf(
+    game_id: int,
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """下载比赛报告PDF（服务端矢量渲染，已结束比赛使用磁盘缓存）"""
+    from app.services.game_report import get_game_report_pdf as build_report_pdf
+    
+    # 权限检查：普通用户只能导出自己league的比赛报告
+    game = scope.require_game(game_id, detail="没有权限访问此比赛报告", current_league_only=True)
+    
+    content = await build_report_pdf(db, game)
+    return Response(
+        content=content,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="game_{game_id}_report.pdf"'}
+    )
+
+
+@router.get("/{game_id}/play-by-play.csv")
+async def export_game_play_by_play(
+    game_id: int,
+    excel: bool = Query(False, description="是否添加UTF-8 BOM（方便Excel直接打开）"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """流式导出比赛 play-by-play CSV（列布局与 batch_import_games.py 的输入一致）"""
+    from app.services.play_by_play import stream_game_csv
+    
+    # 权限检查：普通用户只能导出自己league的比赛
+    scope.require_game(game_id, detail="没有权限访问此比赛数据", current_league_only=True)
+    
+    return StreamingResponse(
+        stream_game_csv(game_id, bom=excel),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="game_{game_id}_play_by_play.csv"'}
+    )
@@ -0,0 +1,197 @@
+"""后台任务API路由（批量导出、数据库备份）"""
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from pathlib import Path
+from app.database import get_db
+from app.models.job import Job, JobStatus
+from app.models.user import User
+from app.core.dependencies import get_current_active_user, get_current_admin, get_current_role, get_league_scope
+from app.core.league_scope import LeagueScope
+from app.services.jobs import submit_job
+from pydantic import BaseModel
+
+router = APIRouter()
+
+
+class LeagueExportRequest(BaseModel):
+    """联赛批量导出请求模型"""
+    league_id: int
+    season_type: Optional[str] = None  # "regular" 或 "playoff"，为空表示全部
+    include_csv: bool = True
+    include_pdf: bool = True
+
+
+class DatabaseBackupRequest(BaseModel):
+    """数据库备份请求模型"""
+    incremental: bool = False  # True：只归档WAL新增帧（需要WAL模式）；False：完整备份
+
+
+class JobResponse(BaseModel):
+    """任务响应模型"""
+    id: int
+    job_type: str
+    status: str
+    league_id: Optional[int]
+    season_type: Optional[str]
+    include_csv: bool
+    include_pdf: bool
+    progress_current: int
+    progress_total: int
+    error: Optional[str]
+    download_ready: bool
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        job_type=job.job_type,
+        status=job.status.value,
+        league_id=job.league_id,
+        season_type=job.season_type,
+        include_csv=job.include_csv,
+        include_pdf=job.include_pdf,
+        progress_current=job.progress_current,
+        progress_total=job.progress_total,
+        error=job.error,
+        download_ready=job.status == JobStatus.FINISHED and bool(job.result_path),
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+
+def _get_own_job(db: Session, job_id: int, current_user: User) -> Job:
+    """获取任务（只能访问自己创建的任务，管理员可以访问全部）"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    if get_current_role(current_user) != "admin" and job.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="没有权限访问此任务"
+        )
+    return job
+
+
+@router.post("/league-export", response_model=JobResponse)
+async def create_league_export(
+    request: LeagueExportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    scope: LeagueScope = Depends(get_league_scope)
+):
+    """创建联赛批量导出任务（play-by-play CSV + 比赛报告PDF，打包为zip）"""
+    # 权限检查：普通用户只能导出自己league的数据
+    scope.require_league(request.league_id, detail="没有权限导出此联赛数据")
+
+    if request.season_type and request.season_type not in ["regular", "playoff"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="season_type 必须是 'regular' 或 'playoff'"
+        )
+    if not request.include_csv and not request.include_pdf:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="至少需要导出CSV或PDF中的一种"
+        )
+
+    job = Job(
+        job_type="league_export",
+        status=JobStatus.PENDING,
+        created_by=current_user.id,
+        league_id=request.league_id,
+        season_type=request.season_type,
+        include_csv=request.include_csv,
+        include_pdf=request.include_pdf,
+        worker_pid=os.getpid()  # 任务在本进程的线程池中执行
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    submit_job(job.id)
+    return _job_response(job)
+
+
+@router.post("/database-backup", response_model=JobResponse)
+async def create_database_backup(
+    request: DatabaseBackupRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """创建数据库在线备份任务（比赛进行中也可执行，完成后可下载完整备份）"""
+    job = Job(
+        job_type="wal_backup" if request.incremental else "database_backup",
+        status=JobStatus.PENDING,
+        created_by=current_user.id,
+        worker_pid=os.getpid()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    submit_job(job.id)
+    return _job_response(job)
+
+
+@router.get("/database-backups")
+async def get_database_backups(
+    current_user: User = Depends(get_current_admin)
+):
+    """已有的完整备份和WAL归档状态"""
+    from app.services.backup import list_backups
+
+    return list_backups()
+
+
+@router.get("/", response_model=List[JobResponse])
+async def get_jobs(
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取任务列表（管理员可以看到所有任务）"""
+    query = db.query(Job)
+    if get_current_role(current_user) != "admin":
+        query = query.filter(Job.created_by == current_user.id)
+    jobs = query.order_by(Job.id.desc()).limit(limit).all()
+    return [_job_response(job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """获取任务状态和进度"""
+    return _job_response(_get_own_job(db, job_id, current_user))
+
+
+@router.get("/{job_id}/download")
+async def download_job_result(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """下载任务结果文件"""
+    job = _get_own_job(db, job_id, current_user)
+    if job.status != JobStatus.FINISHED or not job.result_path:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="任务尚未完成"
+        )
+
+    path = Path(job.result_path)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="导出文件已被清理，请重新创建任务")
+
+    media_type = "application/zip" if path.suffix == ".zip" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=path.name)
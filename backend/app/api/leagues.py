@@ -1,13 +1,16 @@
 """联赛API路由"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, field_serializer
 from typing import List, Optional
 from datetime import datetime
 from app.database import get_db
 from app.models.league import League
+from app.models.game import SeasonType
 from app.models.user import User
-from app.core.dependencies import get_current_active_user, get_current_admin, get_current_league_id, get_current_role
+from app.core.dependencies import get_current_admin, get_read_league_scope
+from app.core.league_scope import LeagueScope, invalidate_league_membership, load_league_membership
 
 router = APIRouter()
 
@@ -83,26 +86,14 @@ async def get_public_leagues(db: Session = Depends(get_db)):
 @router.get("/", response_model=List[LeagueResponse])
 async def get_leagues(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取联赛列表"""
-    # 管理员可以看到所有联赛，其他用户只能看到自己的联赛
-    current_role = get_current_role(current_user)
-    
-    if current_role == "admin":
+    # 管理员可以看到所有联赛，其他用户只能看到自己加入的联赛
+    if scope.is_admin:
         leagues = db.query(League).all()
     else:
-        # 获取用户可访问的所有league IDs
-        league_ids = set()
-        
-        # 从多对多关系获取
-        if current_user.leagues:
-            league_ids.update([league.id for league in current_user.leagues])
-        
-        # 从主league_id获取（向后兼容）
-        if current_user.league_id:
-            league_ids.add(current_user.league_id)
-        
+        league_ids = load_league_membership(db, scope.user)
         if league_ids:
             leagues = db.query(League).filter(League.id.in_(list(league_ids))).all()
         else:
@@ -115,41 +106,11 @@ async def get_leagues(
 async def get_league(
     league_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取联赛详情"""
-    league = db.query(League).filter(League.id == league_id).first()
-    if not league:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="League not found"
-        )
-    
     # 权限检查：管理员可以查看所有联赛，普通用户只能查看自己的联赛
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    
-    if current_role != "admin":
-        # 如果用户切换了league，检查是否匹配
-        if current_league_id and hasattr(current_user, '_temp_league_id') and current_user._temp_league_id is not None:
-            if league_id != current_league_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not enough permissions"
-                )
-        else:
-            # 用户没有切换league，检查是否在用户的所有league中
-            league_ids = set()
-            if current_user.leagues:
-                league_ids.update([league.id for league in current_user.leagues])
-            if current_user.league_id:
-                league_ids.add(current_user.league_id)
-            
-            if league_id not in league_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not enough permissions"
-                )
+    league = scope.require_league(league_id)
     
     return league
 
@@ -214,6 +175,62 @@ async def delete_league(
     
     db.delete(league)
     db.commit()
+    invalidate_league_membership()
     
     return {"message": "League deleted successfully"}
 
+
+@router.get("/{league_id}/standings")
+async def get_league_standings(
+    league_id: int,
+    season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取联赛积分榜：胜负、胜率、得失分、净胜分、连胜连败，按胜率和相互战绩排名"""
+    from app.services.standings import get_standings
+    
+    # 权限检查：普通用户只能查看自己league的积分榜
+    scope.require_league(league_id)
+    
+    season_enum = None
+    if season_type:
+        if season_type not in ["regular", "playoff"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="season_type 必须是 'regular' 或 'playoff'"
+            )
+        season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
+    
+    return get_standings(db, league_id, season_enum)
+
+
+@router.get("/{league_id}/play-by-play.csv")
+async def export_league_play_by_play(
+    league_id: int,
+    season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
+    excel: bool = Query(False, description="是否添加UTF-8 BOM（方便Excel直接打开）"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """流式导出联赛所有已结束比赛的 play-by-play CSV（服务端游标逐批读取，内存占用恒定）"""
+    from app.services.play_by_play import stream_league_csv
+    
+    # 权限检查：管理员可以导出所有联赛，普通用户只能导出自己的联赛
+    scope.require_league(league_id)
+    
+    season_enum = None
+    if season_type:
+        if season_type not in ["regular", "playoff"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="season_type 必须是 'regular' 或 'playoff'"
+            )
+        season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
+    
+    filename = f"league_{league_id}_{season_type or 'all'}_play_by_play.csv"
+    return StreamingResponse(
+        stream_league_csv(league_id, season_enum, bom=excel),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,63 @@
+"""运行指标API路由（SQL查询统计、请求分析结果，仅管理员）"""
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.models.user import User
+from app.core.dependencies import get_current_admin
+
+router = APIRouter()
+
+
+@router.get("/sql")
+async def get_sql_metrics(
+    current_user: User = Depends(get_current_admin)
+):
+    """各路由最近请求的耗时分布、SQL查询次数、重复最多的语句和全局最慢语句"""
+    from app.core.config import settings
+    from app.core.query_metrics import registry
+
+    return {"enabled": settings.SQL_METRICS_ENABLED, **registry.snapshot()}
+
+
+@router.delete("/sql")
+async def reset_sql_metrics(
+    current_user: User = Depends(get_current_admin)
+):
+    """清空SQL查询统计"""
+    from app.core.query_metrics import registry
+
+    registry.reset()
+    return {"message": "SQL查询统计已清空"}
+
+
+@router.get("/profiles")
+async def list_request_profiles(
+    current_user: User = Depends(get_current_admin)
+):
+    """已保存的请求分析结果（请求时携带 X-Profile: 1 请求头生成）"""
+    from app.core.profiling import list_profiles
+
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+async def download_request_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin)
+):
+    """下载 collapsed stack 格式的分析结果（可用 flamegraph.pl 或 speedscope 打开）"""
+    from app.core.profiling import profile_path
+
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="分析结果不存在")
+    return FileResponse(path, media_type="text/plain", filename=f"profile_{profile_id}.collapsed")
+
+
+@router.delete("/profiles")
+async def clear_request_profiles(
+    current_user: User = Depends(get_current_admin)
+):
+    """删除全部请求分析结果"""
+    from app.core.profiling import clear_profiles
+
+    return {"message": "请求分析结果已删除", "deleted": clear_profiles()}
@@ -1,14 +1,15 @@
 """球员出场时间API路由"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 from app.database import get_db
 from app.models.player_time import PlayerTime
-from app.models.game import Game
 from app.models.player import Player
-from app.models.user import User
-from app.core.dependencies import get_current_active_user, get_current_league_id, get_current_role
+from app.core.dependencies import get_league_scope, get_read_league_scope
+from app.core.league_scope import LeagueScope
+from app.core.prometheus import PLAYER_TIME_EVENTS
+from app.services.game_data import bump_stats_version
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -43,22 +44,13 @@ async def player_enter(
     player_id: int,
     quarter: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """记录球员上场"""
     # 验证比赛和球员
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
     # 权限检查：普通用户只能在自己league的比赛中操作
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限操作此比赛"
-        )
+    game = scope.require_game(game_id, detail="没有权限操作此比赛", current_league_only=True)
+    scope.check_writable(game)
     
     player = db.query(Player).filter(Player.id == player_id).first()
     if not player:
@@ -82,8 +74,10 @@ async def player_enter(
         enter_time=datetime.now()
     )
     db.add(player_time)
+    bump_stats_version(db, game_id)
     db.commit()
     db.refresh(player_time)
+    PLAYER_TIME_EVENTS.inc(event="enter")
     return player_time
 
 
@@ -92,22 +86,13 @@ async def player_exit(
     game_id: int,
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """记录球员下场"""
     # 验证比赛权限
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
     # 权限检查：普通用户只能在自己league的比赛中操作
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin" and game.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限操作此比赛"
-        )
+    game = scope.require_game(game_id, detail="没有权限操作此比赛", current_league_only=True)
+    scope.check_writable(game)
     
     # 查找未结束的上场记录
     player_time = db.query(PlayerTime).filter(
@@ -125,9 +110,11 @@ async def player_exit(
     
     player_time.exit_time = exit_time
     player_time.duration_seconds = duration
+    bump_stats_version(db, game_id)
     
     db.commit()
     db.refresh(player_time)
+    PLAYER_TIME_EVENTS.inc(event="exit")
     return player_time
 
 
@@ -136,20 +123,11 @@ async def get_player_time(
     game_id: int,
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取球员在比赛中的出场时间记录"""
-    # 验证比赛权限
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
-    # 权限检查：普通用户只能查看自己league的比赛数据
-    if current_user.role.value != "admin" and game.league_id != current_user.league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限访问此比赛数据"
-        )
+    # 验证比赛权限：普通用户只能查看自己league的比赛数据
+    scope.require_game(game_id, detail="没有权限访问此比赛数据", current_league_only=True)
     
     times = db.query(PlayerTime).filter(
         PlayerTime.game_id == game_id,
@@ -162,23 +140,14 @@ async def get_player_time(
 async def get_all_players_time(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取比赛中所有球员的总出场时间和上场状态"""
     from sqlalchemy import func as sql_func
     from datetime import datetime
     
-    # 验证比赛权限
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
-    # 权限检查：普通用户只能查看自己league的比赛数据
-    if current_user.role.value != "admin" and game.league_id != current_user.league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限访问此比赛数据"
-        )
+    # 验证比赛权限：普通用户只能查看自己league的比赛数据
+    scope.require_game(game_id, detail="没有权限访问此比赛数据", current_league_only=True)
     
     # 查询所有出场时间记录
     times = db.query(
@@ -1,12 +1,13 @@
 """球员API路由"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from app.database import get_db
 from app.models.player import Player
 from app.models.team import Team
 from app.models.user import User
-from app.core.dependencies import get_current_active_user, get_current_league_id, get_current_role
+from app.core.dependencies import get_current_active_user, get_league_scope, get_read_league_scope
+from app.core.league_scope import LeagueScope
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -40,22 +41,11 @@ class PlayerResponse(BaseModel):
 async def get_team_players(
     team_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取球队的所有球员，按display_order排序"""
-    # 先检查球队是否存在和权限
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
-        raise HTTPException(status_code=404, detail="球队不存在")
-    
-    # 权限检查：普通用户只能查看自己league的球队的球员
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin" and team.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限访问此球队的球员"
-        )
+    # 先检查球队是否存在和权限：普通用户只能查看自己league的球队的球员
+    scope.require_team(team_id, detail="没有权限访问此球队的球员", current_league_only=True)
     
     players = db.query(Player).filter(Player.team_id == team_id).order_by(Player.display_order.asc(), Player.number.asc()).all()
     return players
@@ -65,7 +55,7 @@ async def get_team_players(
 async def get_player(
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取球员详情"""
     player = db.query(Player).filter(Player.id == player_id).first()
@@ -78,44 +68,102 @@ async def get_player(
         raise HTTPException(status_code=404, detail="球员所属球队不存在")
     
     # 权限检查：普通用户只能查看自己league的球员
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    if current_role != "admin" and team.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限访问此球员"
-        )
+    scope.check(team.league_id, detail="没有权限访问此球员", current_league_only=True)
     
     return player
 
 
+@router.get("/{player_id}/profile")
+async def get_player_profile(
+    player_id: int,
+    season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
+    include_shots: bool = Query(False, description="是否返回投篮点位（投篮热区图）"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取球员赛季档案：赛季总计、场均、逐场数据、分项命中率和单场最高（只统计已结束的比赛）"""
+    from app.models.game import SeasonType
+    from app.services.player_profile import compute_player_profile, player_shots
+    
+    player = db.query(Player).filter(Player.id == player_id).first()
+    if not player:
+        raise HTTPException(status_code=404, detail="球员不存在")
+    
+    team = db.query(Team).filter(Team.id == player.team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="球员所属球队不存在")
+    
+    # 权限检查：普通用户只能查看自己league的球员统计
+    scope.check(team.league_id, detail="没有权限访问此球员统计")
+    
+    season_enum = None
+    if season_type:
+        if season_type not in ["regular", "playoff"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="season_type 必须是 'regular' 或 'playoff'"
+            )
+        season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
+    
+    profile = compute_player_profile(db, player, season_enum)
+    if include_shots:
+        # 投篮坐标只在原始记录中，已归档赛季需要读取归档数据库
+        scope.include_archive(team.league_id)
+        profile["shots"] = player_shots(db, player, season_enum)
+    return profile
+
+
+@router.get("/{player_id}/opponents")
+async def get_player_opponent_splits(
+    player_id: int,
+    season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取球员对阵每个对手的数据（场数、战绩、总计和场均，只统计已结束的比赛）"""
+    from app.models.game import SeasonType
+    from app.services.matchups import get_player_opponent_splits as player_opponent_splits
+    
+    player = db.query(Player).filter(Player.id == player_id).first()
+    if not player:
+        raise HTTPException(status_code=404, detail="球员不存在")
+    
+    team = db.query(Team).filter(Team.id == player.team_id).first()
+    if not team:
+        raise HTTPException(status_code=404, detail="球员所属球队不存在")
+    
+    # 权限检查：普通用户只能查看自己league的球员统计
+    scope.check(team.league_id, detail="没有权限访问此球员统计")
+    scope.include_archive(team.league_id)
+    
+    season_enum = None
+    if season_type:
+        if season_type not in ["regular", "playoff"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="season_type 必须是 'regular' 或 'playoff'"
+            )
+        season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
+    
+    return player_opponent_splits(db, player, team.league_id, season_enum)
+
+
 @router.post("/", response_model=PlayerResponse)
 async def create_player(
     player: PlayerCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """创建球员（球队管理员和管理员）"""
     # 权限检查：球员不能创建球员
-    current_role = get_current_role(current_user)
-    if current_role == "player":
+    if scope.role == "player":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="球员没有权限创建球员"
         )
     
-    # 验证球队是否存在
-    team = db.query(Team).filter(Team.id == player.team_id).first()
-    if not team:
-        raise HTTPException(status_code=404, detail="球队不存在")
-    
-    # 权限检查：球队管理员和管理员只能在自己league的球队中创建球员
-    current_league_id = get_current_league_id(current_user)
-    if current_role != "admin" and team.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限在此球队创建球员"
-        )
+    # 验证球队是否存在；球队管理员和管理员只能在自己league的球队中创建球员
+    scope.require_team(player.team_id, detail="没有权限在此球队创建球员", current_league_only=True)
     
     # 检查同一球队中是否已有相同号码的球员
     existing_player = db.query(Player).filter(
@@ -203,7 +251,7 @@ async def update_player(
 async def delete_player(
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """删除球员（球队管理员和管理员）"""
     db_player = db.query(Player).filter(Player.id == player_id).first()
@@ -211,25 +259,19 @@ async def delete_player(
         raise HTTPException(status_code=404, detail="球员不存在")
     
     # 权限检查：球员不能删除球员
-    current_role = get_current_role(current_user)
-    if current_role == "player":
+    if scope.role == "player":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="球员没有权限删除球员"
         )
     
     # 通过球队检查权限
-    current_league_id = get_current_league_id(current_user)
     team = db.query(Team).filter(Team.id == db_player.team_id).first()
     if not team:
         raise HTTPException(status_code=404, detail="球员所属球队不存在")
     
     # 权限检查：球队管理员和管理员只能删除自己league的球员
-    if current_role != "admin" and team.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限删除此球员"
-        )
+    scope.check(team.league_id, detail="没有权限删除此球员", current_league_only=True)
     
     db.delete(db_player)
     db.commit()
@@ -241,29 +283,18 @@ async def update_player_order(
     team_id: int,
     player_orders: List[Dict[str, Any]],
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """批量更新球员顺序（球队管理员和管理员）"""
     # 权限检查：球员不能修改球员顺序
-    current_role = get_current_role(current_user)
-    if current_role == "player":
+    if scope.role == "player":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="球员没有权限修改球员顺序"
         )
     
-    # 检查球队权限
-    current_league_id = get_current_league_id(current_user)
-    team = db.query(Team).filter(Team.id == team_id).first()
-    if not team:
-        raise HTTPException(status_code=404, detail="球队不存在")
-    
-    # 权限检查：球队管理员和管理员只能修改自己league的球队的球员顺序
-    if current_role != "admin" and team.league_id != current_league_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="没有权限修改此球队的球员顺序"
-        )
+    # 检查球队权限：球队管理员和管理员只能修改自己league的球队的球员顺序
+    scope.require_team(team_id, detail="没有权限修改此球队的球员顺序", current_league_only=True)
     
     for order_data in player_orders:
         player_id = order_data.get("player_id")
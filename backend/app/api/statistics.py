@@ -4,10 +4,13 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.models.statistic import Statistic
-from app.models.game import Game, SeasonType
+from app.models.game import Game, GameStatus, SeasonType
 from app.models.player import Player
 from app.models.user import User
-from app.core.dependencies import get_current_active_user, get_current_league_id, get_current_role
+from app.core.dependencies import get_current_active_user, get_league_scope, get_read_league_scope
+from app.core.league_scope import LeagueScope
+from app.core.prometheus import STATISTICS_RECORDED
+from app.services.game_data import bump_stats_version
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -47,39 +50,12 @@ class StatisticResponse(BaseModel):
 async def create_statistic(
     statistic: StatisticCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_league_scope)
 ):
     """记录统计数据"""
-    # 验证比赛是否存在
-    game = db.query(Game).filter(Game.id == statistic.game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
     # 权限检查：普通用户只能在自己league的比赛中记录统计
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    
-    if current_role != "admin":
-        # 如果用户切换了league，检查是否匹配
-        if current_league_id and hasattr(current_user, '_temp_league_id') and current_user._temp_league_id is not None:
-            if game.league_id != current_league_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限在此比赛中记录统计"
-                )
-        else:
-            # 用户没有切换league，检查是否在用户的所有league中
-            league_ids = set()
-            if current_user.leagues:
-                league_ids.update([league.id for league in current_user.leagues])
-            if current_user.league_id:
-                league_ids.add(current_user.league_id)
-            
-            if game.league_id not in league_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限在此比赛中记录统计"
-                )
+    game = scope.require_game(statistic.game_id, detail="没有权限在此比赛中记录统计")
+    scope.check_writable(game)
     
     # 验证球员是否存在
     player = db.query(Player).filter(Player.id == statistic.player_id).first()
@@ -94,8 +70,15 @@ async def create_statistic(
     # 创建统计数据
     db_statistic = Statistic(**statistic.model_dump())
     db.add(db_statistic)
+    bump_stats_version(db, game.id)
+    if game.status == GameStatus.FINISHED:
+        # 已结束比赛补录统计，更新积分榜使用的最终比分
+        from app.services.standings import record_game_result
+        db.flush()
+        record_game_result(db, game)
     db.commit()
     db.refresh(db_statistic)
+    STATISTICS_RECORDED.inc(action_type=db_statistic.action_type)
     return db_statistic
 
 
@@ -103,83 +86,41 @@ async def create_statistic(
 async def get_game_statistics(
     game_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取比赛的所有统计数据"""
-    # 验证比赛是否存在
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
     # 权限检查：普通用户只能查看自己league的比赛统计
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    
-    if current_role != "admin":
-        # 如果用户切换了league，检查是否匹配
-        if current_league_id and hasattr(current_user, '_temp_league_id') and current_user._temp_league_id is not None:
-            # 用户切换了league，只允许访问当前选择的league
-            if game.league_id != current_league_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限访问此比赛统计"
-                )
-        else:
-            # 用户没有切换league，检查是否在用户的所有league中
-            league_ids = set()
-            if current_user.leagues:
-                league_ids.update([league.id for league in current_user.leagues])
-            if current_user.league_id:
-                league_ids.add(current_user.league_id)
-            
-            if game.league_id not in league_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限访问此比赛统计"
-                )
+    scope.require_game(game_id, detail="没有权限访问此比赛统计")
     
     statistics = db.query(Statistic).filter(Statistic.game_id == game_id).all()
     return statistics
 
 
+@router.get("/game/{game_id}/quarters")
+async def get_game_quarter_splits(
+    game_id: int,
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取比赛的分节技术统计（球队和球员每节的得分、投篮、篮板、失误等）"""
+    from app.services.quarter_splits import game_quarter_splits
+    
+    # 权限检查：普通用户只能查看自己league的比赛统计
+    game = scope.require_game(game_id, detail="没有权限访问此比赛统计")
+    
+    return game_quarter_splits(db, game)
+
+
 @router.get("/game/{game_id}/player/{player_id}", response_model=List[StatisticResponse])
 async def get_player_statistics(
     game_id: int,
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取球员在比赛中的统计数据"""
-    # 验证比赛是否存在
-    game = db.query(Game).filter(Game.id == game_id).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="比赛不存在")
-    
     # 权限检查：普通用户只能查看自己league的比赛统计
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    
-    if current_role != "admin":
-        # 如果用户切换了league，检查是否匹配
-        if current_league_id and hasattr(current_user, '_temp_league_id') and current_user._temp_league_id is not None:
-            if game.league_id != current_league_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限访问此比赛统计"
-                )
-        else:
-            # 用户没有切换league，检查是否在用户的所有league中
-            league_ids = set()
-            if current_user.leagues:
-                league_ids.update([league.id for league in current_user.leagues])
-            if current_user.league_id:
-                league_ids.add(current_user.league_id)
-            
-            if game.league_id not in league_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限访问此比赛统计"
-                )
+    scope.require_game(game_id, detail="没有权限访问此比赛统计")
     
     statistics = db.query(Statistic).filter(
         Statistic.game_id == game_id,
@@ -193,34 +134,12 @@ async def get_league_statistics(
     league_id: int,
     season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    scope: LeagueScope = Depends(get_read_league_scope)
 ):
     """获取联赛的所有统计数据（支持按season_type筛选）"""
     # 权限检查：普通用户只能查看自己league的统计
-    current_league_id = get_current_league_id(current_user)
-    current_role = get_current_role(current_user)
-    
-    if current_role != "admin":
-        # 如果用户切换了league，只允许访问当前选择的league
-        if current_league_id and hasattr(current_user, '_temp_league_id') and current_user._temp_league_id is not None:
-            if league_id != current_league_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限访问此联赛统计"
-                )
-        else:
-            # 用户没有切换league，检查是否在用户的所有league中
-            league_ids = set()
-            if current_user.leagues:
-                league_ids.update([league.id for league in current_user.leagues])
-            if current_user.league_id:
-                league_ids.add(current_user.league_id)
-            
-            if league_id not in league_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有权限访问此联赛统计"
-                )
+    scope.check(league_id, detail="没有权限访问此联赛统计")
+    scope.include_archive(league_id)
     
     # 构建查询：通过Game关联查询
     query = db.query(Statistic).join(Game).filter(Game.league_id == league_id)
@@ -240,6 +159,96 @@ async def get_league_statistics(
     return statistics
 
 
+@router.get("/league/{league_id}/quarters")
+async def get_league_quarter_splits(
+    league_id: int,
+    season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取联赛的分节技术统计（各队、各球员每节累计数据，支持按season_type筛选）"""
+    from app.services.quarter_splits import league_quarter_splits
+    
+    # 权限检查：普通用户只能查看自己league的统计
+    scope.check(league_id, detail="没有权限访问此联赛统计")
+    scope.include_archive(league_id)
+    
+    season_enum = None
+    if season_type:
+        if season_type not in ["regular", "playoff"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="season_type 必须是 'regular' 或 'playoff'"
+            )
+        season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
+    
+    return league_quarter_splits(db, league_id, season_enum)
+
+
+@router.get("/league/{league_id}/head-to-head")
+async def get_league_head_to_head(
+    league_id: int,
+    season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取联赛内各队两两交锋记录（胜负、得失分，支持按season_type筛选）"""
+    from app.services.matchups import get_league_head_to_head as league_head_to_head
+    
+    # 权限检查：普通用户只能查看自己league的统计
+    scope.check(league_id, detail="没有权限访问此联赛统计")
+    scope.include_archive(league_id)
+    
+    season_enum = None
+    if season_type:
+        if season_type not in ["regular", "playoff"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="season_type 必须是 'regular' 或 'playoff'"
+            )
+        season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
+    
+    return league_head_to_head(db, league_id, season_enum)
+
+
+@router.get("/head-to-head/{team_a_id}/{team_b_id}")
+async def get_team_head_to_head(
+    team_a_id: int,
+    team_b_id: int,
+    season_type: Optional[str] = Query(None, description="赛季类型: regular 或 playoff"),
+    db: Session = Depends(get_db),
+    scope: LeagueScope = Depends(get_read_league_scope)
+):
+    """获取两队交锋详情：每场比分、交锋战绩、双方及球员在交锋中的累计数据"""
+    from app.services.matchups import get_team_matchup
+    
+    if team_a_id == team_b_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="不能选择同一支球队"
+        )
+    
+    # 权限检查：两支球队都必须可访问
+    team_a = scope.require_team(team_a_id, detail="没有权限访问此球队统计")
+    team_b = scope.require_team(team_b_id, detail="没有权限访问此球队统计")
+    if team_a.league_id != team_b.league_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="两支球队不在同一联赛"
+        )
+    
+    season_enum = None
+    if season_type:
+        if season_type not in ["regular", "playoff"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="season_type 必须是 'regular' 或 'playoff'"
+            )
+        season_enum = SeasonType.REGULAR if season_type == "regular" else SeasonType.PLAYOFF
+    
+    return get_team_matchup(db, team_a.league_id, team_a, team_b, season_enum)
+
+
 @router.get("/player/{player_id}", response_model=List[StatisticResponse])
 async def get_player_all_statistics(
     player_id: int,
@@ -279,6 +288,10 @@ async def get_player_all_statistics(
                 detail="没有权限访问此球员统计"
             )
     
+    # 已归档赛季的统计记录在归档数据库中
+    from app.services.archive import include_archive
+    include_archive(db, team.league_id)
+    
     # 获取球员参与的所有比赛
     games_query = db.query(Game).filter(
         ((Game.home_team_id == team.id) | (Game.away_team_id == team.id)),
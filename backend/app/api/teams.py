@@ -1,12 +1,13 @@
 """球队API路由"""
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.database import get_db
 from app.models.team import Team
 from app.models.user import User
 from app.models.league import League
 from app.core.dependencies import get_current_active_user, get_current_admin
+from app.core.pagination import keyset_paginate, set_next_cursor
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -33,16 +34,45 @@ class TeamResponse(BaseModel):
         from_attributes = True
 
 
+def _team_query(db: Session):
+    """球队查询（外连接领队用户，一次查询同时取出领队用户名，避免逐个球队查询User）"""
+    return db.query(Team, User.username).outerjoin(User, User.id == Team.team_admin_id)
+
+
+def _team_response(team: Team, team_admin_name: Optional[str]) -> TeamResponse:
+    return TeamResponse(
+        id=team.id,
+        name=team.name,
+        logo=team.logo,
+        league_id=team.league_id,
+        team_admin_id=team.team_admin_id,
+        team_admin_name=team_admin_name
+    )
+
+
+def _get_team_with_admin(db: Session, team_id: int) -> Tuple[Optional[Team], Optional[str]]:
+    """获取球队及其领队用户名，球队不存在时返回 (None, None)"""
+    row = _team_query(db).filter(Team.id == team_id).first()
+    if row is None:
+        return None, None
+    return row[0], row[1]
+
+
 @router.get("/", response_model=List[TeamResponse])
 async def get_teams(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor 的值）"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """获取球队列表（只能看到自己league的球队）"""
+    """获取球队列表（只能看到自己league的球队）
+    
+    结果按 (名称, ID) 排序；如果本页已满，响应头 X-Next-Cursor 给出下一页的游标。
+    """
     # 管理员可以看到所有球队，普通用户只能看到自己league的球队
-    query = db.query(Team)
+    query = _team_query(db)
     
     # 获取当前使用的league_id（优先使用token中的临时值）
     current_league_id = getattr(current_user, '_temp_league_id', None) or current_user.league_id
@@ -53,24 +83,9 @@ async def get_teams(
             return []  # 用户没有关联league，返回空列表
         query = query.filter(Team.league_id == current_league_id)
     
-    teams = query.offset(skip).limit(limit).all()
-    # 转换为TeamResponse格式
-    team_responses = []
-    for team in teams:
-        team_admin_name = None
-        if team.team_admin_id:
-            team_admin = db.query(User).filter(User.id == team.team_admin_id).first()
-            if team_admin:
-                team_admin_name = team_admin.username
-        team_responses.append(TeamResponse(
-            id=team.id,
-            name=team.name,
-            logo=team.logo,
-            league_id=team.league_id,
-            team_admin_id=team.team_admin_id,
-            team_admin_name=team_admin_name
-        ))
-    return team_responses
+    rows = keyset_paginate(query, [Team.name, Team.id], cursor, limit, skip=skip).all()
+    set_next_cursor(response, rows, limit, lambda row: (row[0].name, row[0].id))
+    return [_team_response(team, team_admin_name) for team, team_admin_name in rows]
 
 
 @router.get("/{team_id}", response_model=TeamResponse)
@@ -80,7 +95,7 @@ async def get_team(
     current_user: User = Depends(get_current_active_user)
 ):
     """获取球队详情"""
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team, team_admin_name = _get_team_with_admin(db, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="球队不存在")
     
@@ -103,21 +118,7 @@ async def get_team(
                 detail="没有权限访问此球队"
             )
     
-    # 添加领队信息
-    team_admin_name = None
-    if team.team_admin_id:
-        team_admin = db.query(User).filter(User.id == team.team_admin_id).first()
-        if team_admin:
-            team_admin_name = team_admin.username
-    
-    return TeamResponse(
-        id=team.id,
-        name=team.name,
-        logo=team.logo,
-        league_id=team.league_id,
-        team_admin_id=team.team_admin_id,
-        team_admin_name=team_admin_name
-    )
+    return _team_response(team, team_admin_name)
 
 
 @router.post("/", response_model=TeamResponse)
@@ -264,23 +265,10 @@ async def update_team(
         pass
     
     db.commit()
-    db.refresh(db_team)
-    
-    # 返回响应
-    team_admin_name = None
-    if db_team.team_admin_id:
-        team_admin = db.query(User).filter(User.id == db_team.team_admin_id).first()
-        if team_admin:
-            team_admin_name = team_admin.username
     
-    return TeamResponse(
-        id=db_team.id,
-        name=db_team.name,
-        logo=db_team.logo,
-        league_id=db_team.league_id,
-        team_admin_id=db_team.team_admin_id,
-        team_admin_name=team_admin_name
-    )
+    # 返回响应（重新查询，同时取出领队用户名）
+    db_team, team_admin_name = _get_team_with_admin(db, team_id)
+    return _team_response(db_team, team_admin_name)
 
 
 @router.get("/{team_id}/related-games")
@@ -329,13 +317,14 @@ async def delete_team(
 ):
     """删除球队（球队管理员和管理员）
     
+    只标记球队、球员（和级联删除的比赛）已删除，记录由后台清理任务分批删除。
+    
     Args:
         team_id: 球队ID
         cascade_delete_games: 是否级联删除相关比赛，默认为False
     """
     from app.models.game import Game
-    from app.models.statistic import Statistic
-    from app.models.player_time import PlayerTime
+    from app.services.purge import request_purge, soft_delete_games, soft_delete_team
     
     db_team = db.query(Team).filter(Team.id == team_id).first()
     if not db_team:
@@ -356,40 +345,30 @@ async def delete_team(
         )
     
     # 检查是否有相关比赛
-    related_games = db.query(Game).filter(
-        (Game.home_team_id == team_id) | (Game.away_team_id == team_id)
-    ).all()
+    related_game_ids = [
+        row[0] for row in db.query(Game.id).filter(
+            (Game.home_team_id == team_id) | (Game.away_team_id == team_id)
+        ).all()
+    ]
     
-    if len(related_games) > 0:
-        if not cascade_delete_games:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"无法删除球队：该球队还有 {len(related_games)} 场相关比赛。请先删除相关比赛后再删除球队，或使用 cascade_delete_games=true 参数级联删除。"
-            )
-        else:
-            # 级联删除相关比赛及其数据
-            game_ids = [game.id for game in related_games]
-            
-            # 删除所有相关比赛的统计数据
-            stats_count = db.query(Statistic).filter(Statistic.game_id.in_(game_ids)).delete(synchronize_session=False)
-            
-            # 删除所有相关比赛的球员时间记录
-            player_times_count = db.query(PlayerTime).filter(PlayerTime.game_id.in_(game_ids)).delete(synchronize_session=False)
-            
-            # 删除所有相关比赛
-            for game in related_games:
-                db.delete(game)
+    if related_game_ids and not cascade_delete_games:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法删除球队：该球队还有 {len(related_game_ids)} 场相关比赛。请先删除相关比赛后再删除球队，或使用 cascade_delete_games=true 参数级联删除。"
+        )
     
-    # 删除球队（球员会通过cascade自动删除）
-    db.delete(db_team)
+    # 级联删除相关比赛（同时移除积分榜使用的比分），再标记球队和球员
+    counts = soft_delete_games(db, related_game_ids)
+    soft_delete_team(db, db_team)
     db.commit()
+    request_purge()
     
-    if len(related_games) > 0:
+    if related_game_ids:
         return {
-            "message": f"球队已删除，同时删除了 {len(related_games)} 场相关比赛",
-            "deleted_games": len(related_games),
-            "deleted_stats": stats_count if cascade_delete_games else 0,
-            "deleted_player_times": player_times_count if cascade_delete_games else 0
+            "message": f"球队已删除，同时删除了 {len(related_game_ids)} 场相关比赛",
+            "deleted_games": len(related_game_ids),
+            "deleted_stats": counts["statistics"],
+            "deleted_player_times": counts["player_times"]
         }
     else:
         return {"message": "球队已删除"}
@@ -537,6 +516,10 @@ async def get_team_statistics(
                 detail="没有权限访问此球队统计"
             )
     
+    # 已归档赛季的统计记录在归档数据库中
+    from app.services.archive import include_archive
+    include_archive(db, team.league_id)
+    
     # 获取球队的所有球员
     players = db.query(Player).filter(Player.team_id == team_id).all()
     player_ids = [p.id for p in players]
@@ -1,5 +1,5 @@
 """用户管理API路由（仅管理员）"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 from typing import List, Optional
@@ -9,6 +9,9 @@ from app.models.user import User, UserRole
 from app.models.league import League
 from app.models.user_league import user_league_association
 from app.core.dependencies import get_current_admin
+from app.core.pagination import keyset_paginate, set_next_cursor
+from app.core.league_scope import invalidate_league_membership
+from app.core.principal import refresh_user_tokens, revoke_user_tokens
 from app.core.security import get_password_hash
 
 router = APIRouter()
@@ -42,14 +45,19 @@ class UserResponse(BaseModel):
 
 @router.get("/", response_model=List[UserResponse])
 async def get_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="分页游标（上一页响应头 X-Next-Cursor 的值）"),
     league_id: Optional[int] = None,
     role: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    """获取用户列表（仅管理员）"""
+    """获取用户列表（仅管理员）
+    
+    结果按 (用户名, ID) 排序；如果本页已满，响应头 X-Next-Cursor 给出下一页的游标。
+    """
     query = db.query(User)
     
     # 按league_id筛选（支持多对多关系）
@@ -79,7 +87,8 @@ async def get_users(
         )
         query = query.filter(User.role == role_enum)
     
-    users = query.offset(skip).limit(limit).all()
+    users = keyset_paginate(query, [User.username, User.id], cursor, limit, skip=skip).all()
+    set_next_cursor(response, users, limit, lambda user: (user.username, user.id))
     # 转换角色值为小写返回给前端
     user_responses = []
     for user in users:
@@ -219,10 +228,14 @@ async def update_user(
         user.is_active = user_data.is_active
     
     if user_data.password:
-        from app.core.security import get_password_hash
-        user.hashed_password = get_password_hash(user_data.password)
+        from app.core.security import get_password_hash_async
+        user.hashed_password = await get_password_hash_async(user_data.password)
     
     db.commit()
+    invalidate_league_membership(user.id)
+    if user_data.is_active is not None or user_data.role is not None:
+        # 只读接口不查询数据库，停用或修改角色后需要立即撤销该用户的令牌
+        refresh_user_tokens(user)
     db.refresh(user)
     
     # 返回用户响应对象
@@ -267,6 +280,8 @@ async def delete_user(
     
     db.delete(user)
     db.commit()
+    invalidate_league_membership(user_id)
+    revoke_user_tokens(user_id)
     
     return {"message": "User deleted successfully"}
 
@@ -309,6 +324,8 @@ async def batch_enroll_users(
             user.league_id = request.league_id
     
     db.commit()
+    for user in users:
+        invalidate_league_membership(user.id)
     
     return {
         "message": f"Successfully enrolled {enrolled_count} users to league {league.name}",
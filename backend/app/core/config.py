@@ -1,13 +1,75 @@
 """应用配置"""
 from pydantic_settings import BaseSettings
+from pathlib import Path
 import os
 
+# backend目录
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
 
 class Settings(BaseSettings):
     """应用设置"""
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
     ALLOW_EXTERNAL: bool = os.getenv("ALLOW_EXTERNAL", "false").lower() == "true"
-    
+    # 比赛报告PDF缓存目录和渲染线程数
+    REPORT_CACHE_DIR: str = os.getenv("REPORT_CACHE_DIR", str(BACKEND_DIR / "cache" / "reports"))
+    REPORT_RENDER_WORKERS: int = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+    # 后台任务（批量导出）工作线程数、导出文件目录和导出文件保留时间（小时，0表示不清理）
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "1"))
+    EXPORT_DIR: str = os.getenv("EXPORT_DIR", str(BACKEND_DIR / "cache" / "exports"))
+    EXPORT_RETENTION_HOURS: int = int(os.getenv("EXPORT_RETENTION_HOURS", "72"))
+    # 用户所属联赛集合的进程内缓存时间（秒）
+    LEAGUE_MEMBERSHIP_CACHE_TTL: int = int(os.getenv("LEAGUE_MEMBERSHIP_CACHE_TTL", "60"))
+    # 令牌撤销判断使用的启用用户表从数据库刷新的间隔（秒）
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = int(os.getenv("TOKEN_REVOCATION_REFRESH_SECONDS", "30"))
+    # bcrypt 计算成本（修改后旧密码在下次登录时自动重新哈希）和哈希线程数
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    # SQL查询统计：是否启用、慢查询阈值（毫秒）、保留的慢语句数、每个路由的滚动窗口大小、每个请求记录的最慢语句数
+    SQL_METRICS_ENABLED: bool = os.getenv("SQL_METRICS_ENABLED", "true").lower() == "true"
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+    SQL_SLOW_QUERY_KEEP: int = int(os.getenv("SQL_SLOW_QUERY_KEEP", "50"))
+    SQL_METRICS_WINDOW: int = int(os.getenv("SQL_METRICS_WINDOW", "500"))
+    SQL_METRICS_SLOWEST_PER_REQUEST: int = int(os.getenv("SQL_METRICS_SLOWEST_PER_REQUEST", "3"))
+    # /metrics（Prometheus）访问令牌，设置后抓取时需携带 Authorization: Bearer <令牌>
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    # /health/ready 就绪检查阈值：探测总超时（秒）、数据库探测查询最长耗时（毫秒）、数据库目录最少剩余空间（MB）、
+    # 连接池最高占用比例、后台任务最多排队数、密码哈希/报告渲染线程池最多积压数、最多同时处理的请求数
+    HEALTH_READY_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_READY_TIMEOUT_SECONDS", "3"))
+    HEALTH_DB_MAX_MS: float = float(os.getenv("HEALTH_DB_MAX_MS", "500"))
+    HEALTH_MIN_FREE_MB: int = int(os.getenv("HEALTH_MIN_FREE_MB", "200"))
+    HEALTH_MAX_POOL_SATURATION: float = float(os.getenv("HEALTH_MAX_POOL_SATURATION", "0.9"))
+    HEALTH_MAX_JOB_QUEUE: int = int(os.getenv("HEALTH_MAX_JOB_QUEUE", "20"))
+    HEALTH_MAX_EXECUTOR_BACKLOG: int = int(os.getenv("HEALTH_MAX_EXECUTOR_BACKLOG", "50"))
+    HEALTH_MAX_IN_FLIGHT: int = int(os.getenv("HEALTH_MAX_IN_FLIGHT", "200"))
+    # 按需请求分析：结果目录、最多保留份数、调用栈采样间隔（毫秒）
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", str(BACKEND_DIR / "cache" / "profiles"))
+    PROFILE_KEEP: int = int(os.getenv("PROFILE_KEEP", "50"))
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "2"))
+    # 数据库在线备份：备份目录、是否gzip压缩及压缩级别、保留份数、最长保留天数（0表示不限）、
+    # 分步复制时每步页数和步间暂停（毫秒）、复制期间因写入而重新开始的最多次数（超过后一步完成）
+    BACKUP_DIR: str = os.getenv("BACKUP_DIR", str(BACKEND_DIR.parent / "backups"))
+    BACKUP_COMPRESS: bool = os.getenv("BACKUP_COMPRESS", "true").lower() == "true"
+    BACKUP_COMPRESS_LEVEL: int = int(os.getenv("BACKUP_COMPRESS_LEVEL", "6"))
+    BACKUP_KEEP: int = int(os.getenv("BACKUP_KEEP", "14"))
+    BACKUP_MAX_AGE_DAYS: int = int(os.getenv("BACKUP_MAX_AGE_DAYS", "0"))
+    BACKUP_PAGES_PER_STEP: int = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+    BACKUP_STEP_SLEEP_MS: float = float(os.getenv("BACKUP_STEP_SLEEP_MS", "10"))
+    BACKUP_MAX_RESTARTS: int = int(os.getenv("BACKUP_MAX_RESTARTS", "3"))
+    # WAL增量归档：归档目录、保留的代数（快照+WAL片段）、WAL帧数超过该值时由归档进程执行检查点
+    BACKUP_WAL_DIR: str = os.getenv("BACKUP_WAL_DIR", str(BACKEND_DIR.parent / "backups" / "wal"))
+    BACKUP_WAL_KEEP_GENERATIONS: int = int(os.getenv("BACKUP_WAL_KEEP_GENERATIONS", "2"))
+    BACKUP_WAL_CHECKPOINT_FRAMES: int = int(os.getenv("BACKUP_WAL_CHECKPOINT_FRAMES", "1000"))
+    # 历史数据归档：归档数据库路径（已结束赛季的统计记录和出场时间）、每批移动的比赛场数
+    ARCHIVE_DATABASE: str = os.getenv("ARCHIVE_DATABASE", str(BACKEND_DIR / "database" / "archive.db"))
+    ARCHIVE_BATCH_GAMES: int = int(os.getenv("ARCHIVE_BATCH_GAMES", "100"))
+    # 已删除记录的后台清理：每批最多删除的行数、批间暂停（毫秒）、定时执行间隔（秒，0表示不启动后台清理线程）
+    PURGE_BATCH_ROWS: int = int(os.getenv("PURGE_BATCH_ROWS", "1000"))
+    PURGE_BATCH_PAUSE_MS: float = float(os.getenv("PURGE_BATCH_PAUSE_MS", "20"))
+    PURGE_INTERVAL_SECONDS: float = float(os.getenv("PURGE_INTERVAL_SECONDS", "300"))
+    # 查询过滤检查“是否有待清理的已删除记录”的间隔（秒）：其他进程中的删除最多延迟这么久生效
+    SOFT_DELETE_CHECK_SECONDS: float = float(os.getenv("SOFT_DELETE_CHECK_SECONDS", "5"))
+
     class Config:
         env_file = ".env"
         case_sensitive = True
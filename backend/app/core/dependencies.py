@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User, UserRole
 from app.core.security import decode_access_token
+from app.core.league_scope import LeagueScope
+from app.core.principal import Principal, is_user_revoked
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -40,7 +42,11 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is inactive"
         )
-    
+
+    # 角色修改前签发的令牌不再有效（其中选择的角色可能高于当前角色），需要重新登录
+    if payload.get("original_role", user.role.value) != user.role.value:
+        raise credentials_exception
+
     # 如果token中有选择的league_id和role，临时设置到user对象上
     # 注意：这不会修改数据库，只是临时设置用于权限检查
     if "league_id" in payload:
@@ -102,3 +108,46 @@ def get_current_role(user: User) -> str:
         return temp_role
     return user.role.value
 
+
+async def get_league_scope(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> LeagueScope:
+    """当前请求的联赛访问范围（同一请求内多次依赖只构造一次）"""
+    return LeagueScope(db, current_user, get_current_role(current_user), get_current_league_id(current_user))
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """获取当前用户身份（只读接口使用，直接使用令牌声明，不查询用户表）
+
+    旧令牌缺少必要声明时回退到数据库查询；已停用或删除的用户通过撤销列表拒绝。
+    """
+    payload = decode_access_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    principal = Principal.from_claims(payload)
+    if principal is None:
+        return Principal.from_user(await get_current_user(token, db))
+    
+    if not principal.is_active or is_user_revoked(db, principal):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is inactive"
+        )
+    return principal
+
+
+async def get_read_league_scope(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+) -> LeagueScope:
+    """只读接口的联赛访问范围（基于令牌声明，不查询用户表，访问已归档的数据时附加归档数据库）"""
+    return LeagueScope(db, principal, get_current_role(principal), get_current_league_id(principal), historical=True)
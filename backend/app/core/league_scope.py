@@ -0,0 +1,172 @@
+"""联赛访问范围（权限检查）
+
+取代各个路由中重复的“构建 league_ids 集合再判断”的代码：
+- 用户加入的联赛集合从 user_leagues 关联表读取后缓存在进程内（带过期时间），
+  避免每个请求都懒加载 current_user.leagues；
+- 每个请求只构造一次 LeagueScope（FastAPI 依赖缓存），集合按需计算一次；
+- require_game / require_team 一次查询取出资源并在内存中检查范围；
+- 只读请求访问已归档的比赛或联赛时自动附加归档数据库（app/services/archive.py）。
+"""
+import threading
+import time
+from typing import Dict, FrozenSet, Optional, Tuple, Union
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.principal import Principal
+from app.core.prometheus import record_cache
+from app.models.game import Game
+from app.models.league import League
+from app.models.team import Team
+from app.models.user import User
+from app.models.user_league import user_league_association
+
+_membership_lock = threading.Lock()
+_membership_cache: Dict[int, Tuple[float, FrozenSet[int]]] = {}
+
+
+def load_league_membership(db: Session, user: Union[User, Principal]) -> FrozenSet[int]:
+    """用户加入的所有联赛ID（多对多关系 + 主league_id），带进程内缓存"""
+    now = time.monotonic()
+    with _membership_lock:
+        cached = _membership_cache.get(user.id)
+        if cached is not None and cached[0] > now:
+            record_cache("league_membership", True)
+            return cached[1]
+    record_cache("league_membership", False)
+
+    rows = db.query(user_league_association.c.league_id).filter(
+        user_league_association.c.user_id == user.id
+    ).all()
+    league_ids = {row[0] for row in rows}
+    if user.league_id:
+        league_ids.add(user.league_id)
+    membership = frozenset(league_ids)
+
+    with _membership_lock:
+        _membership_cache[user.id] = (now + settings.LEAGUE_MEMBERSHIP_CACHE_TTL, membership)
+    return membership
+
+
+def invalidate_league_membership(user_id: Optional[int] = None) -> None:
+    """用户加入/退出联赛后清除缓存（不传user_id时清空全部）"""
+    with _membership_lock:
+        if user_id is None:
+            _membership_cache.clear()
+        else:
+            _membership_cache.pop(user_id, None)
+
+
+class LeagueScope:
+    """当前请求可访问的联赛范围
+
+    - 管理员：不限
+    - 用户切换了league（token中有league_id）：只能访问该league
+    - 否则：用户加入的所有league
+
+    historical=True（只读接口）时，require_game 取到已归档的比赛、或 require_team 取到的球队
+    所在联赛有已归档的比赛，本请求的查询同时读取归档数据库；按联赛读取统计的接口调用 include_archive。
+    """
+
+    def __init__(self, db: Session, user: Union[User, Principal], role: str, current_league_id: Optional[int],
+                 historical: bool = False):
+        self.db = db
+        self.user = user
+        self.role = role
+        self.current_league_id = current_league_id
+        self.historical = historical
+        self._league_ids: Optional[FrozenSet[int]] = None
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+    @property
+    def switched(self) -> bool:
+        """用户是否通过token切换到了某个league"""
+        return bool(self.current_league_id) and getattr(self.user, "_temp_league_id", None) is not None
+
+    @property
+    def league_ids(self) -> FrozenSet[int]:
+        """可访问的联赛ID集合（管理员不适用，每个请求只计算一次）"""
+        if self._league_ids is None:
+            if self.switched:
+                self._league_ids = frozenset([self.current_league_id])
+            else:
+                self._league_ids = load_league_membership(self.db, self.user)
+        return self._league_ids
+
+    def allows(self, league_id: Optional[int], current_league_only: bool = False) -> bool:
+        """是否可以访问指定联赛
+
+        current_league_only=True 时只允许当前使用的league（用于只能操作当前联赛的接口）。
+        """
+        if self.is_admin:
+            return True
+        if current_league_only:
+            return league_id == self.current_league_id
+        return league_id in self.league_ids
+
+    def check(self, league_id: Optional[int], detail: str = "Not enough permissions",
+              current_league_only: bool = False) -> None:
+        """无权访问时抛出403"""
+        if not self.allows(league_id, current_league_only):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+
+    def include_archive(self, league_id: Optional[int]) -> None:
+        """本请求需要联赛的历史数据（统计记录、出场时间）时调用，联赛没有归档数据时不做任何事"""
+        from app.services.archive import include_archive
+
+        include_archive(self.db, league_id)
+
+    @staticmethod
+    def check_writable(game: Game) -> None:
+        """已归档的比赛不能再录入统计、出场时间或修改状态（400）"""
+        if game.archived_at is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="比赛数据已归档，不能修改（需要先用 archive_db.py --restore 恢复该联赛）"
+            )
+
+    def filter(self, query, league_column):
+        """为列表查询追加联赛范围条件（管理员不过滤）"""
+        if self.is_admin:
+            return query
+        return query.filter(league_column.in_(list(self.league_ids)))
+
+    def require_game(self, game_id: int, detail: str = "没有权限访问此比赛",
+                     current_league_only: bool = False) -> Game:
+        """获取比赛并检查权限（不存在返回404，无权访问返回403）"""
+        game = self.db.query(Game).filter(Game.id == game_id).first()
+        if not game:
+            raise HTTPException(status_code=404, detail="比赛不存在")
+        self.check(game.league_id, detail, current_league_only)
+        if self.historical and game.archived_at is not None:
+            self.include_archive(game.league_id)
+        return game
+
+    def require_team(self, team_id: int, detail: str = "没有权限访问此球队",
+                     current_league_only: bool = False) -> Team:
+        """获取球队并检查权限（不存在返回404，无权访问返回403）"""
+        team = self.db.query(Team).filter(Team.id == team_id).first()
+        if not team:
+            raise HTTPException(status_code=404, detail="球队不存在")
+        self.check(team.league_id, detail, current_league_only)
+        if self.historical:
+            self.include_archive(team.league_id)
+        return team
+
+    def require_league(self, league_id: int, detail: str = "Not enough permissions",
+                       not_found_detail: str = "League not found") -> League:
+        """获取联赛并检查权限（不存在返回404，无权访问返回403）"""
+        league = self.db.query(League).filter(League.id == league_id).first()
+        if not league:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=not_found_detail
+            )
+        self.check(league_id, detail)
+        return league
@@ -0,0 +1,80 @@
+"""键集（游标）分页工具
+
+游标是排序列取值的不透明编码（base64url JSON），客户端原样传回即可。
+与 offset 分页不同，翻到很深的页时查询代价不会线性增长，
+前提是排序列上有对应的复合索引。
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+
+# 下一页游标通过响应头返回，保持列表响应体格式不变
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if hasattr(value, "value"):  # 枚举
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """将一行的排序列取值编码为游标"""
+    raw = json.dumps([_encode_value(v) for v in values], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """解码游标，格式不正确时返回400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("cursor size mismatch")
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+
+def keyset_paginate(query, columns: Sequence, cursor: Optional[str], limit: int,
+                    skip: int = 0, descending: bool = False):
+    """按 columns 排序并应用游标条件
+
+    提供 cursor 时忽略 skip；否则退回 offset 分页（兼容旧客户端）。
+    最后一列必须唯一（通常为主键），保证排序稳定。
+    """
+    order = [c.desc() if descending else c.asc() for c in columns]
+    query = query.order_by(*order)
+    if cursor:
+        values = decode_cursor(cursor, len(columns))
+        # (c1, c2, ...) > (v1, v2, ...) 展开为 OR/AND，便于使用复合索引
+        conditions = []
+        for i, column in enumerate(columns):
+            prefix = [columns[j] == values[j] for j in range(i)]
+            compare = column < values[i] if descending else column > values[i]
+            conditions.append(and_(*prefix, compare))
+        query = query.filter(or_(*conditions))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int, key) -> None:
+    """本页已满时在响应头中返回下一页游标；key(row) 返回排序列取值"""
+    if rows and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
@@ -0,0 +1,110 @@
+"""基于令牌声明的当前用户（只读接口使用，不查询数据库）
+
+令牌中已经包含 user_id、用户名、角色、所选 league_id、主 league_id 和启用状态，
+只读接口直接由这些声明构造 Principal；写操作仍然通过 get_current_user 查询数据库。
+
+令牌是否仍然有效由启用用户表判断：表中保存 users 表里所有 is_active=True 用户的
+(用户名, 角色)，定期从数据库整体重建；令牌的 user_id 不在表中（已停用、已删除）、
+用户名不一致（ID被新用户复用）或角色不一致（角色已修改）时拒绝。
+本进程内停用/删除用户或修改角色时立即生效，其他进程在下次刷新时生效。
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.user import User, UserRole
+
+_revocation_lock = threading.Lock()
+# user_id -> (用户名, 角色)
+_active_users: Dict[int, Tuple[str, str]] = {}
+_revocation_expires_at = 0.0
+
+
+class Principal:
+    """由令牌声明构造的用户身份
+
+    属性与 User 保持一致（id/username/role/league_id/is_active，以及
+    _temp_league_id/_temp_role），可以直接用于 get_current_league_id、
+    get_current_role 和 LeagueScope。
+    """
+
+    def __init__(self, user_id: int, username: str, role: UserRole, league_id: Optional[int],
+                 is_active: bool = True):
+        self.id = user_id
+        self.username = username
+        self.role = role
+        self.league_id = league_id  # 主league_id
+        self.is_active = is_active
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        """从令牌声明构造；旧令牌缺少必要声明时返回None（调用方回退到数据库查询）"""
+        if not all(key in payload for key in ("sub", "user_id", "original_role", "home_league_id")):
+            return None
+        try:
+            role = UserRole(payload["original_role"])
+        except ValueError:
+            return None
+        principal = cls(
+            payload["user_id"], payload["sub"], role, payload["home_league_id"],
+            bool(payload.get("active", True))
+        )
+        if "league_id" in payload:
+            principal._temp_league_id = payload.get("league_id")
+        if "role" in payload:
+            principal._temp_role = payload.get("role")
+        return principal
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """从数据库用户对象构造（保留令牌中的临时league/角色）"""
+        principal = cls(user.id, user.username, user.role, user.league_id, user.is_active)
+        if hasattr(user, "_temp_league_id"):
+            principal._temp_league_id = user._temp_league_id
+        if hasattr(user, "_temp_role"):
+            principal._temp_role = user._temp_role
+        return principal
+
+
+def is_user_revoked(db: Session, principal: Principal) -> bool:
+    """令牌是否已被撤销（用户已停用、已删除，或用户名/角色与令牌签发时不一致）"""
+    global _revocation_expires_at
+    now = time.monotonic()
+    with _revocation_lock:
+        fresh = now < _revocation_expires_at
+        current = _active_users.get(principal.id)
+
+    if not fresh:
+        rows = db.query(User.id, User.username, User.role).filter(User.is_active == True).all()  # noqa: E712
+        with _revocation_lock:
+            _active_users.clear()
+            _active_users.update((row.id, (row.username, row.role.value)) for row in rows)
+            _revocation_expires_at = now + settings.TOKEN_REVOCATION_REFRESH_SECONDS
+            current = _active_users.get(principal.id)
+    elif current is None:
+        # 上次刷新之后（可能在其他进程中）注册或启用的用户
+        row = db.query(User.username, User.role).filter(
+            User.id == principal.id, User.is_active == True  # noqa: E712
+        ).first()
+        if row is not None:
+            current = (row.username, row.role.value)
+            with _revocation_lock:
+                _active_users[principal.id] = current
+
+    return current != (principal.username, principal.role.value)
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """用户被停用或删除时立即撤销其令牌（本进程内立即生效，其他进程在下次刷新时生效）"""
+    with _revocation_lock:
+        _active_users.pop(user_id, None)
+
+
+def refresh_user_tokens(user: User) -> None:
+    """用户启用状态或角色修改后更新启用用户表（角色修改后按旧角色签发的令牌失效）"""
+    with _revocation_lock:
+        if user.is_active:
+            _active_users[user.id] = (user.username, user.role.value)
+        else:
+            _active_users.pop(user.id, None)
@@ -0,0 +1,226 @@
+"""按需采样分析单个请求
+
+管理员在请求中携带 X-Profile: 1 请求头（或 ?profile=1 查询参数）时，ProfilingMiddleware
+在处理该请求期间启动采样线程，按 PROFILE_SAMPLE_INTERVAL_MS 间隔读取各线程的调用栈
+（事件循环线程和执行同步代码的线程池线程），只保留包含 app 代码的栈，
+输出为 collapsed stack 格式（flamegraph.pl / speedscope 可直接读取）。
+
+结果保存在 PROFILE_DIR 中，最多保留 PROFILE_KEEP 份（环形缓冲，超出时删除最旧的），
+通过 /api/v1/metrics/profiles 列出和下载。响应头 X-Profile-Id 为本次结果的ID。
+
+同一时间只分析一个请求；并发请求的栈也可能被采到，建议在请求量低时使用。
+"""
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = str(Path(__file__).resolve().parent.parent)
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+_profile_lock = threading.Lock()  # 同一时间只分析一个请求
+_store_lock = threading.Lock()
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(APP_DIR):
+        filename = "app" + filename[len(APP_DIR):]
+    else:
+        filename = Path(filename).name
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """后台线程定时采集调用栈"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        thread_names = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack: List[str] = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(_frame_label(code))
+                    if code.co_filename.startswith(APP_DIR):
+                        in_app = True
+                    frame = frame.f_back
+                if not in_app:  # 空闲线程或与请求无关的线程
+                    continue
+                if thread_id not in thread_names:
+                    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _profile_dir() -> Path:
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def new_profile_id() -> str:
+    return f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+
+
+def save_profile(profile_id: str, meta: Dict, collapsed: str) -> None:
+    """保存一份分析结果并删除超出保留数量的旧结果"""
+    directory = _profile_dir()
+    with _store_lock:
+        (directory / f"{profile_id}.collapsed").write_text(collapsed, encoding="utf-8")
+        (directory / f"{profile_id}.json").write_text(
+            json.dumps({"id": profile_id, **meta}, ensure_ascii=False), encoding="utf-8"
+        )
+        metas = sorted(directory.glob("*.json"))
+        for old in metas[:max(0, len(metas) - settings.PROFILE_KEEP)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".collapsed").unlink(missing_ok=True)
+
+
+def list_profiles() -> List[Dict]:
+    """按时间倒序列出已保存的分析结果"""
+    profiles = []
+    for path in sorted(_profile_dir().glob("*.json"), reverse=True):
+        try:
+            profiles.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """分析结果文件路径（ID格式不正确或不存在时返回None）"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = _profile_dir() / f"{profile_id}.collapsed"
+    return path if path.exists() else None
+
+
+def clear_profiles() -> int:
+    count = 0
+    with _store_lock:
+        for path in _profile_dir().glob("*.json"):
+            path.unlink(missing_ok=True)
+            path.with_suffix(".collapsed").unlink(missing_ok=True)
+            count += 1
+    return count
+
+
+def _profile_requested(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile":
+            return value.strip() in (b"1", b"true")
+    query = scope.get("query_string", b"")
+    if b"profile=" not in query:
+        return False
+    return parse_qs(query.decode("latin-1")).get("profile", [""])[0] in ("1", "true")
+
+
+def _is_admin_request(scope) -> bool:
+    """请求是否携带有效的管理员令牌（基于令牌声明，仅在请求分析时检查）"""
+    from app.core.principal import Principal, is_user_revoked
+    from app.core.security import decode_access_token
+    from app.database.base import SessionLocal
+    from app.models.user import UserRole
+
+    authorization = ""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            authorization = value.decode("latin-1")
+            break
+    if not authorization.lower().startswith("bearer "):
+        return False
+    payload = decode_access_token(authorization[7:].strip())
+    principal = Principal.from_claims(payload) if payload else None
+    if principal is None or principal.role != UserRole.ADMIN or not principal.is_active:
+        return False
+    db = SessionLocal()
+    try:
+        return not is_user_revoked(db, principal)
+    finally:
+        db.close()
+
+
+class ProfilingMiddleware:
+    """管理员按需分析单个请求"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope) or not _is_admin_request(scope):
+            await self.app(scope, receive, send)
+            return
+        if not _profile_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000.0)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            duration_ms = (time.perf_counter() - start) * 1000
+            _profile_lock.release()
+            route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+            try:
+                save_profile(profile_id, {
+                    "method": scope.get("method", ""),
+                    "path": scope.get("path", ""),
+                    "route": route,
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "samples": sampler.samples,
+                    "interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                }, sampler.collapsed())
+                logger.info("请求分析已保存 %s（%s %s，%.1fms）", profile_id, scope.get("method"), route, duration_ms)
+            except OSError:
+                logger.warning("无法保存请求分析结果", exc_info=True)
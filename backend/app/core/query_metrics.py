@@ -0,0 +1,227 @@
+"""SQL查询统计（每个请求的查询次数、数据库耗时和慢语句）
+
+- SQLAlchemy 的 before/after_cursor_execute 钩子记录每条语句的耗时，
+  计入当前请求（通过 ContextVar 关联，线程池中执行的同步接口同样有效）；
+- QueryMetricsMiddleware 在响应头中写入 Server-Timing（db;dur=...;desc="N queries"），
+  并把每个请求的结果计入按路由分组的滚动窗口；
+- 管理员通过 /api/v1/metrics/sql 查看各路由的耗时分布、查询次数和最慢语句。
+
+同一条语句在一个请求中重复执行很多次通常意味着 N+1 查询，会单独记录。
+不在请求中执行的查询（脚本、后台任务）不做统计。
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 路由耗时直方图的分桶上限（毫秒）
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class RequestQueryStats:
+    """单个请求的SQL统计"""
+
+    __slots__ = ("count", "db_time", "slowest", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0  # 秒
+        self.slowest: List[Tuple[float, str]] = []  # (耗时秒, 语句)，按耗时降序
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.db_time += elapsed
+        self.statements[statement] += 1
+        limit = settings.SQL_METRICS_SLOWEST_PER_REQUEST
+        if len(self.slowest) < limit or elapsed > self.slowest[-1][0]:
+            self.slowest.append((elapsed, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[limit:]
+
+    def most_repeated(self) -> Tuple[int, Optional[str]]:
+        """重复次数最多的语句（N+1 查询的迹象）"""
+        if not self.statements:
+            return 0, None
+        statement, count = self.statements.most_common(1)[0]
+        return count, statement
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def _shorten(statement: str, limit: int = 500) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+class RouteStats:
+    """一个路由最近若干次请求的滚动窗口"""
+
+    def __init__(self, window: int):
+        # (总耗时毫秒, 数据库耗时毫秒, 查询次数, 重复最多的语句次数)
+        self.samples: Deque[Tuple[float, float, int, int]] = deque(maxlen=window)
+        self.total_requests = 0
+        self.worst_repeated: Tuple[int, Optional[str]] = (0, None)
+
+    def add(self, duration_ms: float, stats: RequestQueryStats) -> None:
+        repeated, statement = stats.most_repeated()
+        self.samples.append((duration_ms, stats.db_time * 1000, stats.count, repeated))
+        self.total_requests += 1
+        if repeated > self.worst_repeated[0]:
+            self.worst_repeated = (repeated, _shorten(statement))
+
+    def summary(self) -> Dict:
+        durations = sorted(sample[0] for sample in self.samples)
+        db_times = sorted(sample[1] for sample in self.samples)
+        counts = [sample[2] for sample in self.samples]
+        histogram = {f"<={bound}ms": 0 for bound in LATENCY_BUCKETS_MS}
+        histogram[f">{LATENCY_BUCKETS_MS[-1]}ms"] = 0
+        for duration in durations:
+            for bound in LATENCY_BUCKETS_MS:
+                if duration <= bound:
+                    histogram[f"<={bound}ms"] += 1
+                    break
+            else:
+                histogram[f">{LATENCY_BUCKETS_MS[-1]}ms"] += 1
+        return {
+            "total_requests": self.total_requests,
+            "window": len(self.samples),
+            "p50_ms": round(_percentile(durations, 50), 2),
+            "p95_ms": round(_percentile(durations, 95), 2),
+            "max_ms": round(durations[-1], 2) if durations else 0.0,
+            "db_p50_ms": round(_percentile(db_times, 50), 2),
+            "db_p95_ms": round(_percentile(db_times, 95), 2),
+            "avg_queries": round(sum(counts) / len(counts), 1) if counts else 0.0,
+            "max_queries": max(counts) if counts else 0,
+            "max_repeated_statement": {
+                "count": self.worst_repeated[0],
+                "statement": self.worst_repeated[1],
+            },
+            "histogram": histogram,
+        }
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, round(pct / 100.0 * (len(ordered) - 1)))]
+
+
+class QueryMetricsRegistry:
+    """按路由汇总的请求统计和全局最慢语句"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, RouteStats] = {}
+        self._slow_statements: List[Dict] = []
+
+    def add(self, route: str, duration_ms: float, stats: RequestQueryStats) -> None:
+        slow_ms = settings.SQL_SLOW_QUERY_MS
+        with self._lock:
+            route_stats = self._routes.get(route)
+            if route_stats is None:
+                route_stats = self._routes[route] = RouteStats(settings.SQL_METRICS_WINDOW)
+            route_stats.add(duration_ms, stats)
+            for elapsed, statement in stats.slowest:
+                if elapsed * 1000 < slow_ms:
+                    break
+                self._slow_statements.append({
+                    "route": route,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "statement": _shorten(statement),
+                })
+            if len(self._slow_statements) > settings.SQL_SLOW_QUERY_KEEP:
+                self._slow_statements.sort(key=lambda item: item["duration_ms"], reverse=True)
+                del self._slow_statements[settings.SQL_SLOW_QUERY_KEEP:]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            routes = {route: stats.summary() for route, stats in self._routes.items()}
+            slow = sorted(self._slow_statements, key=lambda item: item["duration_ms"], reverse=True)
+        return {
+            "slow_query_ms": settings.SQL_SLOW_QUERY_MS,
+            "routes": dict(sorted(routes.items(), key=lambda item: item[1]["p95_ms"], reverse=True)),
+            "slow_statements": slow,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._slow_statements.clear()
+
+
+registry = QueryMetricsRegistry()
+_installed_engines = set()
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """在引擎上注册语句计时钩子（重复调用无副作用）"""
+    if id(engine) in _installed_engines:
+        return
+    _installed_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is None:
+            return
+        starts = conn.info.get("query_start_time")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        stats.record(statement, elapsed)
+        if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            logger.warning("慢查询 %.1fms: %s", elapsed * 1000, _shorten(statement, 200))
+
+
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f"{scope.get('method', '')} {path}"
+
+
+class QueryMetricsMiddleware:
+    """记录每个请求的SQL统计，写入 Server-Timing 响应头并计入路由统计"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={app_ms:.1f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            registry.add(_route_name(scope), (time.perf_counter() - start) * 1000, stats)
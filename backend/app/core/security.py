@@ -1,15 +1,43 @@
 """安全相关工具函数"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
 import bcrypt
 from app.core.config import settings
+from app.core.prometheus import record_cache
 
 # JWT配置
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7天
 
+# 签名校验使用的密钥字节（只编码一次）
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
+# base64url 字母表（JWT各段不带填充）
+_B64URL_SEGMENT = re.compile(r"[A-Za-z0-9_-]*")
+# 最近校验通过的令牌缓存（同一令牌重复请求时跳过HMAC计算和JSON解析）
+VERIFIED_TOKEN_CACHE_SIZE = 1024
+_verified_lock = threading.Lock()
+_verified_tokens: "OrderedDict[str, dict]" = OrderedDict()
+
+# 密码哈希线程池：bcrypt 每次耗时数百毫秒，不能在事件循环中直接执行；
+# 线程数限制同时进行的哈希计算，避免登录高峰占满CPU
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码"""
@@ -25,11 +53,33 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
     # 生成盐并哈希密码
-    salt = bcrypt.gensalt(rounds=12)
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """哈希的计算成本与当前配置不一致时返回True（格式：$2b$<rounds>$...）"""
+    if isinstance(hashed_password, bytes):
+        hashed_password = hashed_password.decode('utf-8')
+    parts = (hashed_password or "").split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return True
+    return int(parts[2]) != settings.BCRYPT_ROUNDS
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在密码线程池中验证密码（供 async 接口使用，不阻塞事件循环）"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在密码线程池中生成密码哈希（供 async 接口使用，不阻塞事件循环）"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建JWT访问令牌"""
     to_encode = data.copy()
@@ -38,14 +88,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    # python-jose 导入较慢（约50ms），只有签发令牌时才需要，按需导入以加快启动
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def _b64url_decode(segment: str) -> bytes:
+    # urlsafe_b64decode 会忽略字母表以外的字符，需要先拒绝
+    if not _B64URL_SEGMENT.fullmatch(segment):
+        raise binascii.Error("invalid base64url segment")
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+@lru_cache(maxsize=16)
+def _header_is_supported(header_segment: str) -> bool:
+    """令牌头只有少数几种取值，解析结果缓存"""
+    try:
+        header = json.loads(_b64url_decode(header_segment))
+    except (ValueError, binascii.Error):
+        return False
+    return isinstance(header, dict) and header.get("alg") == ALGORITHM
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """解码JWT令牌"""
+    """解码并校验JWT令牌（HS256），无效或过期返回None
+
+    直接用缓存的密钥做HMAC校验，并缓存最近校验通过的令牌，
+    避免每个请求都经过python-jose的完整解析流程。
+    """
+    now = time.time()
+    with _verified_lock:
+        payload = _verified_tokens.get(token)
+        if payload is not None:
+            if payload.get("exp", now + 1) > now:
+                _verified_tokens.move_to_end(token)
+                record_cache("verified_token", True)
+                return dict(payload)
+            del _verified_tokens[token]
+    record_cache("verified_token", False)
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+        header_segment, payload_segment, signature_segment = token.split(".")
+        if not _header_is_supported(header_segment):
+            return None
+        expected = hmac.new(
+            _SECRET_KEY_BYTES, f"{header_segment}.{payload_segment}".encode("ascii"), hashlib.sha256
+        ).digest()
+        # 与规范编码比较（不解码签名段），不同的签名写法不能通过校验
+        signature = base64.urlsafe_b64encode(expected).rstrip(b"=")
+        if not hmac.compare_digest(signature, signature_segment.encode("ascii")):
+            return None
+        payload = json.loads(_b64url_decode(payload_segment))
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+    if not isinstance(payload, dict):
         return None
+    exp = payload.get("exp")
+    if exp is not None and (not isinstance(exp, (int, float)) or exp <= now):
+        return None
+
+    with _verified_lock:
+        _verified_tokens[token] = payload
+        while len(_verified_tokens) > VERIFIED_TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return dict(payload)
@@ -1,5 +1,9 @@
 """数据库模块"""
-from app.database.base import Base, get_db, init_db, engine, SessionLocal
+from app.database.base import (
+    Base, get_db, init_db, require_schema, upgrade_database, stamp_database, engine, SessionLocal
+)
 
-__all__ = ["Base", "get_db", "init_db", "engine", "SessionLocal"]
+__all__ = [
+    "Base", "get_db", "init_db", "require_schema", "upgrade_database", "stamp_database", "engine", "SessionLocal"
+]
 
@@ -1,5 +1,5 @@
 """数据库基础配置"""
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -9,7 +9,8 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATABASE_DIR = BASE_DIR / "database"
 DATABASE_DIR.mkdir(exist_ok=True)
-DATABASE_URL = f"sqlite:///{DATABASE_DIR}/basketball.db"
+# 可通过环境变量 DATABASE_URL 指向其他数据库（例如基准测试数据库）
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATABASE_DIR}/basketball.db")
 
 # 创建引擎
 engine = create_engine(
@@ -18,6 +19,15 @@ engine = create_engine(
     echo=False  # 设置为True可以看到SQL语句
 )
 
+# WAL增量归档（backup_db.py wal）期间设置为0：由归档进程在归档后执行检查点，
+# 避免应用自动检查点后重置WAL文件、覆盖尚未归档的帧
+SQLITE_WAL_AUTOCHECKPOINT = os.getenv("SQLITE_WAL_AUTOCHECKPOINT", "")
+
+if DATABASE_URL.startswith("sqlite") and SQLITE_WAL_AUTOCHECKPOINT:
+    @event.listens_for(engine, "connect")
+    def _set_wal_autocheckpoint(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"PRAGMA wal_autocheckpoint={int(SQLITE_WAL_AUTOCHECKPOINT)}")
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -34,7 +44,41 @@ def get_db():
         db.close()
 
 
+def _alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.attributes["configure_logger"] = False  # 不覆盖调用方的日志配置
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(revision: str = "head", connection=None):
+    """执行 Alembic 迁移（默认升级到最新结构）"""
+    from alembic import command
+
+    command.upgrade(_alembic_config(connection), revision)
+
+
+def stamp_database(connection=None, revision: str = "head"):
+    """记录数据库已处于指定版本（由 create_all 直接建表的数据库使用）"""
+    from alembic import command
+
+    command.stamp(_alembic_config(connection), revision)
+
+
 def init_db():
-    """初始化数据库，创建所有表"""
-    Base.metadata.create_all(bind=engine)
+    """初始化数据库：执行全部迁移（显式的建表步骤：init_db.py / 启动脚本）"""
+    upgrade_database()
+
+
+def require_schema():
+    """检查所有表都已创建（命令行脚本启动时使用，只查询一次表名，不执行建表）"""
+    import app.models  # noqa: F401  确保所有模型都已注册到Base.metadata
+    from sqlalchemy import inspect
+
+    missing = sorted(set(Base.metadata.tables) - set(inspect(engine).get_table_names()))
+    if missing:
+        raise RuntimeError(f"数据库缺少表: {', '.join(missing)}，请先运行 python init_db.py")
 
@@ -0,0 +1,47 @@
+"""迁移脚本的辅助函数
+
+早期数据库由 create_all 和若干手动迁移脚本建立，结构不完全一致，
+并且没有 alembic_version 记录。迁移在执行前检查表、列和索引是否已存在，
+因此对新数据库和这些旧数据库都可以直接执行 alembic upgrade head。
+"""
+from typing import Iterable
+import sqlalchemy as sa
+from alembic import op
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def has_table(table: str) -> bool:
+    return _inspector().has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    return any(col["name"] == column for col in _inspector().get_columns(table))
+
+
+def column_is_nullable(table: str, column: str) -> bool:
+    for col in _inspector().get_columns(table):
+        if col["name"] == column:
+            return bool(col["nullable"])
+    return True
+
+
+def has_foreign_key(table: str, column: str) -> bool:
+    return any(fk["constrained_columns"] == [column] for fk in _inspector().get_foreign_keys(table))
+
+
+def has_index(table: str, index: str) -> bool:
+    return any(idx["name"] == index for idx in _inspector().get_indexes(table))
+
+
+def create_index_if_missing(index: str, table: str, columns: Iterable[str], unique: bool = False) -> None:
+    if not has_index(table, index):
+        op.create_index(index, table, list(columns), unique=unique)
+
+
+def add_column_if_missing(table: str, column: sa.Column) -> None:
+    if not has_column(table, column.name):
+        with op.batch_alter_table(table, recreate="never") as batch_op:
+            batch_op.add_column(column)
@@ -0,0 +1,112 @@
+"""软删除记录的查询过滤
+
+比赛、球队和球员删除时只写入 deleted_at，记录由后台清理任务（app/services/purge.py）分批物理删除。
+在清理完成之前，会话中的所有 ORM 查询（包括关系加载和联接）自动排除：
+- deleted_at 不为空的比赛、球队和球员；
+- 属于已删除比赛或已删除球员的统计记录、出场时间、出场球员和归档汇总。
+
+子表的条件是 game_id / player_id NOT IN（已删除的比赛/球员），子查询走只包含已删除记录的
+deleted_at 部分索引，不改变原有查询的联接顺序。
+清理完成后（通常情况）没有需要排除的记录，此时不添加任何条件，大范围统计查询没有额外开销。
+是否有待清理的记录保存在进程内：本进程删除时（mark_pending）立即生效，清理线程完成后重新检查，
+其他进程中的删除在 SOFT_DELETE_CHECK_SECONDS 内通过一次部分索引查询发现。
+需要读取已删除的记录时，查询使用 execution_options(include_deleted=True)。
+
+过滤条件只作用于 ORM 会话（SessionLocal）中的查询。直接执行的 text() 或 Core 语句
+（备份、归档、清理任务和基准测试脚本等）不经过这里，需要时自行加上 deleted_at IS NULL。
+"""
+import threading
+import time
+from sqlalchemy import event, exists, or_, select
+from sqlalchemy.orm import with_loader_criteria
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.models.box_score import BoxScore
+from app.models.game import Game, GamePlayer
+from app.models.player import Player
+from app.models.player_time import PlayerTime
+from app.models.statistic import Statistic
+from app.models.team import Team
+
+# 子查询使用表而不是映射类，避免本身再被加上 deleted_at IS NULL 的条件
+_games = Game.__table__
+_players = Player.__table__
+
+SOFT_DELETE_MODELS = (Game, Team, Player)
+CHILD_MODELS = (Statistic, PlayerTime, GamePlayer, BoxScore)
+
+_PENDING_SQL = select(or_(*(
+    exists().where(model.__table__.c.deleted_at.isnot(None)) for model in SOFT_DELETE_MODELS
+)))
+
+# 进程内的待清理标记；_generation 在每次 mark_pending 时递增，
+# 防止检查期间本进程新标记的删除被检查结果（尚未提交时为 False）覆盖
+_pending_lock = threading.Lock()
+_pending = True
+_pending_expires_at = 0.0
+_generation = 0
+
+
+def _deleted_ids(table):
+    return select(table.c.id).where(table.c.deleted_at.isnot(None))
+
+
+def _build_criteria():
+    options = [
+        with_loader_criteria(model, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        for model in SOFT_DELETE_MODELS
+    ]
+    options += [
+        with_loader_criteria(
+            model,
+            lambda cls: cls.game_id.not_in(_deleted_ids(_games)) & cls.player_id.not_in(_deleted_ids(_players)),
+            include_aliases=True,
+        )
+        for model in CHILD_MODELS
+    ]
+    return options
+
+
+_CRITERIA = _build_criteria()
+
+
+def mark_pending() -> None:
+    """本进程标记了删除（在提交之前调用），之后的查询立即排除已删除的记录"""
+    global _pending, _pending_expires_at, _generation
+    with _pending_lock:
+        _pending = True
+        _pending_expires_at = time.monotonic() + settings.SOFT_DELETE_CHECK_SECONDS
+        _generation += 1
+
+
+def refresh_pending(connection) -> bool:
+    """重新检查是否有待清理的记录（清理任务完成后调用，或检查间隔到期时自动调用）"""
+    global _pending, _pending_expires_at
+    with _pending_lock:
+        generation = _generation
+    pending = bool(connection.execute(_PENDING_SQL).scalar())
+    with _pending_lock:
+        if generation == _generation:
+            _pending = pending
+            _pending_expires_at = time.monotonic() + settings.SOFT_DELETE_CHECK_SECONDS
+        return _pending
+
+
+def _has_pending(session) -> bool:
+    with _pending_lock:
+        if time.monotonic() < _pending_expires_at:
+            return _pending
+    return refresh_pending(session.connection())
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _exclude_deleted(execute_state):
+    # 关系加载和延迟列加载沿用原查询的条件
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+        and _has_pending(execute_state.session)
+    ):
+        execute_state.statement = execute_state.statement.options(*_CRITERIA)
@@ -1,12 +1,25 @@
 """
 FastAPI应用主入口
 """
+import asyncio
+import hmac
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 # 导入所有模型以确保表被创建
 from app.models import user_league  # 确保user_league_association表被创建
-from app.api import teams, players, games, statistics, player_time, auth, leagues, users
+from app.api import teams, players, games, statistics, player_time, auth, leagues, users, jobs, metrics
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+from app.core.prometheus import CONTENT_TYPE, PrometheusMiddleware, registry as prometheus_registry
+from app.core.query_metrics import QueryMetricsMiddleware, install_query_hooks
+from app.database.base import engine
+from app.services.health import liveness, readiness
+from app.services.jobs import recover_interrupted_jobs, shutdown_jobs
+from app.services.purge import start_purger, stop_purger
+from app.services.runtime_metrics import install_runtime_collectors
 
 app = FastAPI(
     title="篮球比赛统计API",
@@ -27,6 +40,7 @@ if allow_external:
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-Id"],  # 键集分页游标、SQL耗时、请求分析ID
     )
 else:
     # 仅允许本地访问
@@ -36,8 +50,21 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-Id"],  # 键集分页游标、SQL耗时、请求分析ID
     )
 
+# SQL查询统计（Server-Timing 响应头和按路由汇总的统计）
+if settings.SQL_METRICS_ENABLED:
+    install_query_hooks(engine)
+    app.add_middleware(QueryMetricsMiddleware)
+
+# Prometheus 指标（按路由模板的请求数和耗时、进行中的请求数等）
+app.add_middleware(PrometheusMiddleware)
+install_runtime_collectors(engine)
+
+# 按需请求分析（管理员携带 X-Profile: 1 请求头时采样调用栈）
+app.add_middleware(ProfilingMiddleware)
+
 # 注册路由
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["认证"])
 app.include_router(leagues.router, prefix="/api/v1/leagues", tags=["联赛"])
@@ -47,6 +74,22 @@ app.include_router(players.router, prefix="/api/v1/players", tags=["球员"])
 app.include_router(games.router, prefix="/api/v1/games", tags=["比赛"])
 app.include_router(statistics.router, prefix="/api/v1/statistics", tags=["统计"])
 app.include_router(player_time.router, prefix="/api/v1/player-time", tags=["出场时间"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["后台任务"])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["运行指标"])
+
+
+@app.on_event("startup")
+async def on_startup():
+    """启动时清理上次中断的后台任务，启动已删除记录的清理线程"""
+    recover_interrupted_jobs()
+    start_purger()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """关闭后台任务线程池和清理线程"""
+    shutdown_jobs()
+    stop_purger()
 
 
 @app.get("/")
@@ -60,3 +103,34 @@ async def health_check():
     """健康检查"""
     return {"status": "healthy"}
 
+
+@app.get("/health/live")
+async def health_live():
+    """存活检查：进程能响应请求即可，不访问任何依赖"""
+    return liveness()
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """就绪检查：探测数据库、磁盘、连接池和线程池，任一项失败（或探测超时）返回503"""
+    try:
+        result = await asyncio.wait_for(
+            run_in_threadpool(readiness), timeout=settings.HEALTH_READY_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        result = {
+            "status": "not_ready",
+            "error": f"就绪检查超过 {settings.HEALTH_READY_TIMEOUT_SECONDS} 秒未完成",
+        }
+    return JSONResponse(result, status_code=200 if result["status"] == "ready" else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(authorization: str = Header(default="")):
+    """Prometheus 文本格式指标（同步执行：抓取时需要查询数据库）"""
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        authorization, f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=401, detail="无效的指标访问令牌")
+    return Response(prometheus_registry.render(), media_type=CONTENT_TYPE)
+
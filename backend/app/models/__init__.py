@@ -3,8 +3,13 @@ from app.models.team import Team
 from app.models.player import Player
 from app.models.game import Game, GamePlayer
 from app.models.statistic import Statistic
+from app.models.player_time import PlayerTime
 from app.models.user import User, UserRole
 from app.models.league import League
+from app.models.job import Job, JobStatus
+from app.models.game_result import GameResult
+from app.models.box_score import BoxScore
+import app.database.soft_delete  # noqa: F401  注册已删除记录的查询过滤
 
-__all__ = ["Team", "Player", "Game", "GamePlayer", "Statistic", "User", "UserRole", "League"]
+__all__ = ["Team", "Player", "Game", "GamePlayer", "Statistic", "PlayerTime", "User", "UserRole", "League", "Job", "JobStatus", "GameResult", "BoxScore"]
 
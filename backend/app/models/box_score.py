@@ -0,0 +1,21 @@
+"""归档比赛的技术统计汇总模型"""
+from sqlalchemy import Column, Integer, ForeignKey, Float, JSON
+from app.database.base import Base
+
+
+class BoxScore(Base):
+    """已归档比赛中每名球员的动作计数和出场时间
+
+    比赛归档后原始统计记录和出场时间移到归档数据库，热数据库保留本表，
+    球员赛季档案等汇总数据不需要读取归档数据库。
+    """
+    __tablename__ = "box_scores"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)  # 归档时球员所属球队（计算双方比分）
+    counts = Column(JSON, nullable=False)  # 动作类型 -> 次数（只包含非零项）
+    seconds = Column(Float, nullable=False, default=0)  # 出场时间（秒）
+
+    def __repr__(self) -> str:
+        return f"<BoxScore(game_id={self.game_id}, player_id={self.player_id})>"
@@ -1,5 +1,5 @@
 """比赛数据模型"""
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -40,6 +40,20 @@ class Game(Base):
     )  # 赛季类型
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 统计记录写入次数（每写入一条加1），联赛数据版本号据此判断统计是否变化，不需要扫描统计记录
+    stats_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # 统计记录和出场时间已移到归档数据库的时间（archive_db.py），未归档为None
+    archived_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # 删除时间（软删除，查询自动排除；记录由后台清理任务分批物理删除），未删除为None
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    # 比赛列表按 (date, id) 倒序做游标分页
+    __table_args__ = (
+        Index("ix_games_date_id", "date", "id"),
+        Index("ix_games_league_date_id", "league_id", "date", "id"),
+        # 部分索引只包含已删除的比赛：查找待清理的比赛，并且不会被 deleted_at IS NULL 的过滤条件误用
+        Index("ix_games_deleted_at", "deleted_at", sqlite_where=text("deleted_at IS NOT NULL")),
+    )
 
     # 关系
     league = relationship("League", back_populates="games")
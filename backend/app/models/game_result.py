@@ -0,0 +1,34 @@
+"""比赛结果模型（已结束比赛的最终比分，用于积分榜）"""
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, Index
+from sqlalchemy.sql import func
+from app.database.base import Base
+from app.models.game import SeasonType
+
+
+class GameResult(Base):
+    """已结束比赛的最终比分
+
+    比分由统计记录汇总得到，比赛结束时写入、删除或重新开始时移除，
+    积分榜直接读取本表，不需要扫描统计记录。
+    """
+    __tablename__ = "game_results"
+
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    league_id = Column(Integer, ForeignKey("leagues.id"), nullable=False)
+    season_type = Column(
+        Enum(SeasonType, values_callable=lambda obj: [e.value for e in obj]),
+        nullable=False
+    )
+    home_team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    away_team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    home_score = Column(Integer, nullable=False, default=0)
+    away_score = Column(Integer, nullable=False, default=0)
+    date = Column(DateTime(timezone=True), nullable=False)  # 比赛日期（计算连胜/连败）
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_game_results_league_season", "league_id", "season_type"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<GameResult(game_id={self.game_id}, {self.home_score}-{self.away_score})>"
@@ -0,0 +1,38 @@
+"""后台任务模型"""
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Boolean
+from sqlalchemy.sql import func
+import enum
+from app.database.base import Base
+
+
+class JobStatus(str, enum.Enum):
+    """任务状态"""
+    PENDING = "pending"  # 排队中
+    RUNNING = "running"  # 执行中
+    FINISHED = "finished"  # 已完成
+    FAILED = "failed"  # 失败
+
+
+class Job(Base):
+    """后台任务（批量导出等耗时操作）"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False, index=True)  # 任务类型，如 league_export
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # 创建者
+    league_id = Column(Integer, ForeignKey("leagues.id"), nullable=True, index=True)  # 关联联赛
+    season_type = Column(String(20), nullable=True)  # regular / playoff，为空表示全部
+    include_csv = Column(Boolean, default=True, nullable=False)
+    include_pdf = Column(Boolean, default=True, nullable=False)
+    progress_current = Column(Integer, default=0, nullable=False)  # 已处理数量
+    progress_total = Column(Integer, default=0, nullable=False)  # 总数量
+    result_path = Column(String(500), nullable=True)  # 结果文件路径
+    error = Column(String(1000), nullable=True)  # 失败原因
+    worker_pid = Column(Integer, nullable=True)  # 执行任务的进程ID（任务在创建它的进程的线程池中执行）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<Job(id={self.id}, type='{self.job_type}', status={self.status})>"
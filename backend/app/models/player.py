@@ -1,5 +1,5 @@
 """球员数据模型"""
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.base import Base
@@ -18,6 +18,11 @@ class Player(Base):
     display_order = Column(Integer, nullable=False, default=0)  # 显示顺序，用于排序和确定首发
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # 删除时间（随球队软删除）
+
+    __table_args__ = (
+        Index("ix_players_deleted_at", "deleted_at", sqlite_where=text("deleted_at IS NOT NULL")),  # 只包含已删除的球员
+    )
 
     # 关系
     team = relationship("Team", back_populates="players")
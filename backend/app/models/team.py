@@ -1,5 +1,5 @@
 """球队数据模型"""
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database.base import Base
@@ -16,6 +16,14 @@ class Team(Base):
     team_admin_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # 所属领队（team_admin）
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # 删除时间（软删除）
+
+    # 球队列表按 (name, id) 做游标分页
+    __table_args__ = (
+        Index("ix_teams_name_id", "name", "id"),
+        Index("ix_teams_league_name_id", "league_id", "name", "id"),
+        Index("ix_teams_deleted_at", "deleted_at", sqlite_where=text("deleted_at IS NOT NULL")),  # 只包含已删除的球队
+    )
 
     # 关系
     league = relationship("League", back_populates="teams")
@@ -0,0 +1,472 @@
+"""历史数据归档（已结束赛季的统计记录和出场时间移到单独的 SQLite 数据库）
+
+热数据库中 statistics / player_times 随历史不断增长，所有索引和扫描都随之变大。
+archive_league 把联赛中已结束比赛的这两类记录移到 ARCHIVE_DATABASE：
+- 比赛、球队、球员和积分榜使用的最终比分（game_results）留在热数据库；
+- 每名球员每场的动作计数和出场时间汇总写入热数据库的 box_scores，
+  球员赛季档案不需要读取归档数据库；
+- games.archived_at 记录归档时间，已归档的比赛不能再录入统计。
+
+移动分两步：先复制到归档数据库并提交，再在热数据库的写事务中核对复制结果、写入汇总、
+删除原记录并标记比赛。任何一步中断都不会丢失数据，重新执行即可继续
+（WAL模式下跨数据库的事务不保证原子性，所以不在同一个事务中完成）。
+
+读取：include_archive 在会话的连接上 ATTACH 归档数据库，并创建同名的临时视图
+statistics / player_times（临时对象优先于 main 中的同名表），ORM 查询不需要任何修改就能读到历史数据。
+联赛的比赛全部归档时视图只读归档数据库；部分归档时为两者的 UNION ALL
+（按 game_id / player_id 过滤的查询仍然使用两边的索引，只按联赛关联比赛表的查询需要扫描）。
+连接归还连接池时删除视图并 DETACH，不影响其他请求。
+"""
+import json
+import logging
+import re
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database.base import SessionLocal, engine
+from app.services.backup import database_path
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_TABLES = ("statistics", "player_times")
+ARCHIVE_SCHEMA = "archive"
+
+# 会话 info / 连接池记录 info 中的键，值为视图模式
+_MODE_KEY = "archive_mode"
+# archive：只读归档数据库；union：热数据库和归档数据库的合集
+_MODE_RANK = {"archive": 1, "union": 2}
+
+_CREATE_TABLE = re.compile(r'^CREATE TABLE\s+"?\w+"?', re.IGNORECASE)
+_CREATE_INDEX = re.compile(r'^CREATE\s+(UNIQUE\s+)?INDEX\s+"?\w+"?', re.IGNORECASE)
+
+
+class ArchiveError(Exception):
+    """归档失败（联赛不存在、归档数据库不可用等）"""
+
+
+def archive_path() -> Path:
+    return Path(settings.ARCHIVE_DATABASE).resolve()
+
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+
+def _column_list(columns: List[str]) -> str:
+    return ", ".join(f'"{column}"' for column in columns)
+
+
+# ---------------------------------------------------------------------------
+# 读取：附加归档数据库
+# ---------------------------------------------------------------------------
+
+def _view_sql(conn: sqlite3.Connection, table: str, mode: str) -> str:
+    """热数据库表结构的临时视图（归档数据库缺少的列返回NULL）"""
+    columns = _columns(conn, "main", table)
+    archived = set(_columns(conn, ARCHIVE_SCHEMA, table))
+    archive_columns = ", ".join(
+        f'"{column}"' if column in archived else f'NULL AS "{column}"' for column in columns
+    )
+    selects = [f'SELECT {archive_columns} FROM {ARCHIVE_SCHEMA}."{table}"']
+    if mode == "union":
+        selects.insert(0, f'SELECT {_column_list(columns)} FROM main."{table}"')
+    return f'CREATE TEMP VIEW "{table}" AS ' + " UNION ALL ".join(selects)
+
+
+def _apply_views(conn: sqlite3.Connection, info: Dict, mode: str) -> None:
+    """在连接上附加归档数据库并创建临时视图（已是同一模式或 union 时不重复执行）"""
+    current = info.get(_MODE_KEY)
+    if current is not None and _MODE_RANK[current] >= _MODE_RANK[mode]:
+        return
+    if current is None:
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(archive_path()),))
+        info[_MODE_KEY] = mode  # 之后失败时归还连接也会 DETACH
+    for table in ARCHIVED_TABLES:
+        conn.execute(f'DROP VIEW IF EXISTS temp."{table}"')
+        conn.execute(_view_sql(conn, table, mode))
+    info[_MODE_KEY] = mode
+
+
+def _detach(conn: sqlite3.Connection) -> None:
+    for table in ARCHIVED_TABLES:
+        conn.execute(f'DROP VIEW IF EXISTS temp."{table}"')
+    conn.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+
+
+@event.listens_for(engine, "checkin")
+def _detach_on_checkin(dbapi_connection, connection_record):
+    if dbapi_connection is None or _MODE_KEY not in connection_record.info:
+        return
+    try:
+        _detach(dbapi_connection)
+        del connection_record.info[_MODE_KEY]
+    except sqlite3.Error:
+        logger.warning("归档数据库分离失败，连接下次取出时重试", exc_info=True)
+
+
+@event.listens_for(engine, "checkout")
+def _ensure_detached(dbapi_connection, connection_record, connection_proxy):
+    if _MODE_KEY not in connection_record.info:
+        return
+    try:
+        _detach(dbapi_connection)
+        del connection_record.info[_MODE_KEY]
+    except sqlite3.Error as e:
+        # 仍带有临时视图的连接不能交给写入 statistics 的请求，丢弃后重新连接
+        connection_record.info.pop(_MODE_KEY, None)
+        raise DisconnectionError("归档数据库分离失败") from e
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _attach_on_begin(session, transaction, connection):
+    # 会话提交后下一个事务可能使用另一个连接（后台任务逐场提交进度），重新附加
+    mode = session.info.get(_MODE_KEY)
+    if mode:
+        _apply_views(connection.connection.driver_connection, connection.info, mode)
+
+
+def league_archive_mode(db: Session, league_id: Optional[int]) -> Optional[str]:
+    """联赛的数据读取方式：没有归档比赛时为None，全部归档为 archive，部分归档为 union"""
+    if league_id is None:
+        return None
+    archived = db.execute(
+        text(
+            "SELECT COUNT(*) FROM main.games"
+            " WHERE archived_at IS NOT NULL AND deleted_at IS NULL AND league_id = :league_id"
+        ),
+        {"league_id": league_id},
+    ).scalar()
+    if not archived:
+        return None
+    # 未开始、没有任何记录的比赛不影响读取方式
+    remaining = db.execute(
+        text(
+            "SELECT COUNT(*) FROM main.games g WHERE g.league_id = :league_id AND g.archived_at IS NULL"
+            " AND g.deleted_at IS NULL"
+            " AND (EXISTS (SELECT 1 FROM main.statistics s WHERE s.game_id = g.id)"
+            "  OR EXISTS (SELECT 1 FROM main.player_times t WHERE t.game_id = g.id))"
+        ),
+        {"league_id": league_id},
+    ).scalar()
+    return "union" if remaining else "archive"
+
+
+def include_archive(db: Session, league_id: Optional[int]) -> Optional[str]:
+    """让会话后续的查询同时读取联赛已归档的统计记录和出场时间，返回使用的模式
+
+    联赛没有归档数据时不附加（返回None）。同一会话多次调用时取范围更大的模式。
+    附加后 statistics / player_times 是只读视图，只能在只读请求中使用。
+    """
+    mode = league_archive_mode(db, league_id)
+    if mode is None:
+        return None
+    if not archive_path().exists():
+        logger.warning("联赛 %s 有已归档的比赛，但归档数据库 %s 不存在", league_id, archive_path())
+        return None
+    current = db.info.get(_MODE_KEY)
+    if current is None or _MODE_RANK[mode] > _MODE_RANK[current]:
+        db.info[_MODE_KEY] = mode
+    connection = db.connection()
+    _apply_views(connection.connection.driver_connection, connection.info, db.info[_MODE_KEY])
+    return db.info[_MODE_KEY]
+
+
+# ---------------------------------------------------------------------------
+# 归档和恢复
+# ---------------------------------------------------------------------------
+
+def _connect() -> sqlite3.Connection:
+    """热数据库连接（自动提交模式，事务显式控制），附加归档数据库"""
+    path = archive_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(database_path()), timeout=30, isolation_level=None)
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(path),))
+    return conn
+
+
+def _ensure_archive_schema(conn: sqlite3.Connection) -> None:
+    """按热数据库的表结构在归档数据库中建表和索引，补齐热数据库后来新增的列"""
+    for table in ARCHIVED_TABLES:
+        row = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if row is None:
+            raise ArchiveError(f"热数据库缺少表 {table}，请先运行 python init_db.py")
+        conn.execute(_CREATE_TABLE.sub(f'CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}."{table}"', row[0], count=1))
+        existing = set(_columns(conn, ARCHIVE_SCHEMA, table))
+        for _, name, column_type, *_ in conn.execute(f'PRAGMA main.table_info("{table}")').fetchall():
+            if name not in existing:
+                conn.execute(f'ALTER TABLE {ARCHIVE_SCHEMA}."{table}" ADD COLUMN "{name}" {column_type}')
+        for name, sql in conn.execute(
+            "SELECT name, sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,),
+        ).fetchall():
+            conn.execute(_CREATE_INDEX.sub(
+                lambda m: f'CREATE {m.group(1) or ""}INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}."{name}"', sql, count=1
+            ))
+
+
+def _common_columns(conn: sqlite3.Connection, table: str) -> str:
+    archived = set(_columns(conn, ARCHIVE_SCHEMA, table))
+    return _column_list([column for column in _columns(conn, "main", table) if column in archived])
+
+
+def _purge_orphans(conn: sqlite3.Connection) -> Dict[str, int]:
+    """删除归档数据库中不属于已归档比赛的记录（比赛已删除、或上次归档/恢复中断留下的副本）"""
+    deleted = {}
+    conn.execute("BEGIN")
+    try:
+        for table in ARCHIVED_TABLES:
+            deleted[table] = conn.execute(
+                f'DELETE FROM {ARCHIVE_SCHEMA}."{table}" WHERE game_id NOT IN'
+                " (SELECT id FROM main.games WHERE archived_at IS NOT NULL)"
+            ).rowcount
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return deleted
+
+
+def purge_archive_orphans() -> Dict[str, int]:
+    """删除归档数据库中已删除比赛的记录（清理任务物理删除已归档的比赛后调用）"""
+    if not archive_path().exists():
+        return {}
+    conn = _connect()
+    try:
+        return _purge_orphans(conn)
+    finally:
+        conn.close()
+
+
+def _differing_games(conn: sqlite3.Connection, table: str, placeholders: str, game_ids: List[int]) -> set:
+    """两边记录不一致的比赛（复制后又有录入、修改或删除）"""
+    columns = _common_columns(conn, table)
+    rows = conn.execute(
+        f"SELECT DISTINCT game_id FROM ("
+        f' SELECT {columns} FROM main."{table}" WHERE game_id IN ({placeholders})'
+        f' EXCEPT SELECT {columns} FROM {ARCHIVE_SCHEMA}."{table}" WHERE game_id IN ({placeholders})'
+        f") UNION SELECT DISTINCT game_id FROM ("
+        f' SELECT {columns} FROM {ARCHIVE_SCHEMA}."{table}" WHERE game_id IN ({placeholders})'
+        f' EXCEPT SELECT {columns} FROM main."{table}" WHERE game_id IN ({placeholders})'
+        f")",
+        game_ids * 4,
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def _box_score_rows(conn: sqlite3.Connection, placeholders: str, game_ids: List[int]) -> List[tuple]:
+    """根据归档数据库中的记录汇总每名球员每场的动作计数和出场时间"""
+    counts: Dict[tuple, Dict[str, int]] = defaultdict(dict)
+    for game_id, player_id, action_type, count in conn.execute(
+        f"SELECT game_id, player_id, action_type, COUNT(*) FROM {ARCHIVE_SCHEMA}.statistics"
+        f" WHERE game_id IN ({placeholders}) GROUP BY game_id, player_id, action_type",
+        game_ids,
+    ):
+        counts[(game_id, player_id)][action_type] = count
+    seconds = {
+        (game_id, player_id): total or 0.0
+        for game_id, player_id, total in conn.execute(
+            f"SELECT game_id, player_id, SUM(duration_seconds) FROM {ARCHIVE_SCHEMA}.player_times"
+            f" WHERE game_id IN ({placeholders}) GROUP BY game_id, player_id",
+            game_ids,
+        )
+    }
+    keys = set(counts) | set(seconds)
+    player_ids = sorted({player_id for _, player_id in keys})
+    teams = dict(conn.execute(
+        f"SELECT id, team_id FROM main.players WHERE id IN ({','.join('?' * len(player_ids))})", player_ids
+    ).fetchall()) if player_ids else {}
+    return [
+        (game_id, player_id, teams.get(player_id), json.dumps(counts.get((game_id, player_id), {})),
+         float(seconds.get((game_id, player_id), 0.0)))
+        for game_id, player_id in sorted(keys)
+    ]
+
+
+def _archive_batch(conn: sqlite3.Connection, game_ids: List[int], result: Dict) -> None:
+    placeholders = ",".join("?" * len(game_ids))
+
+    # 第一步：复制到归档数据库（只持有热数据库的读锁）
+    conn.execute("BEGIN")
+    try:
+        for table in ARCHIVED_TABLES:
+            columns = _common_columns(conn, table)
+            conn.execute(
+                f'INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}."{table}" ({columns})'
+                f' SELECT {columns} FROM main."{table}" WHERE game_id IN ({placeholders})',
+                game_ids,
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+    # 第二步：阻止写入，核对后写入汇总、删除原记录并标记比赛
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        changed = set()
+        for table in ARCHIVED_TABLES:
+            changed |= _differing_games(conn, table, placeholders, game_ids)
+        if changed:
+            # 复制后又有改动的比赛本次跳过，删除其副本，下次归档时重新复制
+            changed_placeholders = ",".join("?" * len(changed))
+            for table in ARCHIVED_TABLES:
+                conn.execute(
+                    f'DELETE FROM {ARCHIVE_SCHEMA}."{table}" WHERE game_id IN ({changed_placeholders})',
+                    sorted(changed),
+                )
+        ready = [game_id for game_id in game_ids if game_id not in changed]
+        if ready:
+            ready_placeholders = ",".join("?" * len(ready))
+            conn.executemany(
+                "INSERT OR REPLACE INTO main.box_scores (game_id, player_id, team_id, counts, seconds)"
+                " VALUES (?, ?, ?, ?, ?)",
+                _box_score_rows(conn, ready_placeholders, ready),
+            )
+            for table in ARCHIVED_TABLES:
+                result[table] += conn.execute(
+                    f'DELETE FROM main."{table}" WHERE game_id IN ({ready_placeholders})', ready
+                ).rowcount
+            conn.execute(
+                f"UPDATE main.games SET archived_at = ? WHERE id IN ({ready_placeholders})",
+                [datetime.now().isoformat(sep=" "), *ready],
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    result["games"] += len(ready)
+    result["skipped"] += len(changed)
+
+
+def _require_league(conn: sqlite3.Connection, league_id: int) -> str:
+    row = conn.execute("SELECT name FROM main.leagues WHERE id = ?", (league_id,)).fetchone()
+    if row is None:
+        raise ArchiveError(f"联赛 {league_id} 不存在")
+    return row[0]
+
+
+def archive_league(league_id: int, batch_size: Optional[int] = None, progress=None) -> Dict:
+    """把联赛中已结束比赛的统计记录和出场时间移到归档数据库
+
+    每批 ARCHIVE_BATCH_GAMES 场，写锁只在每批的第二步持有。
+    progress(已处理场数, 总场数) 在每批完成后调用。
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_GAMES
+    conn = _connect()
+    try:
+        name = _require_league(conn, league_id)
+        _ensure_archive_schema(conn)
+        purged = _purge_orphans(conn)
+        game_ids = [
+            row[0] for row in conn.execute(
+                "SELECT id FROM main.games WHERE league_id = ? AND status = 'FINISHED' AND archived_at IS NULL"
+                " AND deleted_at IS NULL ORDER BY date, id",
+                (league_id,),
+            )
+        ]
+        result = {"league_id": league_id, "league_name": name, "games": 0, "skipped": 0,
+                  "statistics": 0, "player_times": 0, "purged": purged}
+        for start in range(0, len(game_ids), batch_size):
+            _archive_batch(conn, game_ids[start:start + batch_size], result)
+            if progress:
+                progress(min(start + batch_size, len(game_ids)), len(game_ids))
+        return result
+    finally:
+        conn.close()
+
+
+def restore_league(league_id: int, batch_size: Optional[int] = None, progress=None) -> Dict:
+    """把联赛已归档的记录移回热数据库（联赛重新启用、需要修改历史比赛时使用）"""
+    batch_size = batch_size or settings.ARCHIVE_BATCH_GAMES
+    conn = _connect()
+    try:
+        name = _require_league(conn, league_id)
+        _ensure_archive_schema(conn)
+        game_ids = [
+            row[0] for row in conn.execute(
+                "SELECT id FROM main.games WHERE league_id = ? AND archived_at IS NOT NULL ORDER BY date, id",
+                (league_id,),
+            )
+        ]
+        result = {"league_id": league_id, "league_name": name, "games": 0, "statistics": 0, "player_times": 0}
+        for start in range(0, len(game_ids), batch_size):
+            batch = game_ids[start:start + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            # 先写回热数据库并取消标记，再删除归档数据库中的记录（中断后留下的副本由下次归档清理）
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in ARCHIVED_TABLES:
+                    columns = _common_columns(conn, table)
+                    result[table] += conn.execute(
+                        f'INSERT OR REPLACE INTO main."{table}" ({columns})'
+                        f' SELECT {columns} FROM {ARCHIVE_SCHEMA}."{table}" WHERE game_id IN ({placeholders})',
+                        batch,
+                    ).rowcount
+                conn.execute(f"DELETE FROM main.box_scores WHERE game_id IN ({placeholders})", batch)
+                conn.execute(f"UPDATE main.games SET archived_at = NULL WHERE id IN ({placeholders})", batch)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            _purge_orphans(conn)
+            result["games"] += len(batch)
+            if progress:
+                progress(min(start + batch_size, len(game_ids)), len(game_ids))
+        return result
+    finally:
+        conn.close()
+
+
+def league_archive_status(db: Session) -> List[Dict]:
+    """每个联赛的比赛场数、已归档场数、最后一场比赛日期和是否启用"""
+    rows = db.execute(text(
+        "SELECT l.id, l.name, l.is_active, COUNT(g.id),"
+        " SUM(CASE WHEN g.status = 'FINISHED' THEN 1 ELSE 0 END),"
+        " COUNT(g.archived_at), MAX(g.date)"
+        " FROM leagues l LEFT JOIN games g ON g.league_id = l.id AND g.deleted_at IS NULL"
+        " GROUP BY l.id, l.name, l.is_active ORDER BY l.id"
+    )).fetchall()
+    return [
+        {
+            "league_id": league_id,
+            "name": name,
+            "is_active": bool(is_active),
+            "games": games,
+            "finished": finished or 0,
+            "archived": archived,
+            "last_game": str(last_game)[:19] if last_game else None,
+        }
+        for league_id, name, is_active, games, finished, archived, last_game in rows
+    ]
+
+
+def archive_candidates(db: Session, before: Optional[datetime] = None, inactive: bool = True) -> List[Dict]:
+    """可以归档的联赛：已停用的联赛（inactive=True），或最后一场比赛早于 before 的联赛
+
+    只返回还有已结束、未归档比赛的联赛。
+    """
+    candidates = []
+    for status in league_archive_status(db):
+        if status["finished"] <= status["archived"]:
+            continue
+        old = before is not None and status["last_game"] is not None and status["last_game"] < before.isoformat(sep=" ")
+        if (inactive and not status["is_active"]) or old:
+            candidates.append(status)
+    return candidates
+
+
+def vacuum_database() -> None:
+    """归档后回收热数据库的空闲页（需要独占数据库，应在服务停止或空闲时执行）"""
+    conn = sqlite3.connect(str(database_path()), timeout=30, isolation_level=None)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
@@ -0,0 +1,584 @@
+"""SQLite 在线备份
+
+- create_backup：用 sqlite3 备份API复制数据库，不需要停止服务。
+  WAL模式下一步完成：备份只持有读事务，不阻塞写入，结果是开始时刻的一致快照。
+  其他日志模式下每步复制 BACKUP_PAGES_PER_STEP 页，步与步之间释放读锁并暂停 BACKUP_STEP_SLEEP_MS，
+  让比赛录入的写事务可以提交。复制期间数据库被其他连接修改时，SQLite 会从头重新复制；
+  重新开始超过 BACKUP_MAX_RESTARTS 次后改为一步完成。
+  复制结果流式 gzip 压缩后保存到 BACKUP_DIR，再按 BACKUP_KEEP / BACKUP_MAX_AGE_DAYS 清理旧备份。
+- ship_wal：增量模式（仅WAL模式），把WAL中新增的已提交帧归档到 BACKUP_WAL_DIR。
+  每一代（generation）由一份快照和按顺序编号的WAL片段组成。
+  WAL帧数超过 BACKUP_WAL_CHECKPOINT_FRAMES 时，在暂时阻止写入的情况下归档剩余帧并执行检查点，
+  之后 SQLite 重用WAL文件时不会覆盖未归档的帧。
+  无法确认连续性时，自动开始新的一代，例如WAL被其他连接检查点后重置，或所有连接关闭时WAL被删除。
+  每次归档后在 state.json 中记录数据库文件的修改时间和大小：WAL不存在或为空时，
+  数据库文件发生过变化说明有提交经检查点直接写入了数据库文件，这些提交无法从WAL归档。
+  归档期间应用应设置 SQLITE_WAL_AUTOCHECKPOINT=0，由归档进程负责检查点。
+
+恢复和校验见 app/services/restore.py。
+"""
+import gzip
+import json
+import logging
+import re
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.database.base import engine
+
+try:
+    import fcntl
+except ImportError:  # Windows：只做进程内互斥
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BACKUP_NAME_PATTERN = re.compile(r"^basketball_\d{8}_\d{6}(_\d+)?\.db(\.gz)?$")
+GENERATION_PATTERN = re.compile(r"^\d{8}_\d{6}_\d{6}$")
+COPY_CHUNK_SIZE = 1024 * 1024
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+WAL_MAGIC_LE = 0x377F0682  # 校验和按小端字节序计算
+WAL_MAGIC_BE = 0x377F0683  # 校验和按大端字节序计算
+
+_backup_lock = threading.Lock()
+_wal_lock = threading.Lock()
+
+
+class BackupError(Exception):
+    """备份或恢复失败（数据库不是SQLite、已有备份在进行、WAL模式未开启等）"""
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def database_path() -> Path:
+    """当前应用使用的 SQLite 数据库文件"""
+    if engine.dialect.name != "sqlite" or not engine.url.database or engine.url.database == ":memory:":
+        raise BackupError("只支持备份SQLite数据库文件")
+    return Path(engine.url.database).resolve()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    # 自动提交模式，事务由调用方显式控制
+    return sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+
+
+def _timestamp() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _unique_path(directory: Path, stem: str, suffix: str) -> Path:
+    path = directory / f"{stem}{suffix}"
+    counter = 1
+    while path.exists():
+        path = directory / f"{stem}_{counter}{suffix}"
+        counter += 1
+    return path
+
+
+def _compress_file(source: Path, target: Path) -> None:
+    """流式gzip压缩（分块读写，内存占用与数据库大小无关）"""
+    tmp = target.with_name(target.name + ".tmp")
+    with open(source, "rb") as src, gzip.open(tmp, "wb", compresslevel=settings.BACKUP_COMPRESS_LEVEL) as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+    tmp.replace(target)
+
+
+def _copy_database(source: sqlite3.Connection, target: Path) -> Dict:
+    """用备份API把数据库复制到 target，返回复制方式和重新开始的次数"""
+    journal_mode = source.execute("PRAGMA journal_mode").fetchone()[0].lower()
+    dest = sqlite3.connect(str(target))
+    try:
+        if journal_mode == "wal":
+            source.backup(dest)
+            return {"journal_mode": journal_mode, "mode": "snapshot", "restarts": 0}
+
+        restarts = 0
+        last_remaining = None
+        sleep_seconds = settings.BACKUP_STEP_SLEEP_MS / 1000.0
+
+        def progress(status, remaining, total):
+            nonlocal restarts, last_remaining
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+                if restarts > settings.BACKUP_MAX_RESTARTS:
+                    raise _TooManyRestarts()
+            last_remaining = remaining
+            if remaining and sleep_seconds > 0:
+                time.sleep(sleep_seconds)  # 此时没有持有读锁，写事务可以提交
+
+        try:
+            source.backup(dest, pages=max(1, settings.BACKUP_PAGES_PER_STEP), progress=progress)
+            mode = "paged"
+        except _TooManyRestarts:
+            logger.warning("备份期间数据库持续写入，重新开始超过 %s 次，改为一步完成", settings.BACKUP_MAX_RESTARTS)
+            source.backup(dest)
+            mode = "single_step"
+        return {"journal_mode": journal_mode, "mode": mode, "restarts": restarts}
+    finally:
+        dest.close()
+
+
+def create_backup(compress: Optional[bool] = None) -> Dict:
+    """在线备份数据库到 BACKUP_DIR，并清理超出保留策略的旧备份"""
+    if not _backup_lock.acquire(blocking=False):
+        raise BackupError("已有备份正在进行")
+    try:
+        compress = settings.BACKUP_COMPRESS if compress is None else compress
+        db_path = database_path()
+        backup_dir = Path(settings.BACKUP_DIR)
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        final_path = _unique_path(backup_dir, f"basketball_{_timestamp()}", ".db.gz" if compress else ".db")
+        copy_path = final_path.with_name(final_path.name.split(".")[0] + ".db.tmp")
+
+        start = time.perf_counter()
+        source = _connect(db_path)
+        try:
+            info = _copy_database(source, copy_path)
+        finally:
+            source.close()
+        copy_seconds = time.perf_counter() - start
+
+        try:
+            if compress:
+                _compress_file(copy_path, final_path)
+            else:
+                copy_path.replace(final_path)
+        finally:
+            copy_path.unlink(missing_ok=True)
+
+        deleted = prune_backups()
+        result = {
+            "name": final_path.name,
+            "path": str(final_path),
+            "size": final_path.stat().st_size,
+            "database_size": db_path.stat().st_size,
+            "compressed": compress,
+            "copy_seconds": round(copy_seconds, 3),
+            "total_seconds": round(time.perf_counter() - start, 3),
+            "deleted": deleted,
+            **info,
+        }
+        logger.info("数据库已备份到 %s（%s，%.2fs）", final_path, info["mode"], result["total_seconds"])
+        return result
+    finally:
+        _backup_lock.release()
+
+
+def _backup_files() -> List[Path]:
+    backup_dir = Path(settings.BACKUP_DIR)
+    if not backup_dir.exists():
+        return []
+    return sorted(path for path in backup_dir.iterdir() if BACKUP_NAME_PATTERN.match(path.name))
+
+
+def prune_backups() -> List[str]:
+    """按保留份数和最长保留天数删除旧备份（最新的一份始终保留）"""
+    files = _backup_files()
+    expired = files[:max(0, len(files) - max(1, settings.BACKUP_KEEP))]
+    if settings.BACKUP_MAX_AGE_DAYS > 0:
+        cutoff = time.time() - timedelta(days=settings.BACKUP_MAX_AGE_DAYS).total_seconds()
+        expired += [path for path in files[:-1] if path not in expired and path.stat().st_mtime < cutoff]
+    for path in expired:
+        path.unlink(missing_ok=True)
+    return [path.name for path in expired]
+
+
+def list_backups() -> Dict:
+    """已有的完整备份（按时间倒序）和WAL归档状态"""
+    backups = []
+    for path in reversed(_backup_files()):
+        stat = path.stat()
+        backups.append({
+            "name": path.name,
+            "size": stat.st_size,
+            "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+        })
+    return {"backup_dir": settings.BACKUP_DIR, "backups": backups, "wal": wal_status()}
+
+
+def backup_file_path(name: str) -> Optional[Path]:
+    """完整备份文件路径（文件名格式不正确或不存在时返回None）"""
+    if not BACKUP_NAME_PATTERN.match(name):
+        return None
+    path = Path(settings.BACKUP_DIR) / name
+    return path if path.exists() else None
+
+
+# ---------------------------------------------------------------------------
+# WAL 增量归档
+# ---------------------------------------------------------------------------
+
+def _wal_checksum(data: bytes, s0: int, s1: int, big_endian: bool) -> Tuple[int, int]:
+    """SQLite WAL 校验和（按32位字两两累加，结果作为下一帧的初值）"""
+    words = struct.unpack(f"{'>' if big_endian else '<'}{len(data) // 4}I", data)
+    for index in range(0, len(words), 2):
+        s0 = (s0 + words[index] + s1) & 0xFFFFFFFF
+        s1 = (s1 + words[index + 1] + s0) & 0xFFFFFFFF
+    return s0, s1
+
+
+def _read_wal_header(wal_path: Path) -> Optional[Dict]:
+    """读取并校验WAL文件头，文件不存在、为空或已损坏时返回None"""
+    try:
+        with open(wal_path, "rb") as f:
+            data = f.read(WAL_HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(data) < WAL_HEADER_SIZE:
+        return None
+    magic, _, page_size, checkpoint_seq, salt1, salt2, c0, c1 = struct.unpack(">8I", data)
+    if magic not in (WAL_MAGIC_LE, WAL_MAGIC_BE):
+        return None
+    big_endian = magic == WAL_MAGIC_BE
+    if _wal_checksum(data[:24], 0, 0, big_endian) != (c0, c1):
+        return None
+    return {
+        "raw": data,
+        "page_size": page_size,
+        "checkpoint_seq": checkpoint_seq,
+        "salt": [salt1, salt2],
+        "checksum": [c0, c1],
+        "big_endian": big_endian,
+    }
+
+
+def _copy_wal_frames(wal_path: Path, header: Dict, start_frame: int, checksum: List[int],
+                     out=None) -> Tuple[int, List[int]]:
+    """从第 start_frame 帧之后开始顺序校验WAL帧，把已提交的帧写入 out（为None时只定位）
+
+    写入中的帧校验和不匹配，旧的（重置前的）帧盐值不同，遇到任一种即停止；
+    最后一个提交帧之后的帧属于尚未提交的事务，不写入。返回 (最后提交帧序号, 该帧的校验和)。
+    """
+    page_size = header["page_size"]
+    frame_size = WAL_FRAME_HEADER_SIZE + page_size
+    salt = tuple(header["salt"])
+    s0, s1 = checksum
+    committed = start_frame
+    committed_checksum = list(checksum)
+    pending: List[bytes] = []
+    frame_no = start_frame
+    with open(wal_path, "rb") as f:
+        f.seek(WAL_HEADER_SIZE + start_frame * frame_size)
+        while True:
+            frame = f.read(frame_size)
+            if len(frame) < frame_size:
+                break
+            _, commit_size, salt1, salt2, c0, c1 = struct.unpack(">6I", frame[:WAL_FRAME_HEADER_SIZE])
+            if (salt1, salt2) != salt:
+                break
+            s0, s1 = _wal_checksum(frame[:8], s0, s1, header["big_endian"])
+            s0, s1 = _wal_checksum(frame[WAL_FRAME_HEADER_SIZE:], s0, s1, header["big_endian"])
+            if (s0, s1) != (c0, c1):
+                break
+            frame_no += 1
+            if out is not None:
+                pending.append(frame)
+            if commit_size:
+                for item in pending:
+                    out.write(item)
+                pending.clear()
+                committed = frame_no
+                committed_checksum = [s0, s1]
+    return committed, committed_checksum
+
+
+class _WalArchiveLock:
+    """归档目录锁（同一目录同时只允许一个进程归档）"""
+
+    def __init__(self, wal_dir: Path):
+        self.path = wal_dir / ".lock"
+        self._file = None
+
+    def __enter__(self):
+        if not _wal_lock.acquire(blocking=False):
+            raise BackupError("WAL归档正在进行")
+        if fcntl is not None:
+            self._file = open(self.path, "w")
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._file.close()
+                _wal_lock.release()
+                raise BackupError("另一个进程正在归档WAL")
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            self._file.close()
+        _wal_lock.release()
+
+
+class WalShipper:
+    """把WAL中新增的已提交帧归档为片段文件
+
+    watch 模式下复用同一个实例（保持数据库连接），避免归档进程作为最后一个连接关闭时
+    SQLite 检查点并删除WAL文件，导致下一次归档只能开始新的一代。
+    """
+
+    def __init__(self, wal_dir: Optional[Path] = None):
+        self.db_path = database_path()
+        self.wal_path = Path(f"{self.db_path}-wal")
+        self.wal_dir = Path(wal_dir or settings.BACKUP_WAL_DIR)
+        self.state_path = self.wal_dir / "state.json"
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = _connect(self.db_path)
+            self._conn.execute("PRAGMA wal_autocheckpoint=0")
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _load_state(self) -> Optional[Dict]:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_state(self, state: Dict) -> None:
+        tmp = self.state_path.with_name("state.json.tmp")
+        tmp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def ship(self) -> Dict:
+        """归档一次：必要时开始新的一代，然后归档新增帧，WAL过大时执行检查点"""
+        self.wal_dir.mkdir(parents=True, exist_ok=True)
+        with _WalArchiveLock(self.wal_dir):
+            conn = self._connection()
+            if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() != "wal":
+                raise BackupError("数据库未开启WAL模式，先运行 python backup_db.py --enable-wal")
+
+            state = self._load_state()
+            reason = self._continuity_problem(state)
+            new_generation = reason is not None
+            if new_generation:
+                logger.info("开始新的WAL归档代：%s", reason)
+                state = self._start_generation(conn)
+
+            shipped = self._ship_frames(state)
+            checkpoint = None
+            if state["frames"] >= settings.BACKUP_WAL_CHECKPOINT_FRAMES and not state["checkpointed"]:
+                checkpoint = self._checkpoint(conn, state)
+                shipped += checkpoint["frames"]
+            state["db_marker"] = self._db_marker()
+            self._save_state(state)
+            deleted = self._prune_generations(state["generation"])
+            return {
+                "generation": state["generation"],
+                "new_generation": new_generation,
+                "reason": reason,
+                "frames_shipped": shipped,
+                "segments": state["segments"],
+                "checkpoint": checkpoint,
+                "deleted_generations": deleted,
+            }
+
+    def _continuity_problem(self, state: Optional[Dict]) -> Optional[str]:
+        """当前WAL能否接着上次归档的位置继续，不能时返回原因"""
+        if state is None:
+            return "尚无归档"
+        if not (self.wal_dir / state["generation"]).exists():
+            return "当前代的目录已被删除"
+        header = _read_wal_header(self.wal_path)
+        if header is not None and header["salt"] == state["salt"]:
+            return None
+        if header is None or state["salt"] is None:
+            # WAL不存在或为空（或开始归档时为空）：数据库文件没有变化时才能确认没有漏掉的提交
+            if state.get("db_marker") != self._db_marker():
+                return "WAL已被删除或重置，期间的提交已写入数据库文件（例如服务停止时其他程序写入后关闭）"
+            if header is not None:
+                # 当前WAL中的帧都在上次归档之后
+                self._reset_position(state, header)
+            return None
+        if state["checkpointed"] and header["salt"][0] == (state["salt"][0] + 1) & 0xFFFFFFFF:
+            # 上次归档后执行过检查点且没有新帧，SQLite 重用WAL文件时 salt-1 加一
+            self._reset_position(state, header)
+            return None
+        return "WAL已被其他连接重置，可能有未归档的帧（服务应设置 SQLITE_WAL_AUTOCHECKPOINT=0）"
+
+    def _db_marker(self) -> List[int]:
+        """数据库文件的修改时间和大小（检查点写入数据库文件时改变）"""
+        stat = self.db_path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @staticmethod
+    def _reset_position(state: Dict, header: Dict) -> None:
+        state.update(salt=header["salt"], checksum=header["checksum"], page_size=header["page_size"],
+                     frames=0, checkpointed=False)
+
+    def _start_generation(self, conn: sqlite3.Connection) -> Dict:
+        """复制一份快照作为新一代的起点
+
+        短暂阻止写入，定位WAL中最后一个提交帧，并在另一个连接上开始读事务，
+        这样快照正好包含该位置之前的全部帧；之后写入恢复，快照在读事务中复制，不阻塞写入。
+        """
+        # 先在不阻止写入的情况下校验已有的帧，持有写锁时只需要校验新增的少量帧
+        header = _read_wal_header(self.wal_path)
+        frames, checksum = 0, None
+        if header is not None:
+            frames, checksum = _copy_wal_frames(self.wal_path, header, 0, header["checksum"])
+
+        generation = datetime.now().strftime("%Y%m%d_%H%M%S_%f")  # 按名称排序即按时间排序
+        generation_dir = self.wal_dir / generation
+        (generation_dir / "wal").mkdir(parents=True)
+        copy_path = generation_dir / "snapshot.db.tmp"
+        snapshot_conn = _connect(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = _read_wal_header(self.wal_path)
+                if current is not None:
+                    if header is None or current["salt"] != header["salt"]:
+                        header, frames, checksum = current, 0, current["checksum"]
+                    frames, checksum = _copy_wal_frames(self.wal_path, header, frames, checksum)
+                snapshot_conn.execute("BEGIN")
+                snapshot_conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                snapshot_at = datetime.now()
+            finally:
+                conn.execute("ROLLBACK")
+            try:
+                _copy_database(snapshot_conn, copy_path)
+            finally:
+                snapshot_conn.execute("ROLLBACK")
+            _compress_file(copy_path, generation_dir / "snapshot.db.gz")
+            (generation_dir / "generation.json").write_text(json.dumps({
+                "generation": generation,
+                "snapshot_at": snapshot_at.isoformat(timespec="milliseconds"),
+                "database": str(self.db_path),
+            }, ensure_ascii=False), encoding="utf-8")
+        except BaseException:
+            shutil.rmtree(generation_dir, ignore_errors=True)
+            raise
+        finally:
+            snapshot_conn.close()
+            copy_path.unlink(missing_ok=True)
+
+        state = {
+            "generation": generation,
+            "created_at": snapshot_at.isoformat(timespec="seconds"),
+            "salt": header["salt"] if header else None,
+            "checksum": checksum,
+            "page_size": header["page_size"] if header else None,
+            "frames": frames,
+            "segments": 0,
+            "checkpointed": False,
+        }
+        self._save_state(state)
+        return state
+
+    def _ship_frames(self, state: Dict) -> int:
+        """把上次位置之后新增的已提交帧写为一个片段，返回帧数"""
+        header = _read_wal_header(self.wal_path)
+        if header is None or header["salt"] != state["salt"]:
+            return 0
+        segment_dir = self.wal_dir / state["generation"] / "wal"
+        segment_path = segment_dir / f"{state['segments'] + 1:06d}.wal.gz"
+        tmp_path = segment_path.with_name(segment_path.name + ".tmp")
+        with gzip.open(tmp_path, "wb", compresslevel=settings.BACKUP_COMPRESS_LEVEL) as out:
+            out.write(header["raw"])
+            frames, checksum = _copy_wal_frames(self.wal_path, header, state["frames"], state["checksum"], out)
+        committed_before = datetime.now()  # 片段中的事务都在此之前提交（按时间点恢复时使用）
+        shipped = frames - state["frames"]
+        after = _read_wal_header(self.wal_path)
+        if shipped <= 0 or after is None or after["salt"] != header["salt"]:
+            # 没有新帧，或复制期间WAL被重置（帧可能已被覆盖，下次归档会开始新的一代）
+            tmp_path.unlink(missing_ok=True)
+            return 0
+        tmp_path.replace(segment_path)
+        with open(segment_dir / "index.jsonl", "a", encoding="utf-8") as index:
+            index.write(json.dumps({
+                "segment": segment_path.name,
+                "frames": shipped,
+                "committed_before": committed_before.isoformat(timespec="milliseconds"),
+            }) + "\n")
+        state.update(frames=frames, checksum=checksum, segments=state["segments"] + 1, checkpointed=False)
+        return shipped
+
+    def _checkpoint(self, conn: sqlite3.Connection, state: Dict) -> Dict:
+        """暂时阻止写入，归档剩余帧后执行检查点
+
+        检查点把WAL中的全部帧写回数据库文件后，下一个写事务会从头重用WAL文件；
+        此时所有帧都已归档，state 标记为 checkpointed，下次归档可以接着新的WAL继续。
+        """
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            frames = self._ship_frames(state)
+            checkpoint_conn = _connect(self.db_path)
+            try:
+                busy, log, checkpointed = checkpoint_conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+            finally:
+                checkpoint_conn.close()
+        finally:
+            conn.execute("ROLLBACK")
+        state["checkpointed"] = busy == 0 and log == checkpointed == state["frames"]
+        return {
+            "frames": frames,
+            "wal_frames": log,
+            "checkpointed_frames": checkpointed,
+            "complete": state["checkpointed"],
+            "writers_blocked_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def _prune_generations(self, current: str) -> List[str]:
+        generations = sorted(
+            path.name for path in self.wal_dir.iterdir()
+            if path.is_dir() and GENERATION_PATTERN.match(path.name) and path.name != current
+        )
+        expired = generations[:max(0, len(generations) - max(0, settings.BACKUP_WAL_KEEP_GENERATIONS - 1))]
+        for name in expired:
+            shutil.rmtree(self.wal_dir / name, ignore_errors=True)
+        return expired
+
+
+def ship_wal() -> Dict:
+    """归档一次WAL新增帧（后台任务和命令行单次运行使用）"""
+    shipper = WalShipper()
+    try:
+        return shipper.ship()
+    finally:
+        shipper.close()
+
+
+def wal_status() -> Optional[Dict]:
+    """WAL归档状态（未开启增量归档时返回None）"""
+    wal_dir = Path(settings.BACKUP_WAL_DIR)
+    try:
+        state = json.loads((wal_dir / "state.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    generations = sorted(
+        path.name for path in wal_dir.iterdir() if path.is_dir() and GENERATION_PATTERN.match(path.name)
+    )
+    return {
+        "wal_dir": str(wal_dir),
+        "generation": state["generation"],
+        "generations": generations,
+        "segments": state["segments"],
+        "frames": state["frames"],
+        "checkpointed": state["checkpointed"],
+        "updated_at": datetime.fromtimestamp((wal_dir / "state.json").stat().st_mtime).isoformat(timespec="seconds"),
+    }
+
+
+def enable_wal() -> str:
+    """把数据库切换为WAL日志模式（写入数据库文件，只需执行一次）"""
+    conn = _connect(database_path())
+    try:
+        return conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,76 @@
+"""比赛数据读取辅助函数"""
+import hashlib
+from typing import Set, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.models.game import Game, GameStatus
+from app.models.player import Player
+from app.models.statistic import Statistic
+from app.models.player_time import PlayerTime
+
+
+def get_team_player_ids(db: Session, team_id: int) -> Set[int]:
+    """获取球队所有球员ID"""
+    rows = db.query(Player.id).filter(Player.team_id == team_id).all()
+    return {row[0] for row in rows}
+
+
+def get_game_player_ids(db: Session, game: Game) -> Tuple[Set[int], Set[int]]:
+    """获取比赛主队、客队球员ID集合（一次查询）"""
+    rows = db.query(Player.id, Player.team_id).filter(
+        Player.team_id.in_([game.home_team_id, game.away_team_id])
+    ).all()
+    home_ids = {player_id for player_id, team_id in rows if team_id == game.home_team_id}
+    away_ids = {player_id for player_id, team_id in rows if team_id == game.away_team_id}
+    return home_ids, away_ids
+
+
+def game_data_version(db: Session, game: Game) -> str:
+    """计算比赛数据版本号
+
+    统计记录、出场时间或比赛本身发生变化时版本号都会改变，
+    用于派生数据（报告PDF、得分曲线等）的缓存键。
+    记录数和最大ID只反映新增和删除，原地修改（例如下场时写入 exit_time）由 stats_version 反映。
+    """
+    stat_count, stat_max_id, stat_max_ts = db.query(
+        func.count(Statistic.id), func.max(Statistic.id), func.max(Statistic.timestamp)
+    ).filter(Statistic.game_id == game.id).one()
+    time_count, time_max_id = db.query(
+        func.count(PlayerTime.id), func.max(PlayerTime.id)
+    ).filter(PlayerTime.game_id == game.id).one()
+    raw = "|".join(str(part) for part in (
+        game.id, game.status.value if game.status else "", game.updated_at, game.stats_version,
+        game.home_team_id, game.away_team_id,
+        stat_count, stat_max_id, stat_max_ts, time_count, time_max_id,
+    ))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def bump_stats_version(db: Session, game_id: int) -> None:
+    """比赛的统计记录或出场时间新增、修改后递增统计版本号，由调用方提交事务"""
+    db.query(Game).filter(Game.id == game_id).update(
+        {Game.stats_version: Game.stats_version + 1}, synchronize_session=False
+    )
+
+
+def league_data_version(db: Session, league_id: int) -> str:
+    """计算联赛数据版本号
+
+    联赛内比赛、统计记录、球队或球员发生变化时版本号都会改变，
+    用于联赛级派生数据（交锋记录、对手分项等）的缓存键。
+    统计记录的变化由各场比赛的 stats_version 反映，只查询比赛、球队和球员表。
+    """
+    from app.models.team import Team
+
+    game_part = db.query(
+        func.count(Game.id), func.max(Game.id), func.max(Game.updated_at), func.max(Game.date),
+        func.sum(case((Game.status == GameStatus.FINISHED, 1), else_=0)), func.sum(Game.stats_version)
+    ).filter(Game.league_id == league_id).one()
+    team_part = db.query(
+        func.count(Team.id), func.max(Team.id), func.max(Team.updated_at)
+    ).filter(Team.league_id == league_id).one()
+    player_part = db.query(
+        func.count(Player.id), func.max(Player.id), func.max(Player.updated_at)
+    ).join(Team, Team.id == Player.team_id).filter(Team.league_id == league_id).one()
+    raw = "|".join(str(part) for part in (league_id, *game_part, *team_part, *player_part))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
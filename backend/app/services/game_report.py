@@ -0,0 +1,400 @@
+"""比赛报告PDF生成（服务端矢量渲染）
+
+替代前端 utils/pdfExport.ts 中基于 html2canvas 的截图方案：
+数据在请求线程中一次性读取为普通字典，渲染放到独立线程池中执行，
+已结束比赛的PDF按数据版本号缓存到磁盘。
+"""
+import asyncio
+import math
+import os
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.prometheus import record_cache
+from app.models.game import Game, GameStatus
+from app.models.player import Player
+from app.models.player_time import PlayerTime
+from app.models.statistic import Statistic
+from app.models.team import Team
+from app.services.game_data import game_data_version
+from app.services.scoring import (
+    POINTS_BY_ACTION,
+    SHOT_ACTIONS,
+    box_score_line,
+    build_score_flow,
+    empty_counts,
+    format_minutes,
+    percentage,
+)
+
+REPORT_CACHE_DIR = Path(settings.REPORT_CACHE_DIR)
+
+# 渲染线程池：限制并发，避免大量导出请求占满CPU
+_render_executor = ThreadPoolExecutor(
+    max_workers=settings.REPORT_RENDER_WORKERS,
+    thread_name_prefix="report-render"
+)
+
+HOME_COLOR = "#3b82f6"
+AWAY_COLOR = "#ef4444"
+FONT_NAME = "STSong-Light"
+
+
+def collect_game_report(db: Session, game: Game) -> Dict:
+    """读取生成报告所需的全部数据（返回普通字典，可跨线程使用）"""
+    teams = {
+        team.id: team
+        for team in db.query(Team).filter(Team.id.in_([game.home_team_id, game.away_team_id])).all()
+    }
+    players = db.query(Player).filter(
+        Player.team_id.in_([game.home_team_id, game.away_team_id])
+    ).order_by(Player.display_order.asc(), Player.number.asc()).all()
+    stats = db.query(Statistic).filter(
+        Statistic.game_id == game.id
+    ).order_by(Statistic.timestamp.asc(), Statistic.id.asc()).all()
+    player_times = db.query(PlayerTime).filter(PlayerTime.game_id == game.id).all()
+
+    home_ids = {p.id for p in players if p.team_id == game.home_team_id}
+    away_ids = {p.id for p in players if p.team_id == game.away_team_id}
+
+    # 出场时间：未结束的记录按最后一条统计的时间截止
+    last_ts = stats[-1].timestamp if stats else None
+    seconds_by_player: Dict[int, float] = defaultdict(float)
+    for pt in player_times:
+        if pt.duration_seconds is not None:
+            seconds_by_player[pt.player_id] += pt.duration_seconds
+        elif last_ts is not None and last_ts > pt.enter_time:
+            seconds_by_player[pt.player_id] += (last_ts - pt.enter_time).total_seconds()
+
+    counts_by_player: Dict[int, Dict[str, int]] = defaultdict(empty_counts)
+    shots_by_team: Dict[int, List[Dict]] = {game.home_team_id: [], game.away_team_id: []}
+    quarter_points: Dict[int, Dict[str, int]] = defaultdict(lambda: {"home": 0, "away": 0})
+    player_team = {p.id: p.team_id for p in players}
+
+    for stat in stats:
+        if stat.action_type in counts_by_player[stat.player_id]:
+            counts_by_player[stat.player_id][stat.action_type] += 1
+        team_id = player_team.get(stat.player_id)
+        points = POINTS_BY_ACTION.get(stat.action_type, 0)
+        if points and team_id is not None:
+            side = "home" if team_id == game.home_team_id else "away"
+            quarter_points[stat.quarter][side] += points
+        if (stat.action_type in SHOT_ACTIONS and team_id in shots_by_team
+                and stat.shot_x is not None and stat.shot_y is not None):
+            shots_by_team[team_id].append({
+                "x": stat.shot_x,
+                "y": stat.shot_y,
+                "made": stat.action_type in ("2PM", "3PM"),
+            })
+
+    def team_block(team_id: int) -> Dict:
+        rows = []
+        totals = empty_counts()
+        for player in players:
+            if player.team_id != team_id:
+                continue
+            counts = counts_by_player.get(player.id)
+            seconds = seconds_by_player.get(player.id, 0)
+            if not counts and not seconds:
+                continue
+            counts = counts or empty_counts()
+            for action, value in counts.items():
+                totals[action] += value
+            rows.append({
+                "number": player.number,
+                "name": player.name,
+                "minutes": format_minutes(seconds),
+                **box_score_line(counts),
+            })
+        team = teams.get(team_id)
+        return {
+            "name": team.name if team else "",
+            "players": rows,
+            "totals": box_score_line(totals),
+            "shots": shots_by_team.get(team_id, []),
+        }
+
+    home = team_block(game.home_team_id)
+    away = team_block(game.away_team_id)
+    quarters = max([game.quarters or 4] + list(quarter_points.keys()))
+
+    return {
+        "game_id": game.id,
+        "date": game.date.strftime("%Y-%m-%d %H:%M") if game.date else "",
+        "status": game.status.value if game.status else "",
+        "home": home,
+        "away": away,
+        "quarter_scores": [
+            {"quarter": q, **quarter_points.get(q, {"home": 0, "away": 0})}
+            for q in range(1, quarters + 1)
+        ],
+        "score_flow": build_score_flow(stats, home_ids, away_ids),
+    }
+
+
+def _register_fonts() -> None:
+    """注册中文CID字体（reportlab内置，无需字体文件）"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+    if FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(FONT_NAME))
+
+
+def _shot_chart_drawing(team: Dict, width: float, color: str):
+    """绘制半场出手点分布（坐标与前端 half-court.svg 一致：500x470，篮筐在底部）"""
+    from reportlab.graphics.shapes import Circle, Drawing, Line, PolyLine, Rect, String
+    from reportlab.lib import colors
+
+    scale = width / 500.0
+    height = 470 * scale
+    drawing = Drawing(width, height + 16)
+    line_color = colors.HexColor("#9ca3af")
+
+    def pt(x: float, y: float):
+        # SVG坐标系y轴向下，PDF坐标系y轴向上
+        return x * scale, (470 - y) * scale
+
+    def arc(cx: float, cy: float, r: float, start_deg: float, end_deg: float, steps: int = 48):
+        points = []
+        for i in range(steps + 1):
+            angle = math.radians(start_deg + (end_deg - start_deg) * i / steps)
+            points.extend(pt(cx + r * math.cos(angle), cy + r * math.sin(angle)))
+        return PolyLine(points, strokeColor=line_color, strokeWidth=1)
+
+    drawing.add(Rect(0, 0, width, height, fillColor=colors.HexColor("#f5efe6"), strokeColor=line_color))
+    paint_x, paint_y = pt(168.5, 470)
+    drawing.add(Rect(paint_x, paint_y, 163 * scale, 193 * scale,
+                     fillColor=colors.HexColor("#eadcc7"), strokeColor=line_color, strokeWidth=1))
+    # 三分线：两侧直线 + 以篮筐为圆心的圆弧
+    three_cy = 370.4 + math.sqrt(225 ** 2 - 220 ** 2)
+    drawing.add(Line(*pt(30, 470), *pt(30, 370.4), strokeColor=line_color))
+    drawing.add(Line(*pt(470, 470), *pt(470, 370.4), strokeColor=line_color))
+    start = math.degrees(math.atan2(370.4 - three_cy, 470 - 250))
+    end = math.degrees(math.atan2(370.4 - three_cy, 30 - 250))
+    drawing.add(arc(250, three_cy, 225, start, end))
+    drawing.add(arc(250, 277, 60, 180, 360))
+    drawing.add(Circle(*pt(250, 440), 7.5 * scale, fillColor=None,
+                       strokeColor=colors.HexColor("#f97316"), strokeWidth=1.2))
+
+    made = colors.HexColor("#22c55e")
+    missed = colors.HexColor("#ef4444")
+    marker = 5
+    for shot in team["shots"]:
+        x, y = shot["x"] / 100.0 * width, height - shot["y"] / 100.0 * height
+        if shot["made"]:
+            drawing.add(Circle(x, y, marker / 2.0, fillColor=made, strokeColor=colors.white, strokeWidth=0.5))
+        else:
+            half = marker / 2.0
+            drawing.add(Line(x - half, y - half, x + half, y + half, strokeColor=missed, strokeWidth=1.2))
+            drawing.add(Line(x - half, y + half, x + half, y - half, strokeColor=missed, strokeWidth=1.2))
+
+    made_count = sum(1 for shot in team["shots"] if shot["made"])
+    drawing.add(String(
+        width / 2, height + 4,
+        f"{team['name']}  {made_count}/{len(team['shots'])}",
+        fontName=FONT_NAME, fontSize=9, textAnchor="middle", fillColor=colors.HexColor(color)
+    ))
+    return drawing
+
+
+def _score_flow_drawing(report: Dict, width: float, height: float):
+    """绘制得分曲线"""
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.lib import colors
+
+    flow = report["score_flow"]
+    home_points = [(p["elapsed"] / 60.0, p["home"]) for p in flow]
+    away_points = [(p["elapsed"] / 60.0, p["away"]) for p in flow]
+
+    drawing = Drawing(width, height)
+    plot = LinePlot()
+    plot.x, plot.y = 36, 24
+    plot.width, plot.height = width - 56, height - 44
+    plot.data = [home_points, away_points]
+    plot.lines[0].strokeColor = colors.HexColor(HOME_COLOR)
+    plot.lines[1].strokeColor = colors.HexColor(AWAY_COLOR)
+    plot.lines[0].strokeWidth = plot.lines[1].strokeWidth = 1.5
+    plot.joinedLines = 1
+    plot.xValueAxis.valueMin = 0
+    plot.xValueAxis.valueMax = max(1.0, max(p[0] for p in home_points))
+    plot.yValueAxis.valueMin = 0
+    plot.yValueAxis.valueMax = max(10, max(max(p["home"], p["away"]) for p in flow) + 5)
+    plot.xValueAxis.labels.fontSize = plot.yValueAxis.labels.fontSize = 7
+    plot.xValueAxis.labelTextFormat = "%d'"
+    drawing.add(plot)
+    drawing.add(String(40, height - 12, report["home"]["name"], fontName=FONT_NAME,
+                       fontSize=9, fillColor=colors.HexColor(HOME_COLOR)))
+    drawing.add(String(width - 20, height - 12, report["away"]["name"], fontName=FONT_NAME,
+                       fontSize=9, textAnchor="end", fillColor=colors.HexColor(AWAY_COLOR)))
+    return drawing
+
+
+def render_game_report_pdf(report: Dict) -> bytes:
+    """将报告数据渲染为矢量PDF（CPU密集，应在线程池中调用）"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    _register_fonts()
+    page_size = landscape(A4)
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=page_size,
+        leftMargin=12 * mm, rightMargin=12 * mm, topMargin=10 * mm, bottomMargin=10 * mm,
+        title=f"{report['home']['name']} vs {report['away']['name']}"
+    )
+    title_style = ParagraphStyle("title", fontName=FONT_NAME, fontSize=18, leading=22, alignment=1)
+    sub_style = ParagraphStyle("sub", fontName=FONT_NAME, fontSize=10, leading=13, alignment=1,
+                               textColor=colors.HexColor("#6b7280"))
+    head_style = ParagraphStyle("head", fontName=FONT_NAME, fontSize=12, leading=16, spaceBefore=6)
+
+    home, away = report["home"], report["away"]
+    grid_style = [
+        ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#d1d5db")),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f3f4f6")),
+    ]
+
+    story = [
+        Paragraph(f"{home['name']}  {home['totals']['points']} : {away['totals']['points']}  {away['name']}",
+                  title_style),
+        Paragraph(f"{report['date']}  ·  比赛报告", sub_style),
+        Spacer(1, 6),
+    ]
+
+    # 分节比分
+    quarter_header = ["球队"] + [f"Q{q['quarter']}" for q in report["quarter_scores"]] + ["总分"]
+    quarter_table = Table([
+        quarter_header,
+        [home["name"]] + [q["home"] for q in report["quarter_scores"]] + [home["totals"]["points"]],
+        [away["name"]] + [q["away"] for q in report["quarter_scores"]] + [away["totals"]["points"]],
+    ])
+    quarter_table.setStyle(TableStyle(grid_style))
+
+    # 球队对比
+    def comparison_row(label: str, key: str, made_key: Optional[str] = None):
+        if made_key:
+            h, a = home["totals"], away["totals"]
+            return [label,
+                    f"{h[made_key]}/{h[key]} ({percentage(h[made_key], h[key])}%)",
+                    f"{a[made_key]}/{a[key]} ({percentage(a[made_key], a[key])}%)"]
+        return [label, home["totals"][key], away["totals"][key]]
+
+    comparison = Table([
+        ["", home["name"], away["name"]],
+        comparison_row("投篮", "fga", "fgm"),
+        comparison_row("三分", "fg3a", "fg3m"),
+        comparison_row("罚球", "fta", "ftm"),
+        comparison_row("篮板", "reb"),
+        comparison_row("前场篮板", "oreb"),
+        comparison_row("助攻", "ast"),
+        comparison_row("抢断", "stl"),
+        comparison_row("盖帽", "blk"),
+        comparison_row("失误", "tov"),
+        comparison_row("犯规", "pf"),
+    ])
+    comparison.setStyle(TableStyle(grid_style))
+    story += [Table([[quarter_table, comparison]], colWidths=[None, None]), Spacer(1, 6)]
+
+    # 技术统计表
+    box_header = ["#", "球员", "时间", "得分", "投篮", "三分", "罚球",
+                  "前板", "后板", "篮板", "助攻", "抢断", "盖帽", "失误", "犯规", "EFF"]
+
+    def box_row(number, name, minutes, line):
+        return [number, name, minutes, line["points"],
+                f"{line['fgm']}/{line['fga']}", f"{line['fg3m']}/{line['fg3a']}",
+                f"{line['ftm']}/{line['fta']}", line["oreb"], line["dreb"], line["reb"],
+                line["ast"], line["stl"], line["blk"], line["tov"], line["pf"], line["eff"]]
+
+    for team, color in ((home, HOME_COLOR), (away, AWAY_COLOR)):
+        rows = [box_header] + [
+            box_row(p["number"], p["name"], p["minutes"], p) for p in team["players"]
+        ] + [box_row("", "合计", "", team["totals"])]
+        table = Table(rows, repeatRows=1)
+        table.setStyle(TableStyle(grid_style + [
+            ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#f9fafb")),
+            ("ALIGN", (1, 1), (1, -1), "LEFT"),
+        ]))
+        story += [Paragraph(team["name"], ParagraphStyle(
+            "team", parent=head_style, textColor=colors.HexColor(color))), table]
+
+    # 得分曲线与出手点分布
+    content_width = page_size[0] - 24 * mm
+    story += [
+        Spacer(1, 8),
+        Paragraph("得分曲线", head_style),
+        _score_flow_drawing(report, content_width, 170),
+        Paragraph("出手点分布", head_style),
+        Table([[
+            _shot_chart_drawing(home, content_width / 2 - 12, HOME_COLOR),
+            _shot_chart_drawing(away, content_width / 2 - 12, AWAY_COLOR),
+        ]]),
+    ]
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _cache_path(game_id: int, version: str) -> Path:
+    return REPORT_CACHE_DIR / f"game_{game_id}_{version}.pdf"
+
+
+def _write_cache(path: Path, content: bytes) -> None:
+    """原子写入缓存文件，并清理同一比赛的旧版本"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    for old in path.parent.glob(path.name.rsplit("_", 1)[0] + "_*.pdf"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def _render_and_cache(report: Dict, path: Optional[Path]) -> bytes:
+    content = render_game_report_pdf(report)
+    if path is not None:
+        _write_cache(path, content)
+    return content
+
+
+def report_cache_path(db: Session, game: Game) -> Optional[Path]:
+    """已结束比赛的缓存文件路径；未结束的比赛不缓存，返回None"""
+    if game.status != GameStatus.FINISHED:
+        return None
+    return _cache_path(game.id, game_data_version(db, game))
+
+
+def build_game_report_pdf(db: Session, game: Game) -> bytes:
+    """同步生成比赛报告PDF（用于后台任务等已不在事件循环中的场景）"""
+    path = report_cache_path(db, game)
+    if path is not None and path.exists():
+        record_cache("game_report_pdf", True)
+        return path.read_bytes()
+    record_cache("game_report_pdf", False)
+    return _render_and_cache(collect_game_report(db, game), path)
+
+
+async def get_game_report_pdf(db: Session, game: Game) -> bytes:
+    """获取比赛报告PDF：已结束的比赛优先读取磁盘缓存，渲染在线程池中执行"""
+    path = report_cache_path(db, game)
+    if path is not None and path.exists():
+        record_cache("game_report_pdf", True)
+        return path.read_bytes()
+
+    record_cache("game_report_pdf", False)
+    report = collect_game_report(db, game)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_render_executor, _render_and_cache, report, path)
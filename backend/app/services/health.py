@@ -0,0 +1,157 @@
+"""存活与就绪检查
+
+/health/live 只说明进程在响应请求；/health/ready 逐项探测依赖，任一项失败返回503，
+负载均衡据此在实例过载（连接池占满、线程池积压、磁盘将满）时停止分配新请求：
+- database：计时执行 SELECT 1，并报告 SQLite 日志模式和 WAL 文件大小；
+- disk：数据库文件（DATABASE_URL）所在磁盘的剩余空间；
+- pool：数据库连接池占用比例；
+- workers：后台任务队列、密码哈希和报告渲染线程池的积压任务数；
+- cache_dirs：报告缓存和导出目录可写；
+- requests：正在处理的请求数。
+"""
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from sqlalchemy import text
+from app.core import security
+from app.core.config import settings
+from app.core.prometheus import HTTP_IN_FLIGHT
+from app.database.base import DATABASE_DIR, engine
+from app.services import game_report
+from app.services.jobs import job_queue_stats
+
+_started_at = time.time()
+
+
+def liveness() -> Dict:
+    return {"status": "alive", "uptime_seconds": round(time.time() - _started_at, 1)}
+
+
+def _database_file() -> Optional[Path]:
+    """引擎实际使用的 SQLite 数据库文件（内存数据库或其他数据库返回None）"""
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or not database or database == ":memory:":
+        return None
+    return Path(database).resolve()
+
+
+def _check_database() -> Dict:
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1")).scalar()
+            result: Dict = {}
+            if engine.dialect.name == "sqlite":
+                result["journal_mode"] = conn.execute(text("PRAGMA journal_mode")).scalar()
+                database = _database_file()
+                wal_path = Path(f"{database}-wal") if database else None
+                result["wal_bytes"] = wal_path.stat().st_size if wal_path and wal_path.exists() else 0
+    except Exception as e:
+        return {"ok": False, "error": str(e)[:200]}
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return {
+        "ok": elapsed_ms <= settings.HEALTH_DB_MAX_MS,
+        "latency_ms": round(elapsed_ms, 2),
+        "max_ms": settings.HEALTH_DB_MAX_MS,
+        **result,
+    }
+
+
+def _check_disk() -> Dict:
+    # 检查 DATABASE_URL 实际指向的目录（可能不在 backend/database 下）
+    database = _database_file()
+    directory = database.parent if database else DATABASE_DIR
+    usage = shutil.disk_usage(directory)
+    free_mb = usage.free // (1024 * 1024)
+    return {
+        "ok": free_mb >= settings.HEALTH_MIN_FREE_MB,
+        "path": str(directory),
+        "free_mb": free_mb,
+        "min_free_mb": settings.HEALTH_MIN_FREE_MB,
+    }
+
+
+def _check_pool() -> Dict:
+    pool = engine.pool
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    capacity = (pool.size() if hasattr(pool, "size") else 0) + getattr(pool, "_max_overflow", 0)
+    if capacity <= 0:  # 不限制连接数的连接池（例如 StaticPool / NullPool）
+        return {"ok": True, "checked_out": checked_out}
+    saturation = checked_out / capacity
+    return {
+        "ok": saturation < settings.HEALTH_MAX_POOL_SATURATION,
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+
+
+def _executor_backlog(executor: ThreadPoolExecutor) -> int:
+    return executor._work_queue.qsize()
+
+
+def _check_workers() -> Dict:
+    jobs = job_queue_stats()
+    password_backlog = _executor_backlog(security._password_executor)
+    render_backlog = _executor_backlog(game_report._render_executor)
+    return {
+        "ok": (
+            jobs["queued"] <= settings.HEALTH_MAX_JOB_QUEUE
+            and password_backlog <= settings.HEALTH_MAX_EXECUTOR_BACKLOG
+            and render_backlog <= settings.HEALTH_MAX_EXECUTOR_BACKLOG
+        ),
+        "jobs_queued": jobs["queued"],
+        "jobs_running": jobs["running"],
+        "password_hash_backlog": password_backlog,
+        "report_render_backlog": render_backlog,
+    }
+
+
+def _check_cache_dirs() -> Dict:
+    result: Dict = {"ok": True}
+    for name, directory in (("reports", settings.REPORT_CACHE_DIR), ("exports", settings.EXPORT_DIR)):
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.TemporaryFile(dir=directory):
+                pass
+            result[name] = "writable"
+        except OSError as e:
+            result["ok"] = False
+            result[name] = str(e)[:200]
+    return result
+
+
+def _check_requests() -> Dict:
+    in_flight = int(HTTP_IN_FLIGHT.value())
+    return {"ok": in_flight <= settings.HEALTH_MAX_IN_FLIGHT, "in_flight": in_flight}
+
+
+READINESS_CHECKS = {
+    "database": _check_database,
+    "disk": _check_disk,
+    "pool": _check_pool,
+    "workers": _check_workers,
+    "cache_dirs": _check_cache_dirs,
+    "requests": _check_requests,
+}
+
+
+def readiness() -> Dict:
+    """执行全部就绪检查（同步执行，会访问数据库和磁盘）"""
+    start = time.perf_counter()
+    checks = {}
+    for name, check in READINESS_CHECKS.items():
+        try:
+            checks[name] = check()
+        except Exception as e:
+            checks[name] = {"ok": False, "error": str(e)[:200]}
+    ready = all(check["ok"] for check in checks.values())
+    return {
+        "status": "ready" if ready else "not_ready",
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        "checks": checks,
+    }
@@ -0,0 +1,261 @@
+"""进程内后台任务执行器
+
+任务状态和进度记录在 jobs 表中，实际工作在独立线程池中执行，
+请求线程只负责创建任务记录并立即返回任务ID。
+"""
+import logging
+import os
+import re
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.prometheus import JOBS_FINISHED
+from app.database.base import SessionLocal
+from app.models.game import Game, GameStatus, SeasonType
+from app.models.job import Job, JobStatus
+from app.models.team import Team
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = Path(settings.EXPORT_DIR)
+
+_job_executor = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix="job-worker")
+_queue_lock = threading.Lock()
+_queue_stats = {"queued": 0, "running": 0}
+
+
+def _update_job(db: Session, job_id: int, **values) -> None:
+    """直接更新任务记录并提交（不依赖会话中的对象，便于在循环中清理会话）"""
+    db.query(Job).filter(Job.id == job_id).update(values, synchronize_session=False)
+    db.commit()
+
+
+def _safe_name(name: str) -> str:
+    """去掉文件名中的非法字符"""
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name).strip("_") or "unnamed"
+
+
+def run_league_export(db: Session, job: Job) -> None:
+    """导出整个联赛（或某个赛季类型）的 play-by-play CSV 和比赛报告PDF，打包为一个zip
+
+    每场比赛处理完成后更新进度并清空会话，内存占用不随比赛数量增长；
+    CSV直接流式写入zip条目，PDF优先复用磁盘缓存。
+    开始前清理过期的导出文件，中途失败时删除未完成的临时文件。
+    """
+    from app.services.archive import include_archive
+    from app.services.game_report import build_game_report_pdf
+    from app.services.play_by_play import iter_game_csv
+
+    job_id = job.id
+    include_csv = job.include_csv
+    include_pdf = job.include_pdf
+
+    games_query = db.query(Game.id).filter(
+        Game.league_id == job.league_id,
+        Game.status == GameStatus.FINISHED
+    )
+    if job.season_type:
+        games_query = games_query.filter(
+            Game.season_type == (SeasonType.REGULAR if job.season_type == "regular" else SeasonType.PLAYOFF)
+        )
+    game_ids = [row[0] for row in games_query.order_by(Game.date.asc(), Game.id.asc()).all()]
+    # 已归档的比赛从归档数据库读取记录（每次提交进度后的新事务会重新附加）
+    include_archive(db, job.league_id)
+    team_names = {
+        team_id: name
+        for team_id, name in db.query(Team.id, Team.name).filter(Team.league_id == job.league_id).all()
+    }
+    _update_job(db, job_id, progress_total=len(game_ids), progress_current=0)
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    cleanup_exports(db)
+    final_path = EXPORT_DIR / f"league_{job.league_id}_{job.season_type or 'all'}_job{job_id}.zip"
+    tmp_path = final_path.with_name(final_path.name + ".tmp")
+
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for index, game_id in enumerate(game_ids, 1):
+                game = db.query(Game).filter(Game.id == game_id).first()
+                if game is None:
+                    continue  # 导出过程中被删除
+                home = team_names.get(game.home_team_id, f"team{game.home_team_id}")
+                away = team_names.get(game.away_team_id, f"team{game.away_team_id}")
+                date_str = game.date.strftime("%Y%m%d") if game.date else "nodate"
+                base_name = _safe_name(f"{date_str}_{game.id}_{home}_vs_{away}")
+
+                if include_csv:
+                    with zf.open(f"csv/{base_name}_play_by_play.csv", "w") as entry:
+                        for chunk in iter_game_csv(db, game):
+                            entry.write(chunk.encode("utf-8"))
+                if include_pdf:
+                    # PDF本身已压缩，直接存储
+                    zf.writestr(f"pdf/{base_name}_report.pdf", build_game_report_pdf(db, game),
+                                compress_type=zipfile.ZIP_STORED)
+
+                db.expunge_all()
+                _update_job(db, job_id, progress_current=index)
+        tmp_path.replace(final_path)
+    except BaseException:
+        # 中途失败时删除未完成的临时文件
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _update_job(db, job_id, result_path=str(final_path))
+
+
+def run_database_backup(db: Session, job: Job) -> None:
+    """完整备份数据库（sqlite3 备份API，不阻塞比赛录入）"""
+    from app.services.backup import create_backup
+
+    result = create_backup()
+    _update_job(db, job.id, progress_total=1, progress_current=1, result_path=result["path"])
+
+
+def run_wal_backup(db: Session, job: Job) -> None:
+    """归档WAL新增帧"""
+    from app.services.backup import ship_wal
+
+    result = ship_wal()
+    _update_job(db, job.id, progress_total=1, progress_current=1)
+    logger.info("WAL归档完成：代 %s，新增 %s 帧", result["generation"], result["frames_shipped"])
+
+
+# 任务类型 -> 处理函数
+JOB_HANDLERS: Dict[str, Callable[[Session, Job], None]] = {
+    "league_export": run_league_export,
+    "database_backup": run_database_backup,
+    "wal_backup": run_wal_backup,
+}
+
+
+def _run_job(job_id: int) -> None:
+    """在工作线程中执行任务（使用独立的数据库会话）"""
+    with _queue_lock:
+        _queue_stats["queued"] -= 1
+        _queue_stats["running"] += 1
+    db = SessionLocal()
+    job_type = "unknown"
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job is None:
+            return
+        job_type = job.job_type
+        handler = JOB_HANDLERS.get(job.job_type)
+        if handler is None:
+            raise ValueError(f"未知的任务类型: {job.job_type}")
+        _update_job(db, job_id, status=JobStatus.RUNNING, started_at=datetime.now())
+        handler(db, job)
+        _update_job(db, job_id, status=JobStatus.FINISHED, finished_at=datetime.now())
+        JOBS_FINISHED.inc(job_type=job_type, status="finished")
+    except Exception as e:
+        logger.exception("后台任务 %s 执行失败", job_id)
+        JOBS_FINISHED.inc(job_type=job_type, status="failed")
+        db.rollback()
+        try:
+            _update_job(db, job_id, status=JobStatus.FAILED, error=str(e)[:1000], finished_at=datetime.now())
+        except SQLAlchemyError:
+            logger.exception("无法记录任务 %s 的失败状态", job_id)
+    finally:
+        db.close()
+        with _queue_lock:
+            _queue_stats["running"] -= 1
+
+
+def submit_job(job_id: int) -> None:
+    """提交任务到工作线程池"""
+    with _queue_lock:
+        _queue_stats["queued"] += 1
+    _job_executor.submit(_run_job, job_id)
+
+
+def job_queue_stats() -> Dict[str, int]:
+    """当前排队和执行中的任务数"""
+    with _queue_lock:
+        return {**_queue_stats, "workers": settings.JOB_WORKERS}
+
+
+def cleanup_exports(db: Session) -> int:
+    """删除超过 EXPORT_RETENTION_HOURS 的导出文件并清除对应任务的结果路径，返回删除的文件数
+
+    导出目录中没有任务引用的文件（已删除的任务、异常退出留下的临时文件）也按修改时间清理。
+    """
+    if settings.EXPORT_RETENTION_HOURS <= 0:
+        return 0
+    cutoff = datetime.now() - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    expired = db.query(Job.id, Job.result_path).filter(
+        Job.job_type == "league_export",
+        Job.result_path.isnot(None),
+        Job.finished_at < cutoff
+    ).all()
+    if expired:
+        db.query(Job).filter(Job.id.in_([row.id for row in expired])).update(
+            {Job.result_path: None}, synchronize_session=False
+        )
+        db.commit()
+
+    removed = 0
+    for row in expired:
+        path = Path(row.result_path)
+        if path.exists():
+            path.unlink(missing_ok=True)
+            removed += 1
+    if EXPORT_DIR.is_dir():
+        cutoff_ts = cutoff.timestamp()
+        for path in EXPORT_DIR.iterdir():
+            if path.is_file() and path.stat().st_mtime < cutoff_ts:
+                path.unlink(missing_ok=True)
+                removed += 1
+    if removed:
+        logger.info("已清理 %s 个过期的导出文件", removed)
+    return removed
+
+
+def _process_exited(pid: int) -> bool:
+    """任务所属的进程是否已经退出（与本进程ID相同说明是重启前的同号进程）"""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def recover_interrupted_jobs() -> None:
+    """服务启动时将所属进程已退出的未完成任务标记为失败（进程内任务无法跨重启继续）
+
+    多个工作进程共用一个数据库时，其他仍在运行的进程中的任务不受影响。
+    同时清理过期的导出文件。
+    """
+    db = SessionLocal()
+    try:
+        unfinished = db.query(Job.id, Job.worker_pid).filter(
+            Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+        ).all()
+        interrupted = [row.id for row in unfinished if row.worker_pid is None or _process_exited(row.worker_pid)]
+        if interrupted:
+            db.query(Job).filter(Job.id.in_(interrupted)).update({
+                Job.status: JobStatus.FAILED,
+                Job.error: "服务重启，任务已中断",
+                Job.finished_at: datetime.now(),
+            }, synchronize_session=False)
+            db.commit()
+        cleanup_exports(db)
+    except SQLAlchemyError:
+        # jobs 表尚未创建（未执行 init_db）时忽略
+        db.rollback()
+        logger.warning("无法检查未完成的后台任务", exc_info=True)
+    finally:
+        db.close()
+
+
+def shutdown_jobs() -> None:
+    """关闭工作线程池（不等待正在执行的任务）"""
+    _job_executor.shutdown(wait=False, cancel_futures=True)
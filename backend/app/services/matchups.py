@@ -0,0 +1,330 @@
+"""交锋记录与对手分项统计
+
+- 联赛内各队两两交锋的胜负、得失分（联赛交锋矩阵）
+- 两支球队之间的交锋详情（每场比分、双方及球员在交锋中的累计数据）
+- 球员对阵每个对手的数据
+
+都由按比赛/球队/球员分组的查询汇总得到；结果按联赛数据版本号缓存在进程内，
+联赛内任何比赛、统计、球队或球员发生变化后自动失效。
+"""
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.core.prometheus import record_cache
+from app.models.game import Game, GameStatus, SeasonType
+from app.models.player import Player
+from app.models.statistic import Statistic
+from app.models.team import Team
+from app.services.game_data import league_data_version
+from app.services.scoring import COUNTED_ACTIONS, POINTS_BY_ACTION, box_score_line, empty_counts
+
+# 进程内缓存的最大结果数
+MATCHUP_CACHE_SIZE = 128
+
+_cache_lock = threading.Lock()
+_matchup_cache: "OrderedDict[Hashable, Tuple[str, Dict]]" = OrderedDict()
+
+
+def _cached(db: Session, league_id: int, key: Hashable, compute: Callable[[], Dict]) -> Dict:
+    """按联赛数据版本号缓存计算结果"""
+    version = league_data_version(db, league_id)
+    with _cache_lock:
+        cached = _matchup_cache.get(key)
+        if cached is not None and cached[0] == version:
+            _matchup_cache.move_to_end(key)
+            record_cache("matchups", True)
+            return cached[1]
+
+    record_cache("matchups", False)
+    result = compute()
+    with _cache_lock:
+        _matchup_cache[key] = (version, result)
+        _matchup_cache.move_to_end(key)
+        while len(_matchup_cache) > MATCHUP_CACHE_SIZE:
+            _matchup_cache.popitem(last=False)
+    return result
+
+
+def _finished_games(db: Session, league_id: int, season_type: Optional[SeasonType], *filters) -> List[Game]:
+    query = db.query(Game).filter(
+        Game.league_id == league_id,
+        Game.status == GameStatus.FINISHED,
+        *filters
+    )
+    if season_type is not None:
+        query = query.filter(Game.season_type == season_type)
+    return query.order_by(Game.date.asc(), Game.id.asc()).all()
+
+
+def _game_scores(db: Session, game_ids: Iterable[int]) -> Dict[int, Dict[int, int]]:
+    """每场比赛各队得分（一次分组查询）"""
+    scores: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    game_ids = list(game_ids)
+    if not game_ids:
+        return scores
+    rows = db.query(
+        Statistic.game_id, Player.team_id, Statistic.action_type, func.count(Statistic.id)
+    ).join(
+        Player, Player.id == Statistic.player_id
+    ).filter(
+        Statistic.game_id.in_(game_ids),
+        Statistic.action_type.in_(list(POINTS_BY_ACTION.keys()))
+    ).group_by(Statistic.game_id, Player.team_id, Statistic.action_type).all()
+    for game_id, team_id, action_type, count in rows:
+        scores[game_id][team_id] += POINTS_BY_ACTION[action_type] * count
+    return scores
+
+
+def _empty_record() -> Dict:
+    return {"games": 0, "wins": 0, "losses": 0, "ties": 0, "points_for": 0, "points_against": 0}
+
+
+def _add_result(record: Dict, points_for: int, points_against: int) -> None:
+    record["games"] += 1
+    record["points_for"] += points_for
+    record["points_against"] += points_against
+    if points_for > points_against:
+        record["wins"] += 1
+    elif points_for < points_against:
+        record["losses"] += 1
+    else:
+        record["ties"] += 1
+
+
+def _finish_record(record: Dict) -> Dict:
+    games = record["games"]
+    record["avg_points_for"] = round(record["points_for"] / games, 1) if games else 0.0
+    record["avg_points_against"] = round(record["points_against"] / games, 1) if games else 0.0
+    record["avg_margin"] = round((record["points_for"] - record["points_against"]) / games, 1) if games else 0.0
+    return record
+
+
+def _team_names(db: Session, team_ids: Iterable[int]) -> Dict[int, str]:
+    team_ids = list(team_ids)
+    if not team_ids:
+        return {}
+    return dict(db.query(Team.id, Team.name).filter(Team.id.in_(team_ids)).all())
+
+
+def compute_league_head_to_head(db: Session, league_id: int, season_type: Optional[SeasonType] = None) -> Dict:
+    """联赛内各队两两交锋记录（team_a_id < team_b_id，每对一行）"""
+    games = _finished_games(db, league_id, season_type)
+    scores = _game_scores(db, [game.id for game in games])
+
+    pairs: Dict[Tuple[int, int], Dict] = {}
+    for game in games:
+        team_a, team_b = sorted((game.home_team_id, game.away_team_id))
+        points_a = scores[game.id][team_a]
+        points_b = scores[game.id][team_b]
+        pair = pairs.get((team_a, team_b))
+        if pair is None:
+            pair = pairs[(team_a, team_b)] = {
+                "team_a_id": team_a, "team_b_id": team_b, **_empty_record(),
+                "last_game_id": None, "last_date": None,
+            }
+        _add_result(pair, points_a, points_b)
+        pair["last_game_id"] = game.id
+        pair["last_date"] = game.date.isoformat() if game.date else None
+
+    matchups = []
+    for (team_a, team_b), pair in sorted(pairs.items()):
+        record = _finish_record(pair)
+        # 以 team_a 的视角记录：wins = team_a 胜场
+        record["team_a_wins"] = record.pop("wins")
+        record["team_b_wins"] = record.pop("losses")
+        record["team_a_points"] = record.pop("points_for")
+        record["team_b_points"] = record.pop("points_against")
+        record["team_a_avg_points"] = record.pop("avg_points_for")
+        record["team_b_avg_points"] = record.pop("avg_points_against")
+        matchups.append(record)
+
+    teams = db.query(Team.id, Team.name).filter(Team.league_id == league_id).order_by(Team.id.asc()).all()
+    return {
+        "league_id": league_id,
+        "season_type": season_type.value if season_type else None,
+        "teams": [{"team_id": team_id, "team_name": name} for team_id, name in teams],
+        "matchups": matchups,
+    }
+
+
+def compute_team_matchup(
+    db: Session, league_id: int, team_a: Team, team_b: Team, season_type: Optional[SeasonType] = None
+) -> Dict:
+    """两队交锋详情：每场比分、交锋战绩、双方及球员在交锋中的累计数据"""
+    games = _finished_games(
+        db, league_id, season_type,
+        ((Game.home_team_id == team_a.id) & (Game.away_team_id == team_b.id))
+        | ((Game.home_team_id == team_b.id) & (Game.away_team_id == team_a.id))
+    )
+    game_ids = [game.id for game in games]
+    scores = _game_scores(db, game_ids)
+
+    record = _empty_record()
+    meetings = []
+    for game in games:
+        points_a = scores[game.id][team_a.id]
+        points_b = scores[game.id][team_b.id]
+        _add_result(record, points_a, points_b)
+        meetings.append({
+            "game_id": game.id,
+            "date": game.date.isoformat() if game.date else None,
+            "season_type": game.season_type.value if game.season_type else None,
+            "home_team_id": game.home_team_id,
+            "team_a_score": points_a,
+            "team_b_score": points_b,
+            "winner_team_id": team_a.id if points_a > points_b else (team_b.id if points_b > points_a else None),
+        })
+
+    # 交锋比赛中每名球员的动作计数和出场场数
+    player_counts: Dict[int, Dict[str, int]] = defaultdict(empty_counts)
+    player_games: Dict[int, int] = {}
+    team_counts: Dict[int, Dict[str, int]] = {team_a.id: empty_counts(), team_b.id: empty_counts()}
+    players: Dict[int, Player] = {}
+    if game_ids:
+        players = {
+            player.id: player
+            for player in db.query(Player).filter(Player.team_id.in_([team_a.id, team_b.id])).all()
+        }
+        rows = db.query(
+            Statistic.player_id, Statistic.action_type, func.count(Statistic.id)
+        ).filter(
+            Statistic.game_id.in_(game_ids),
+            Statistic.action_type.in_(COUNTED_ACTIONS)
+        ).group_by(Statistic.player_id, Statistic.action_type).all()
+        for player_id, action_type, count in rows:
+            player = players.get(player_id)
+            if player is None:
+                continue
+            player_counts[player_id][action_type] += count
+            team_counts[player.team_id][action_type] += count
+        player_games = dict(
+            db.query(Statistic.player_id, func.count(func.distinct(Statistic.game_id))).filter(
+                Statistic.game_id.in_(game_ids)
+            ).group_by(Statistic.player_id).all()
+        )
+
+    player_rows = []
+    for player_id, counts in player_counts.items():
+        player = players[player_id]
+        totals = box_score_line(counts)
+        games_played = player_games.get(player_id, 0)
+        player_rows.append({
+            "player_id": player_id,
+            "player_name": player.name,
+            "player_number": player.number,
+            "team_id": player.team_id,
+            "games": games_played,
+            "totals": totals,
+            "averages": {key: round(value / games_played, 1) for key, value in totals.items()} if games_played else {},
+        })
+    player_rows.sort(key=lambda row: (row["team_id"] != team_a.id, -row["totals"]["points"], row["player_number"]))
+
+    team_rows = []
+    for team in (team_a, team_b):
+        totals = box_score_line(team_counts[team.id])
+        team_rows.append({
+            "team_id": team.id,
+            "team_name": team.name,
+            "totals": totals,
+            "averages": {key: round(value / len(games), 1) for key, value in totals.items()} if games else {},
+        })
+
+    record = _finish_record(record)
+    return {
+        "league_id": league_id,
+        "season_type": season_type.value if season_type else None,
+        "team_a": {"team_id": team_a.id, "team_name": team_a.name},
+        "team_b": {"team_id": team_b.id, "team_name": team_b.name},
+        # 以 team_a 的视角
+        "record": record,
+        "meetings": meetings,
+        "teams": team_rows,
+        "players": player_rows,
+    }
+
+
+def compute_player_opponent_splits(
+    db: Session, player: Player, league_id: int, season_type: Optional[SeasonType] = None
+) -> Dict:
+    """球员对阵每个对手的数据（场数、战绩、总计和场均）"""
+    team_id = player.team_id
+    opponent = case(
+        (Game.home_team_id == team_id, Game.away_team_id),
+        else_=Game.home_team_id
+    )
+    game_filters = [
+        Game.league_id == league_id,
+        Game.status == GameStatus.FINISHED,
+        (Game.home_team_id == team_id) | (Game.away_team_id == team_id),
+    ]
+    if season_type is not None:
+        game_filters.append(Game.season_type == season_type)
+
+    # 球员每场比赛的动作计数（按比赛分组，便于同时得到场数和胜负）
+    rows = db.query(
+        Statistic.game_id, opponent, Statistic.action_type, func.count(Statistic.id)
+    ).join(
+        Game, Game.id == Statistic.game_id
+    ).filter(
+        Statistic.player_id == player.id,
+        Statistic.action_type.in_(COUNTED_ACTIONS),
+        *game_filters
+    ).group_by(Statistic.game_id, opponent, Statistic.action_type).all()
+
+    opponent_of_game: Dict[int, int] = {}
+    counts_by_opponent: Dict[int, Dict[str, int]] = defaultdict(empty_counts)
+    for game_id, opponent_id, action_type, count in rows:
+        opponent_of_game[game_id] = opponent_id
+        counts_by_opponent[opponent_id][action_type] += count
+
+    scores = _game_scores(db, opponent_of_game.keys())
+    records: Dict[int, Dict] = defaultdict(_empty_record)
+    for game_id, opponent_id in opponent_of_game.items():
+        _add_result(records[opponent_id], scores[game_id][team_id], scores[game_id][opponent_id])
+
+    names = _team_names(db, counts_by_opponent.keys())
+    opponents = []
+    for opponent_id, counts in counts_by_opponent.items():
+        record = _finish_record(records[opponent_id])
+        totals = box_score_line(counts)
+        games = record["games"]
+        opponents.append({
+            "opponent_id": opponent_id,
+            "opponent_name": names.get(opponent_id, ""),
+            "record": record,
+            "totals": totals,
+            "averages": {key: round(value / games, 1) for key, value in totals.items()} if games else {},
+        })
+    opponents.sort(key=lambda row: row["opponent_name"])
+
+    return {
+        "player_id": player.id,
+        "player_name": player.name,
+        "team_id": team_id,
+        "season_type": season_type.value if season_type else None,
+        "opponents": opponents,
+    }
+
+
+def get_league_head_to_head(db: Session, league_id: int, season_type: Optional[SeasonType] = None) -> Dict:
+    """联赛交锋矩阵（带缓存）"""
+    key = ("league", league_id, season_type)
+    return _cached(db, league_id, key, lambda: compute_league_head_to_head(db, league_id, season_type))
+
+
+def get_team_matchup(
+    db: Session, league_id: int, team_a: Team, team_b: Team, season_type: Optional[SeasonType] = None
+) -> Dict:
+    """两队交锋详情（带缓存）"""
+    key = ("teams", league_id, team_a.id, team_b.id, season_type)
+    return _cached(db, league_id, key, lambda: compute_team_matchup(db, league_id, team_a, team_b, season_type))
+
+
+def get_player_opponent_splits(
+    db: Session, player: Player, league_id: int, season_type: Optional[SeasonType] = None
+) -> Dict:
+    """球员对手分项（带缓存）"""
+    key = ("player", league_id, player.id, season_type)
+    return _cached(db, league_id, key, lambda: compute_player_opponent_splits(db, player, league_id, season_type))
@@ -0,0 +1,287 @@
+"""Play-by-play CSV 生成
+
+列布局与 reference/games 下的CSV一致，导出的文件可以直接用
+batch_import_games.py 重新导入。
+"""
+import csv
+import heapq
+import io
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.base import SessionLocal
+from app.models.game import Game, GameStatus, SeasonType
+from app.models.player import Player
+from app.models.player_time import PlayerTime
+from app.models.statistic import Statistic
+from app.models.team import Team
+from app.services.archive import include_archive
+from app.services.scoring import POINTS_BY_ACTION
+
+PLAY_BY_PLAY_COLUMNS = [
+    "Game", "Date",
+    "Home player 1", "Home player 2", "Home player 3", "Home player 4", "Home player 5",
+    "Away player 1", "Away player 2", "Away player 3", "Away player 4", "Away player 5",
+    "Quarter", "Minutes", "Home score", "Away score", "Play id", "Team",
+    "Offensive system", "Defensive system", "Player", "Event", "Description",
+]
+
+# 动作类型 -> CSV事件名（batch_import_games.EVENT_MAPPING 的反向映射）
+EVENT_NAMES = {
+    "2PM": "Two pointer made",
+    "2PA": "Two pointer missed",
+    "3PM": "Three pointer made",
+    "3PA": "Three pointer missed",
+    "FTM": "Free throw made",
+    "FTA": "Free throw missed",
+    "OREB": "Offensive rebound",
+    "DREB": "Defensive rebound",
+    "AST": "Assist",
+    "STL": "Steal",
+    "BLK": "Block",
+    "TOV": "Turnover",
+    "PF": "Defensive foul",
+    "PFD": "Personal foul drawn",
+    "SUB_IN": "Sub in",
+    "SUB_OUT": "Sub out",
+}
+
+# 与前端 PlayByPlay.tsx 的描述文案一致
+EVENT_DESCRIPTIONS = {
+    "2PM": "scores a two pointer",
+    "2PA": "misses a two pointer",
+    "3PM": "scores a three pointer",
+    "3PA": "misses a three pointer",
+    "FTM": "scores a free throw",
+    "FTA": "misses a free throw",
+    "OREB": "gets an offensive rebound",
+    "DREB": "gets a defensive rebound",
+    "AST": "assists",
+    "STL": "steals the ball",
+    "BLK": "blocks an opponent",
+    "TOV": "loses the ball",
+    "PF": "commits a personal foul",
+    "PFD": "draws a personal foul",
+    "SUB_IN": "subs in",
+    "SUB_OUT": "subs out",
+}
+
+# 服务端游标每批读取的行数
+STREAM_BATCH_SIZE = 500
+
+
+class _SubEvent:
+    """由出场时间记录合成的上/下场事件（没有 SUB_IN/SUB_OUT 统计的比赛使用）"""
+    __slots__ = ("id", "player_id", "quarter", "action_type", "timestamp",
+                 "assisted_by_player_id", "rebounded_by_player_id")
+
+    def __init__(self, player_id: int, quarter: int, action_type: str, timestamp: datetime):
+        self.id = 0
+        self.player_id = player_id
+        self.quarter = quarter
+        self.action_type = action_type
+        self.timestamp = timestamp
+        self.assisted_by_player_id = None
+        self.rebounded_by_player_id = None
+
+
+def _format_remaining(game: Game, origin: datetime, timestamp: datetime) -> str:
+    """比赛剩余时间 MM:SS（与参考CSV一致，从 duration:00 倒数）"""
+    total = (game.duration or 40) * 60
+    elapsed = int((timestamp - origin).total_seconds())
+    remaining = min(total, max(0, total - elapsed))
+    return f"{remaining // 60:02d}:{remaining % 60:02d}"
+
+
+def iter_game_rows(
+    db: Session,
+    game: Game,
+    teams: Dict[int, Team],
+    players: Dict[int, Player],
+) -> Iterator[List]:
+    """逐行生成单场比赛的 play-by-play 数据
+
+    统计数据通过 yield_per 分批读取，内存占用与比赛事件数无关；
+    只有本场比赛的出场时间记录（通常只有几百条）会一次性载入用于计算场上阵容。
+    """
+    home_team = teams.get(game.home_team_id)
+    away_team = teams.get(game.away_team_id)
+    home_name = home_team.name if home_team else ""
+    away_name = away_team.name if away_team else ""
+    game_name = f"{home_name} vs {away_name}"
+    date_str = game.date.strftime("%d/%m/%Y") if game.date else ""
+
+    stints = db.query(PlayerTime).filter(
+        PlayerTime.game_id == game.id
+    ).order_by(PlayerTime.enter_time.asc()).all()
+    first_ts = db.query(func.min(Statistic.timestamp)).filter(Statistic.game_id == game.id).scalar()
+    origin_candidates = [ts for ts in (game.date, first_ts) if ts is not None]
+    if stints:
+        origin_candidates.append(stints[0].enter_time)
+    # 统一为不带时区的时间（SQLite读取的时间不带时区）
+    origin_candidates = [ts.replace(tzinfo=None) for ts in origin_candidates]
+    origin = min(origin_candidates) if origin_candidates else datetime.now()
+
+    has_sub_stats = db.query(Statistic.id).filter(
+        Statistic.game_id == game.id,
+        Statistic.action_type.in_(["SUB_IN", "SUB_OUT"])
+    ).first() is not None
+
+    stat_stream = db.query(Statistic).filter(
+        Statistic.game_id == game.id
+    ).order_by(Statistic.timestamp.asc(), Statistic.id.asc()).yield_per(STREAM_BATCH_SIZE)
+
+    if has_sub_stats:
+        events = stat_stream
+    else:
+        sub_events = []
+        for stint in stints:
+            # 首发球员在开场时上场，不需要单独的上场事件
+            if stint.enter_time > origin:
+                sub_events.append(_SubEvent(stint.player_id, stint.quarter, "SUB_IN", stint.enter_time))
+            if stint.exit_time is not None:
+                sub_events.append(_SubEvent(stint.player_id, stint.quarter, "SUB_OUT", stint.exit_time))
+        # 同一时刻先下场再上场，保证阵容不超过5人
+        sub_events.sort(key=lambda e: (e.timestamp, e.action_type != "SUB_OUT"))
+        events = heapq.merge(stat_stream, sub_events, key=lambda e: e.timestamp)
+
+    def lineup(team_id: int, timestamp: datetime) -> List[str]:
+        on_court = []
+        for stint in stints:
+            player = players.get(stint.player_id)
+            if player is None or player.team_id != team_id:
+                continue
+            if stint.enter_time <= timestamp and (stint.exit_time is None or timestamp < stint.exit_time):
+                if player.name not in on_court:
+                    on_court.append(player.name)
+        on_court = on_court[:5]
+        return on_court + [""] * (5 - len(on_court))
+
+    home_score = 0
+    away_score = 0
+    play_id = 0
+    for event in events:
+        player = players.get(event.player_id)
+        if player is None or player.team_id not in (game.home_team_id, game.away_team_id):
+            continue
+        is_home = player.team_id == game.home_team_id
+        points = POINTS_BY_ACTION.get(event.action_type, 0)
+        if is_home:
+            home_score += points
+        else:
+            away_score += points
+
+        description = f"{player.name} {EVENT_DESCRIPTIONS.get(event.action_type, event.action_type)}"
+        for label, other_id in (("assisted by", event.assisted_by_player_id),
+                                ("rebounded by", event.rebounded_by_player_id)):
+            other = players.get(other_id) if other_id else None
+            if other is not None:
+                description += f" ({label} {other.name})"
+
+        yield [
+            game_name, date_str,
+            *lineup(game.home_team_id, event.timestamp),
+            *lineup(game.away_team_id, event.timestamp),
+            event.quarter,
+            _format_remaining(game, origin, event.timestamp),
+            home_score, away_score, play_id,
+            home_name if is_home else away_name,
+            "", "",
+            player.name,
+            EVENT_NAMES.get(event.action_type, event.action_type),
+            description,
+        ]
+        play_id += 1
+
+
+def _load_lookup(db: Session, team_ids: List[int], teams: Dict[int, Team], players: Dict[int, Player]) -> None:
+    """按需载入球队和球员（已载入的跳过）"""
+    missing = [team_id for team_id in team_ids if team_id not in teams]
+    if not missing:
+        return
+    for team in db.query(Team).filter(Team.id.in_(missing)).all():
+        teams[team.id] = team
+    for player in db.query(Player).filter(Player.team_id.in_(missing)).all():
+        players[player.id] = player
+
+
+def _encode_rows(rows: Iterator[List], header: bool, bom: bool) -> Iterator[str]:
+    """将行编码为CSV文本块"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if bom:
+        buffer.write("\ufeff")
+    if header:
+        writer.writerow(PLAY_BY_PLAY_COLUMNS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % 100 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_game_csv(db: Session, game: Game, bom: bool = False) -> Iterator[str]:
+    """生成单场比赛的CSV文本块"""
+    teams: Dict[int, Team] = {}
+    players: Dict[int, Player] = {}
+    _load_lookup(db, [game.home_team_id, game.away_team_id], teams, players)
+    yield from _encode_rows(iter_game_rows(db, game, teams, players), header=True, bom=bom)
+
+
+def stream_game_csv(game_id: int, bom: bool = False) -> Iterator[str]:
+    """供 StreamingResponse 使用的单场比赛CSV生成器
+
+    使用独立的数据库会话，不依赖请求级会话的生命周期。
+    """
+    db = SessionLocal()
+    try:
+        game = db.query(Game).filter(Game.id == game_id).first()
+        if game is None:
+            return
+        if game.archived_at is not None:
+            include_archive(db, game.league_id)
+        yield from iter_game_csv(db, game, bom=bom)
+    finally:
+        db.close()
+
+
+def stream_league_csv(league_id: int, season_type: Optional[SeasonType] = None,
+                      bom: bool = False) -> Iterator[str]:
+    """供 StreamingResponse 使用的联赛全部已结束比赛CSV生成器（只输出一次表头）
+
+    逐场读取，每场结束后清空会话，内存占用与联赛规模无关
+    （只保留球队和球员的名称映射）。
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Game.id).filter(
+            Game.league_id == league_id,
+            Game.status == GameStatus.FINISHED
+        )
+        if season_type is not None:
+            query = query.filter(Game.season_type == season_type)
+        game_ids = [row[0] for row in query.order_by(Game.date.asc(), Game.id.asc()).all()]
+        include_archive(db, league_id)
+
+        teams: Dict[int, Team] = {}
+        players: Dict[int, Player] = {}
+
+        def rows():
+            for game_id in game_ids:
+                game = db.query(Game).filter(Game.id == game_id).first()
+                if game is None:
+                    continue
+                _load_lookup(db, [game.home_team_id, game.away_team_id], teams, players)
+                yield from iter_game_rows(db, game, teams, players)
+                # 球队和球员对象在脱离会话后仍可读取已加载的属性
+                db.expunge_all()
+
+        yield from _encode_rows(rows(), header=True, bom=bom)
+    finally:
+        db.close()
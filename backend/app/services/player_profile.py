@@ -0,0 +1,239 @@
+"""球员赛季档案（赛季总计、场均、逐场数据、分项命中率和单场最高）
+
+替代前端 PlayerStatistics 拉取球员全部原始统计记录后自行累加的做法：
+统计记录、出场时间和双方比分都按比赛分组在数据库中汇总，
+返回的数据量与比赛场数成正比，而不是与事件条数成正比。
+已归档比赛的数据读取热数据库中的汇总（box_scores），不需要附加归档数据库。
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.box_score import BoxScore
+from app.models.game import Game, GameStatus, SeasonType
+from app.models.player import Player
+from app.models.player_time import PlayerTime
+from app.models.statistic import Statistic
+from app.models.team import Team
+from app.services.scoring import (
+    COUNTED_ACTIONS,
+    POINTS_BY_ACTION,
+    SHOT_ACTIONS,
+    box_score_line,
+    empty_counts,
+    percentage,
+)
+
+# 记录单场最高的统计项
+CAREER_HIGH_FIELDS = ["points", "reb", "ast", "stl", "blk", "fg3m", "eff"]
+
+
+def shooting_splits(line: Dict) -> Dict:
+    """根据一行技术统计计算各类命中率"""
+    return {
+        "fg_pct": percentage(line["fgm"], line["fga"]),
+        "fg2_pct": percentage(line["fg2m"], line["fg2a"]),
+        "fg3_pct": percentage(line["fg3m"], line["fg3a"]),
+        "ft_pct": percentage(line["ftm"], line["fta"]),
+        # 有效命中率、真实命中率
+        "efg_pct": percentage(line["fgm"] * 2 + line["fg3m"], line["fga"] * 2),
+        "ts_pct": percentage(line["points"], 2 * (line["fga"] + 0.44 * line["fta"])),
+    }
+
+
+def _per_game(line: Dict, games: int) -> Dict:
+    if not games:
+        return {key: 0.0 for key in line}
+    return {key: round(value / games, 1) for key, value in line.items()}
+
+
+def _summarize(rows: List[Dict]) -> Dict:
+    """汇总若干场比赛的数据：场数、总计、场均和命中率"""
+    counts = empty_counts()
+    seconds = 0.0
+    for row in rows:
+        for action, value in row["counts"].items():
+            counts[action] += value
+        seconds += row["seconds"]
+    totals = box_score_line(counts)
+    games = len(rows)
+    averages = _per_game(totals, games)
+    averages["minutes"] = round(seconds / 60 / games, 1) if games else 0.0
+    return {
+        "games": games,
+        "minutes": round(seconds / 60, 1),
+        "totals": totals,
+        "averages": averages,
+        "shooting": shooting_splits(totals),
+    }
+
+
+def _career_highs(game_log: List[Dict]) -> Dict:
+    """每个统计项的单场最高及对应比赛（并列时取较早的比赛）"""
+    highs = {}
+    for field in CAREER_HIGH_FIELDS:
+        best = None
+        for row in game_log:
+            value = row["line"][field]
+            if value > 0 and (best is None or value > best["value"]):
+                best = {"value": value, "game_id": row["game_id"], "date": row["date"]}
+        highs[field] = best
+    return highs
+
+
+def compute_player_profile(db: Session, player: Player, season_type: Optional[SeasonType] = None) -> Dict:
+    """计算球员赛季档案（只统计已结束的比赛）"""
+    game_filters = [
+        Game.status == GameStatus.FINISHED,
+        (Game.home_team_id == player.team_id) | (Game.away_team_id == player.team_id),
+    ]
+    if season_type is not None:
+        game_filters.append(Game.season_type == season_type)
+
+    # 已归档比赛的原始记录不在热数据库中（附加归档数据库时会出现在视图里），改为读取汇总
+    hot_filters = [*game_filters, Game.archived_at.is_(None)]
+
+    # 球员每场比赛的动作计数
+    counts_by_game: Dict[int, Dict[str, int]] = defaultdict(empty_counts)
+    count_rows = db.query(
+        Statistic.game_id, Statistic.action_type, func.count(Statistic.id)
+    ).join(
+        Game, Game.id == Statistic.game_id
+    ).filter(
+        Statistic.player_id == player.id,
+        Statistic.action_type.in_(COUNTED_ACTIONS),
+        *hot_filters
+    ).group_by(Statistic.game_id, Statistic.action_type).all()
+    for game_id, action_type, count in count_rows:
+        counts_by_game[game_id][action_type] += count
+
+    # 球员每场比赛的出场时间
+    seconds_by_game = dict(
+        db.query(PlayerTime.game_id, func.sum(PlayerTime.duration_seconds)).join(
+            Game, Game.id == PlayerTime.game_id
+        ).filter(
+            PlayerTime.player_id == player.id, *hot_filters
+        ).group_by(PlayerTime.game_id).all()
+    )
+
+    archived_rows = db.query(BoxScore.game_id, BoxScore.counts, BoxScore.seconds).join(
+        Game, Game.id == BoxScore.game_id
+    ).filter(
+        BoxScore.player_id == player.id, Game.archived_at.isnot(None), *game_filters
+    ).all()
+    for game_id, counts, seconds in archived_rows:
+        for action_type, count in counts.items():
+            if action_type in COUNTED_ACTIONS:
+                counts_by_game[game_id][action_type] += count
+        if not any(counts_by_game[game_id].values()):
+            del counts_by_game[game_id]  # 只有出场时间，与未归档比赛的处理一致
+        seconds_by_game[game_id] = seconds
+
+    # 有技术统计或出场时间的比赛才算出场
+    played_ids = set(counts_by_game) | {gid for gid, secs in seconds_by_game.items() if secs}
+    games = db.query(Game).filter(Game.id.in_(played_ids)).order_by(
+        Game.date.asc(), Game.id.asc()
+    ).all() if played_ids else []
+
+    # 这些比赛中双方球队的得分（按比赛和球队分组）
+    scores: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    hot_ids = [game.id for game in games if game.archived_at is None]
+    archived_ids = [game.id for game in games if game.archived_at is not None]
+    if hot_ids:
+        score_rows = db.query(
+            Statistic.game_id, Player.team_id, Statistic.action_type, func.count(Statistic.id)
+        ).join(
+            Player, Player.id == Statistic.player_id
+        ).filter(
+            Statistic.game_id.in_(hot_ids),
+            Statistic.action_type.in_(list(POINTS_BY_ACTION.keys()))
+        ).group_by(Statistic.game_id, Player.team_id, Statistic.action_type).all()
+        for game_id, team_id, action_type, count in score_rows:
+            scores[game_id][team_id] += POINTS_BY_ACTION[action_type] * count
+    if archived_ids:
+        for game_id, team_id, counts in db.query(BoxScore.game_id, BoxScore.team_id, BoxScore.counts).filter(
+            BoxScore.game_id.in_(archived_ids)
+        ).all():
+            scores[game_id][team_id] += sum(
+                POINTS_BY_ACTION[action_type] * count
+                for action_type, count in counts.items() if action_type in POINTS_BY_ACTION
+            )
+
+    opponent_ids = {
+        game.away_team_id if game.home_team_id == player.team_id else game.home_team_id
+        for game in games
+    }
+    team_names = dict(
+        db.query(Team.id, Team.name).filter(Team.id.in_(opponent_ids)).all()
+    ) if opponent_ids else {}
+
+    game_log = []
+    for game in games:
+        is_home = game.home_team_id == player.team_id
+        opponent_id = game.away_team_id if is_home else game.home_team_id
+        team_score = scores[game.id][player.team_id]
+        opponent_score = scores[game.id][opponent_id]
+        counts = counts_by_game.get(game.id) or empty_counts()
+        seconds = float(seconds_by_game.get(game.id) or 0)
+        game_log.append({
+            "game_id": game.id,
+            "date": game.date.isoformat() if game.date else None,
+            "season_type": game.season_type.value if game.season_type else None,
+            "home": is_home,
+            "opponent_id": opponent_id,
+            "opponent_name": team_names.get(opponent_id, ""),
+            "team_score": team_score,
+            "opponent_score": opponent_score,
+            "result": "W" if team_score > opponent_score else ("L" if team_score < opponent_score else "T"),
+            "minutes": round(seconds / 60, 1),
+            "line": box_score_line(counts),
+            "counts": counts,
+            "seconds": seconds,
+        })
+
+    splits = {
+        "home": _summarize([row for row in game_log if row["home"]]),
+        "away": _summarize([row for row in game_log if not row["home"]]),
+        "wins": _summarize([row for row in game_log if row["result"] == "W"]),
+        "losses": _summarize([row for row in game_log if row["result"] == "L"]),
+    }
+    season = _summarize(game_log)
+    career_highs = _career_highs(game_log)
+
+    # 内部字段不返回
+    for row in game_log:
+        del row["counts"]
+        del row["seconds"]
+
+    return {
+        "player_id": player.id,
+        "player_name": player.name,
+        "player_number": player.number,
+        "team_id": player.team_id,
+        "season_type": season_type.value if season_type else None,
+        **season,
+        "splits": splits,
+        "career_highs": career_highs,
+        "game_log": game_log,
+    }
+
+
+def player_shots(db: Session, player: Player, season_type: Optional[SeasonType] = None) -> List[List]:
+    """球员所有带坐标的投篮点位 [x, y, 是否命中, 是否三分]（投篮热区图使用）"""
+    query = db.query(
+        Statistic.shot_x, Statistic.shot_y, Statistic.action_type
+    ).join(
+        Game, Game.id == Statistic.game_id
+    ).filter(
+        Statistic.player_id == player.id,
+        Statistic.action_type.in_(SHOT_ACTIONS),
+        Statistic.shot_x.isnot(None),
+        Statistic.shot_y.isnot(None),
+        Game.status == GameStatus.FINISHED,
+    )
+    if season_type is not None:
+        query = query.filter(Game.season_type == season_type)
+    return [
+        [x, y, action in ("2PM", "3PM"), action.startswith("3")]
+        for x, y, action in query.all()
+    ]
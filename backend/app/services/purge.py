@@ -0,0 +1,182 @@
+"""已删除比赛、球队和球员的后台清理
+
+删除接口只写入 deleted_at 并立即返回（查询过滤见 app/database/soft_delete.py），
+本模块在后台线程中分批物理删除这些记录：每批最多 PURGE_BATCH_ROWS 行、单独一个事务，
+批与批之间暂停 PURGE_BATCH_PAUSE_MS，写锁每次只持有一条 DELETE 的时间，
+录入统计的请求不会被大批量删除阻塞。
+
+删除顺序：已删除比赛/球员的统计记录、出场时间、出场球员、归档汇总和比分
+-> 没有剩余记录的比赛 -> 球员 -> 没有剩余球员和比赛的球队。
+中途中断（服务重启）不影响数据一致性，下次执行时继续。
+删除了已归档的比赛时，最后清理归档数据库中这些比赛的记录。
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database.base import engine
+
+logger = logging.getLogger(__name__)
+
+_DELETED_GAMES = "SELECT id FROM games WHERE deleted_at IS NOT NULL"
+_DELETED_PLAYERS = "SELECT id FROM players WHERE deleted_at IS NOT NULL"
+
+# (表, 条件)：按顺序执行，每一步删完再进行下一步
+PURGE_STEPS = (
+    ("statistics", f"game_id IN ({_DELETED_GAMES})"),
+    ("player_times", f"game_id IN ({_DELETED_GAMES})"),
+    ("game_players", f"game_id IN ({_DELETED_GAMES})"),
+    ("box_scores", f"game_id IN ({_DELETED_GAMES})"),
+    ("game_results", f"game_id IN ({_DELETED_GAMES})"),
+    ("statistics", f"player_id IN ({_DELETED_PLAYERS})"),
+    ("player_times", f"player_id IN ({_DELETED_PLAYERS})"),
+    ("game_players", f"player_id IN ({_DELETED_PLAYERS})"),
+    ("box_scores", f"player_id IN ({_DELETED_PLAYERS})"),
+    # 比赛、球员和球队只在没有剩余记录时删除（上面几步执行期间又被删除的，留到下次）
+    ("games", "deleted_at IS NOT NULL"
+              " AND NOT EXISTS (SELECT 1 FROM statistics WHERE game_id = games.id)"
+              " AND NOT EXISTS (SELECT 1 FROM player_times WHERE game_id = games.id)"
+              " AND NOT EXISTS (SELECT 1 FROM game_players WHERE game_id = games.id)"
+              " AND NOT EXISTS (SELECT 1 FROM box_scores WHERE game_id = games.id)"),
+    ("players", "deleted_at IS NOT NULL"
+                " AND NOT EXISTS (SELECT 1 FROM statistics WHERE player_id = players.id)"
+                " AND NOT EXISTS (SELECT 1 FROM player_times WHERE player_id = players.id)"
+                " AND NOT EXISTS (SELECT 1 FROM game_players WHERE player_id = players.id)"
+                " AND NOT EXISTS (SELECT 1 FROM box_scores WHERE player_id = players.id)"),
+    ("teams", "deleted_at IS NOT NULL"
+              " AND NOT EXISTS (SELECT 1 FROM players WHERE team_id = teams.id)"
+              " AND NOT EXISTS (SELECT 1 FROM games WHERE home_team_id = teams.id)"
+              " AND NOT EXISTS (SELECT 1 FROM games WHERE away_team_id = teams.id)"),
+)
+
+
+def soft_delete_games(db: Session, game_ids: Iterable[int]) -> Dict[str, int]:
+    """标记比赛已删除并移除积分榜比分，由调用方提交事务
+
+    返回等待清理的统计记录和出场时间数量（必须在标记之前统计，标记后这些记录已被过滤）。
+    """
+    from app.database.soft_delete import mark_pending
+    from app.models.game import Game
+    from app.models.player_time import PlayerTime
+    from app.models.statistic import Statistic
+    from app.services.standings import remove_game_results
+
+    game_ids = list(game_ids)
+    if not game_ids:
+        return {"statistics": 0, "player_times": 0}
+    counts = {
+        "statistics": db.query(func.count(Statistic.id)).filter(Statistic.game_id.in_(game_ids)).scalar(),
+        "player_times": db.query(func.count(PlayerTime.id)).filter(PlayerTime.game_id.in_(game_ids)).scalar(),
+    }
+    mark_pending()
+    db.query(Game).filter(Game.id.in_(game_ids)).update({Game.deleted_at: datetime.now()}, synchronize_session=False)
+    remove_game_results(db, game_ids)
+    return counts
+
+
+def soft_delete_team(db: Session, team) -> None:
+    """标记球队及其球员已删除，由调用方提交事务（相关比赛先用 soft_delete_games 标记）"""
+    from app.database.soft_delete import mark_pending
+    from app.models.player import Player
+
+    mark_pending()
+    now = datetime.now()
+    db.query(Player).filter(Player.team_id == team.id).update({Player.deleted_at: now}, synchronize_session=False)
+    team.deleted_at = now
+
+
+def pending_deletions(db: Session) -> Dict[str, int]:
+    """等待清理的比赛、球队和球员数量"""
+    return {
+        table: db.execute(text(f"SELECT COUNT(*) FROM {table} WHERE deleted_at IS NOT NULL")).scalar()
+        for table in ("games", "teams", "players")
+    }
+
+
+def purge_deleted(batch_rows: Optional[int] = None, stop: Optional[threading.Event] = None) -> Dict[str, int]:
+    """分批物理删除已软删除的记录，返回各表删除的行数（stop 被设置时在当前批完成后停止）"""
+    from app.database.soft_delete import refresh_pending
+    from app.services.archive import purge_archive_orphans
+
+    batch_rows = batch_rows or settings.PURGE_BATCH_ROWS
+    pause = settings.PURGE_BATCH_PAUSE_MS / 1000
+    result: Dict[str, int] = {}
+    with engine.connect() as conn:
+        archived = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM games WHERE deleted_at IS NOT NULL AND archived_at IS NOT NULL)"
+        )).scalar()
+    for table, condition in PURGE_STEPS:
+        statement = text(
+            f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {condition} LIMIT :limit)"
+        )
+        while stop is None or not stop.is_set():
+            with engine.begin() as conn:
+                deleted = conn.execute(statement, {"limit": batch_rows}).rowcount
+            if deleted:
+                result[table] = result.get(table, 0) + deleted
+            if deleted < batch_rows:
+                break
+            time.sleep(pause)
+    if stop is not None and stop.is_set():
+        return result
+    if archived:
+        for table, count in purge_archive_orphans().items():
+            if count:
+                result[f"archive.{table}"] = count
+    # 全部清理完成后查询不再需要排除已删除的记录
+    with engine.connect() as conn:
+        refresh_pending(conn)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 后台线程
+# ---------------------------------------------------------------------------
+
+_wakeup = threading.Event()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def request_purge() -> None:
+    """删除请求提交后唤醒清理线程（未启动时等待下次定时执行或 purge_deleted.py）"""
+    _wakeup.set()
+
+
+def _run() -> None:
+    while not _stop.is_set():
+        _wakeup.wait(settings.PURGE_INTERVAL_SECONDS)
+        _wakeup.clear()
+        if _stop.is_set():
+            break
+        try:
+            result = purge_deleted(stop=_stop)
+            if result:
+                logger.info("已清理删除的记录: %s", result)
+        except SQLAlchemyError:
+            # 数据库忙或尚未迁移时跳过，下次继续
+            logger.warning("清理已删除的记录失败", exc_info=True)
+
+
+def start_purger() -> None:
+    """服务启动时启动清理线程，并先清理一次上次未完成的删除（PURGE_INTERVAL_SECONDS 为0时不启动）"""
+    global _thread
+    if settings.PURGE_INTERVAL_SECONDS <= 0 or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _wakeup.set()
+    _thread = threading.Thread(target=_run, name="purger", daemon=True)
+    _thread.start()
+
+
+def stop_purger() -> None:
+    """停止清理线程（等待当前批完成）"""
+    _stop.set()
+    _wakeup.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
@@ -0,0 +1,136 @@
+"""分节技术统计（按节汇总球队和球员数据）
+
+每场比赛或每个联赛只执行一次 GROUP BY 查询（球员 × 节 × 动作类型 计数），
+球队数据由球员数据汇总得到，不需要读取原始统计记录。
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.game import Game, SeasonType
+from app.models.player import Player
+from app.models.statistic import Statistic
+from app.models.team import Team
+from app.services.scoring import COUNTED_ACTIONS, box_score_line, empty_counts
+
+
+def _grouped_counts_query(db: Session):
+    """球员 × 节 × 动作类型 的计数查询（调用方追加过滤条件）"""
+    return db.query(
+        Statistic.player_id,
+        Player.team_id,
+        Statistic.quarter,
+        Statistic.action_type,
+        func.count(Statistic.id),
+    ).join(
+        Player, Player.id == Statistic.player_id
+    ).filter(
+        Statistic.action_type.in_(COUNTED_ACTIONS)
+    ).group_by(
+        Statistic.player_id, Player.team_id, Statistic.quarter, Statistic.action_type
+    )
+
+
+def _build_splits(
+    rows: Iterable[Tuple[int, int, int, str, int]],
+    teams: Dict[int, Team],
+    players: Dict[int, Player],
+    min_quarters: int = 4,
+) -> Dict:
+    """将分组计数转换为球队/球员的分节技术统计"""
+    team_counts: Dict[int, Dict[int, Dict[str, int]]] = defaultdict(lambda: defaultdict(empty_counts))
+    player_counts: Dict[int, Dict[int, Dict[str, int]]] = defaultdict(lambda: defaultdict(empty_counts))
+    max_quarter = min_quarters
+    for player_id, team_id, quarter, action_type, count in rows:
+        if team_id not in teams:
+            continue
+        team_counts[team_id][quarter][action_type] += count
+        player_counts[player_id][quarter][action_type] += count
+        max_quarter = max(max_quarter, quarter)
+    quarters = list(range(1, max_quarter + 1))
+
+    def split_lines(by_quarter: Dict[int, Dict[str, int]]) -> Tuple[List[Dict], Dict]:
+        totals = empty_counts()
+        lines = []
+        for quarter in quarters:
+            counts = by_quarter.get(quarter) or empty_counts()
+            for action, value in counts.items():
+                totals[action] += value
+            lines.append({"quarter": quarter, **box_score_line(counts)})
+        return lines, box_score_line(totals)
+
+    team_rows = []
+    for team_id, team in teams.items():
+        lines, totals = split_lines(team_counts.get(team_id, {}))
+        team_rows.append({"team_id": team_id, "team_name": team.name, "quarters": lines, "totals": totals})
+
+    player_rows = []
+    for player_id, by_quarter in player_counts.items():
+        player = players.get(player_id)
+        if player is None:
+            continue
+        lines, totals = split_lines(by_quarter)
+        player_rows.append({
+            "player_id": player_id,
+            "player_name": player.name,
+            "player_number": player.number,
+            "team_id": player.team_id,
+            "quarters": lines,
+            "totals": totals,
+        })
+    player_rows.sort(key=lambda row: (row["team_id"], -row["totals"]["points"], row["player_number"]))
+
+    return {"quarters": quarters, "teams": team_rows, "players": player_rows}
+
+
+def game_quarter_splits(db: Session, game: Game) -> Dict:
+    """单场比赛的分节技术统计（主队在前）"""
+    team_ids = [game.home_team_id, game.away_team_id]
+    team_list = db.query(Team).filter(Team.id.in_(team_ids)).all()
+    teams = {team.id: team for team in sorted(team_list, key=lambda t: team_ids.index(t.id))}
+    players = {
+        player.id: player
+        for player in db.query(Player).filter(Player.team_id.in_(team_ids)).all()
+    }
+    rows = _grouped_counts_query(db).filter(Statistic.game_id == game.id).all()
+    return {"game_id": game.id, **_build_splits(rows, teams, players, game.quarters or 4)}
+
+
+def league_quarter_splits(db: Session, league_id: int, season_type: Optional[SeasonType] = None) -> Dict:
+    """联赛的分节技术统计（所有比赛累计，附带每队比赛场数便于计算场均）"""
+    teams = {
+        team.id: team
+        for team in db.query(Team).filter(Team.league_id == league_id).order_by(Team.id.asc()).all()
+    }
+    players = {
+        player.id: player
+        for player in db.query(Player).filter(Player.team_id.in_(list(teams.keys()))).all()
+    }
+
+    game_filters = [Game.league_id == league_id]
+    if season_type is not None:
+        game_filters.append(Game.season_type == season_type)
+
+    rows = _grouped_counts_query(db).join(
+        Game, Game.id == Statistic.game_id
+    ).filter(*game_filters).all()
+    splits = _build_splits(rows, teams, players)
+
+    # 每队有统计数据的比赛场数
+    games_by_team = dict(
+        db.query(Player.team_id, func.count(func.distinct(Statistic.game_id))).select_from(
+            Statistic
+        ).join(
+            Player, Player.id == Statistic.player_id
+        ).join(
+            Game, Game.id == Statistic.game_id
+        ).filter(*game_filters).group_by(Player.team_id).all()
+    )
+    for team_row in splits["teams"]:
+        team_row["games"] = games_by_team.get(team_row["team_id"], 0)
+
+    return {
+        "league_id": league_id,
+        "season_type": season_type.value if season_type else None,
+        **splits,
+    }
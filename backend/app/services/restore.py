@@ -0,0 +1,304 @@
+"""数据库恢复与校验
+
+- verify_database：PRAGMA integrity_check、各表行数、最近事件时间（最后一条技术统计、
+  最后一次上场记录、最后创建/更新的比赛）和迁移版本，用于判断备份是否可用、包含到什么时候；
+- restore_points：列出可以恢复到的时间点（完整备份、WAL归档每一代的快照和片段）；
+- restore_backup：从完整备份，或一代的快照加WAL片段，恢复到新文件。指定 until 时只重放
+  在该时间之前归档的片段，精度为归档间隔（backup_db.py --incremental --watch 的秒数）。
+  先写入同目录的临时文件，校验通过并 fsync 后重命名为目标文件，中途失败不会留下不完整的数据库；
+- find_restore_point：为指定时间点选择最合适的来源（晚于完整备份的WAL归档优先）。
+"""
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.backup import (
+    BACKUP_NAME_PATTERN, COPY_CHUNK_SIZE, GENERATION_PATTERN, WAL_FRAME_HEADER_SIZE, WAL_HEADER_SIZE, BackupError
+)
+
+# 最近事件时间：键 -> (表, 查询)；旧版本的备份缺少的表或列跳过
+LAST_EVENT_QUERIES = {
+    "statistic": ("statistics", "SELECT MAX(created_at) FROM statistics"),
+    "player_time": ("player_times", "SELECT MAX(COALESCE(exit_time, enter_time)) FROM player_times"),
+    "game_created": ("games", "SELECT MAX(created_at) FROM games"),
+    "game_updated": ("games", "SELECT MAX(updated_at) FROM games"),
+}
+INTEGRITY_ERRORS_KEEP = 20
+
+
+def _decompress_file(source: Path, target: Path) -> None:
+    opener = gzip.open if source.suffix == ".gz" else open
+    with opener(source, "rb") as src, open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+
+def _fsync_file(path: Path) -> None:
+    with open(path, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_directory(path: Path) -> None:
+    """确保重命名已写入磁盘（Windows 不支持打开目录，跳过）"""
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def verify_database(path: Path, check: Optional[str] = "full", live: bool = False) -> Dict:
+    """校验数据库文件并统计各表行数和最近事件时间
+
+    check 为 "full" 时执行 integrity_check，"quick" 时执行 quick_check（不校验索引内容），
+    为None时只统计（用于与当前数据库对比）。备份文件以 immutable 方式只读打开，
+    不创建 -wal/-shm 文件；live=True 表示正在使用的数据库，需要读取其WAL。
+    """
+    path = Path(path).resolve()
+    start = time.perf_counter()
+    conn = sqlite3.connect(f"{path.as_uri()}?{'mode=ro' if live else 'immutable=1'}", uri=True)
+    try:
+        result: Dict = {"path": str(path), "size": path.stat().st_size}
+        if check:
+            pragma = "integrity_check" if check == "full" else "quick_check"
+            rows = [row[0] for row in conn.execute(f"PRAGMA {pragma}({INTEGRITY_ERRORS_KEEP})")]
+            result["integrity"] = rows if rows != ["ok"] else "ok"
+            result["ok"] = rows == ["ok"]
+            result["check_seconds"] = round(time.perf_counter() - start, 3)
+
+        tables = [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+        ]
+        result["tables"] = {name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for name in tables}
+
+        last_events = {}
+        for key, (table, query) in LAST_EVENT_QUERIES.items():
+            if table not in result["tables"]:
+                continue
+            try:
+                last_events[key] = conn.execute(query).fetchone()[0]
+            except sqlite3.OperationalError:
+                continue
+        result["last_events"] = last_events
+        result["schema_version"] = (
+            conn.execute("SELECT version_num FROM alembic_version").fetchone()[0]
+            if "alembic_version" in result["tables"] else None
+        )
+    finally:
+        conn.close()
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 恢复时间点
+# ---------------------------------------------------------------------------
+
+def _backup_time(path: Path) -> datetime:
+    """完整备份的时间（文件名中的时间戳）"""
+    return datetime.strptime(path.name[len("basketball_"):len("basketball_") + 15], "%Y%m%d_%H%M%S")
+
+
+def _generation_segments(generation_dir: Path) -> List[Tuple[Path, datetime]]:
+    """一代中的WAL片段及其中事务的最晚提交时间（没有索引记录时使用文件修改时间）"""
+    recorded = {}
+    index_path = generation_dir / "wal" / "index.jsonl"
+    if index_path.exists():
+        for line in index_path.read_text(encoding="utf-8").splitlines():
+            try:
+                item = json.loads(line)
+                recorded[item["segment"]] = datetime.fromisoformat(item["committed_before"])
+            except (ValueError, KeyError):
+                continue
+    return [
+        (path, recorded.get(path.name) or datetime.fromtimestamp(path.stat().st_mtime))
+        for path in sorted((generation_dir / "wal").glob("*.wal.gz"))
+    ]
+
+
+def _snapshot_time(generation_dir: Path) -> datetime:
+    try:
+        meta = json.loads((generation_dir / "generation.json").read_text(encoding="utf-8"))
+        return datetime.fromisoformat(meta["snapshot_at"])
+    except (FileNotFoundError, ValueError, KeyError):
+        return datetime.strptime(generation_dir.name, "%Y%m%d_%H%M%S_%f")
+
+
+def _full_backups() -> List[Path]:
+    backup_dir = Path(settings.BACKUP_DIR)
+    if not backup_dir.exists():
+        return []
+    return sorted(path for path in backup_dir.iterdir() if BACKUP_NAME_PATTERN.match(path.name))
+
+
+def _generations() -> List[Path]:
+    wal_dir = Path(settings.BACKUP_WAL_DIR)
+    if not wal_dir.exists():
+        return []
+    return sorted(
+        path for path in wal_dir.iterdir()
+        if path.is_dir() and GENERATION_PATTERN.match(path.name) and (path / "snapshot.db.gz").exists()
+    )
+
+
+def restore_points() -> Dict:
+    """可以恢复到的时间点"""
+    generations = []
+    for path in _generations():
+        segments = _generation_segments(path)
+        snapshot_at = _snapshot_time(path)
+        generations.append({
+            "path": str(path),
+            "snapshot_at": snapshot_at.isoformat(sep=" ", timespec="seconds"),
+            "segments": len(segments),
+            "latest": (segments[-1][1] if segments else snapshot_at).isoformat(sep=" ", timespec="seconds"),
+        })
+    return {
+        "backups": [
+            {"path": str(path), "time": _backup_time(path).isoformat(sep=" ", timespec="seconds")}
+            for path in _full_backups()
+        ],
+        "generations": generations,
+    }
+
+
+def find_restore_point(until: datetime) -> Tuple[Path, datetime]:
+    """为时间点 until 选择来源，返回 (备份文件或一代目录, 实际能恢复到的时间)"""
+    candidates: List[Tuple[datetime, Path]] = [
+        (_backup_time(path), path) for path in _full_backups() if _backup_time(path) <= until
+    ]
+    for path in _generations():
+        snapshot_at = _snapshot_time(path)
+        if snapshot_at <= until:
+            times = [committed for _, committed in _generation_segments(path) if committed <= until]
+            candidates.append((max(times, default=snapshot_at), path))
+    if not candidates:
+        raise BackupError(f"没有早于 {until.isoformat(sep=' ', timespec='seconds')} 的备份")
+    # 同一时间优先使用WAL归档（一代目录）
+    effective, path = max(candidates, key=lambda item: (item[0], item[1].is_dir()))
+    return path, effective
+
+
+# ---------------------------------------------------------------------------
+# 恢复
+# ---------------------------------------------------------------------------
+
+def _apply_wal_segment(segment: Path, db_file) -> int:
+    """按顺序把片段中的页写入数据库文件，遇到提交帧时按提交后的页数截断，返回帧数"""
+    count = 0
+    with gzip.open(segment, "rb") as f:
+        header = f.read(WAL_HEADER_SIZE)
+        page_size = struct.unpack(">I", header[8:12])[0]
+        frame_size = WAL_FRAME_HEADER_SIZE + page_size
+        while True:
+            frame = f.read(frame_size)
+            if len(frame) < frame_size:
+                break
+            page_no, commit_size = struct.unpack(">2I", frame[:8])
+            db_file.seek((page_no - 1) * page_size)
+            db_file.write(frame[WAL_FRAME_HEADER_SIZE:])
+            if commit_size:
+                db_file.truncate(commit_size * page_size)
+            count += 1
+    return count
+
+
+def restore_backup(source: Path, target: Path, until: Optional[datetime] = None, check: str = "full") -> Dict:
+    """从完整备份文件或WAL归档的一代目录恢复到 target（target 不能已存在）
+
+    返回恢复到的时间点、重放的片段数、校验结果和各阶段耗时；
+    指定的时间点晚于来源中最后一次归档时，missing_seconds 为两者相差的秒数（这段时间的提交没有恢复）。
+    """
+    source = Path(source)
+    target = Path(target).resolve()
+    if target.exists():
+        raise BackupError(f"目标文件已存在: {target}")
+    if not source.exists():
+        raise BackupError(f"备份不存在: {source}")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.restoring")
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    segments_applied = 0
+    frames = 0
+    try:
+        if source.is_dir():
+            snapshot = source / "snapshot.db.gz"
+            if not snapshot.exists():
+                raise BackupError(f"{source} 中没有快照")
+            restored_to = _snapshot_time(source)
+            if until is not None and restored_to > until:
+                raise BackupError(f"该代的快照晚于指定时间点（{restored_to.isoformat(sep=' ', timespec='seconds')}）")
+            _decompress_file(snapshot, tmp)
+            timings["extract"] = time.perf_counter() - start
+
+            step = time.perf_counter()
+            with open(tmp, "r+b") as db_file:
+                for segment, committed_before in _generation_segments(source):
+                    if until is not None and committed_before > until:
+                        break
+                    frames += _apply_wal_segment(segment, db_file)
+                    segments_applied += 1
+                    restored_to = committed_before
+            timings["replay"] = time.perf_counter() - step
+        else:
+            restored_to = _backup_time(source) if BACKUP_NAME_PATTERN.match(source.name) else None
+            if until is not None and restored_to is not None and restored_to > until:
+                raise BackupError("该备份晚于指定时间点")
+            _decompress_file(source, tmp)
+            timings["extract"] = time.perf_counter() - start
+
+        step = time.perf_counter()
+        verification = verify_database(tmp, check=check)
+        timings["verify"] = time.perf_counter() - step
+        if not verification["ok"]:
+            raise BackupError(f"恢复后的数据库校验失败: {verification['integrity']}")
+
+        step = time.perf_counter()
+        _fsync_file(tmp)
+        os.replace(tmp, target)
+        _fsync_directory(target.parent)
+        timings["sync"] = time.perf_counter() - step
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    timings["total"] = time.perf_counter() - start
+    verification["path"] = str(target)
+    missing_seconds = 0.0
+    if until is not None and restored_to is not None and until > restored_to:
+        missing_seconds = (until - restored_to).total_seconds()
+    return {
+        "source": str(source),
+        "target": str(target),
+        "restored_to": restored_to.isoformat(sep=" ", timespec="seconds") if restored_to else None,
+        "segments": segments_applied,
+        "frames": frames,
+        "missing_seconds": round(missing_seconds, 1),
+        "verification": verification,
+        "timings": {name: round(seconds, 3) for name, seconds in timings.items()},
+    }
+
+
+def verify_backup(source: Path, until: Optional[datetime] = None, check: str = "full") -> Dict:
+    """校验备份：未压缩的数据库文件直接校验，其他情况先恢复到临时文件"""
+    source = Path(source)
+    if source.is_file() and source.suffix == ".db":
+        return verify_database(source, check=check)
+    with tempfile.TemporaryDirectory(dir=source.parent, prefix=".verify_") as directory:
+        result = restore_backup(source, Path(directory) / "verify.db", until=until, check=check)
+        result["verification"]["path"] = str(source)
+        return {
+            **result["verification"], "restored_to": result["restored_to"],
+            "missing_seconds": result["missing_seconds"], "timings": result["timings"],
+        }
@@ -0,0 +1,57 @@
+"""抓取 /metrics 时补充的即时指标：数据库连接池、各状态的比赛数、后台任务队列"""
+import logging
+from typing import Iterable, List
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from app.core.prometheus import Sample, registry
+from app.database.base import SessionLocal
+from app.models.game import Game, GameStatus
+from app.services.jobs import job_queue_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_samples(engine: Engine) -> Iterable[Sample]:
+    pool = engine.pool
+    samples: List[Sample] = []
+    for name, method, documentation in (
+        ("db_pool_size", "size", "连接池大小"),
+        ("db_pool_checked_out", "checkedout", "正在使用的数据库连接数"),
+        ("db_pool_checked_in", "checkedin", "空闲的数据库连接数"),
+        ("db_pool_overflow", "overflow", "超出连接池大小的连接数"),
+    ):
+        getter = getattr(pool, method, None)
+        if getter is not None:
+            samples.append((name, "gauge", documentation, [({}, getter())]))
+    return samples
+
+
+def _game_samples() -> Iterable[Sample]:
+    db = SessionLocal()
+    try:
+        counts = dict(db.query(Game.status, func.count(Game.id)).group_by(Game.status).all())
+    except Exception:
+        logger.warning("无法统计比赛状态", exc_info=True)
+        return []
+    finally:
+        db.close()
+    return [(
+        "games", "gauge", "各状态的比赛数（status=live 为进行中的比赛）",
+        [({"status": status.value}, counts.get(status, 0)) for status in GameStatus],
+    )]
+
+
+def _job_samples() -> Iterable[Sample]:
+    stats = job_queue_stats()
+    return [
+        ("jobs_in_queue", "gauge", "后台任务队列中的任务数",
+         [({"state": state}, stats[state]) for state in ("queued", "running")]),
+        ("job_workers", "gauge", "后台任务工作线程数", [({}, stats["workers"])]),
+    ]
+
+
+def install_runtime_collectors(engine: Engine) -> None:
+    """注册抓取时的指标回调"""
+    registry.register_collector(lambda: _pool_samples(engine))
+    registry.register_collector(_game_samples)
+    registry.register_collector(_job_samples)
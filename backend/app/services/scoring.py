@@ -0,0 +1,120 @@
+"""比分与技术统计计算（纯函数，不访问数据库）"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+# 得分动作对应的分值
+POINTS_BY_ACTION = {"2PM": 2, "3PM": 3, "FTM": 1}
+
+# 计数类动作（与前端 PlayerStatsTable / GameReport 保持一致）
+COUNTED_ACTIONS = [
+    "2PM", "2PA", "3PM", "3PA", "FTM", "FTA",
+    "OREB", "DREB", "AST", "STL", "BLK", "TOV", "PF", "PFD",
+]
+
+SHOT_ACTIONS = ["2PM", "2PA", "3PM", "3PA"]
+
+
+def empty_counts() -> Dict[str, int]:
+    """创建空的动作计数字典"""
+    return {action: 0 for action in COUNTED_ACTIONS}
+
+
+def box_score_line(counts: Dict[str, int]) -> Dict[str, int]:
+    """根据动作计数生成一行技术统计
+
+    说明：2PA/3PA/FTA 表示未命中的出手（与CSV导入和前端一致），
+    所以出手数 = 命中 + 未命中。
+
+    Args:
+        counts: 动作类型 -> 次数
+
+    Returns:
+        包含得分、投篮、篮板、EFF等字段的字典
+    """
+    fg2m = counts.get("2PM", 0)
+    fg2a = fg2m + counts.get("2PA", 0)
+    fg3m = counts.get("3PM", 0)
+    fg3a = fg3m + counts.get("3PA", 0)
+    ftm = counts.get("FTM", 0)
+    fta = ftm + counts.get("FTA", 0)
+    fgm = fg2m + fg3m
+    fga = fg2a + fg3a
+    oreb = counts.get("OREB", 0)
+    dreb = counts.get("DREB", 0)
+    reb = oreb + dreb
+    ast = counts.get("AST", 0)
+    stl = counts.get("STL", 0)
+    blk = counts.get("BLK", 0)
+    tov = counts.get("TOV", 0)
+    pf = counts.get("PF", 0)
+    pfd = counts.get("PFD", 0)
+    points = fg2m * 2 + fg3m * 3 + ftm
+
+    eff = (points + reb + ast + stl + blk) - ((fga - fgm) + (fta - ftm) + tov)
+    pir = (points + reb + ast + stl + blk + pfd) - ((fga - fgm) + (fta - ftm) + tov + pf)
+
+    return {
+        "points": points,
+        "fgm": fgm, "fga": fga,
+        "fg2m": fg2m, "fg2a": fg2a,
+        "fg3m": fg3m, "fg3a": fg3a,
+        "ftm": ftm, "fta": fta,
+        "oreb": oreb, "dreb": dreb, "reb": reb,
+        "ast": ast, "stl": stl, "blk": blk,
+        "tov": tov, "pf": pf, "pfd": pfd,
+        "eff": eff, "pir": pir,
+    }
+
+
+def format_minutes(total_seconds: float) -> str:
+    """将秒数格式化为 M:SS"""
+    total_seconds = int(total_seconds or 0)
+    return f"{total_seconds // 60}:{total_seconds % 60:02d}"
+
+
+def percentage(made: int, attempted: int) -> float:
+    """命中率（百分比，保留一位小数）"""
+    if not attempted:
+        return 0.0
+    return round(made * 100.0 / attempted, 1)
+
+
+def build_score_flow(
+    events: Iterable,
+    home_player_ids: Set[int],
+    away_player_ids: Set[int],
+    origin: Optional[datetime] = None,
+) -> List[Dict]:
+    """按时间顺序累计比分，生成得分曲线
+
+    Args:
+        events: 已按时间戳排序的统计记录（需要 player_id/action_type/timestamp/quarter 属性）
+        home_player_ids: 主队球员ID集合
+        away_player_ids: 客队球员ID集合
+        origin: 计时起点，默认使用第一条记录的时间戳
+
+    Returns:
+        [{"elapsed": 秒, "quarter": 节, "home": 主队比分, "away": 客队比分}, ...]，
+        只包含比分发生变化的时刻，首项为 0:0
+    """
+    home = 0
+    away = 0
+    flow = []
+    for event in events:
+        if origin is None:
+            origin = event.timestamp
+            flow.append({"elapsed": 0, "quarter": event.quarter, "home": 0, "away": 0})
+        points = POINTS_BY_ACTION.get(event.action_type, 0)
+        if not points:
+            continue
+        if event.player_id in home_player_ids:
+            home += points
+        elif event.player_id in away_player_ids:
+            away += points
+        else:
+            continue
+        elapsed = max(0, int((event.timestamp - origin).total_seconds()))
+        flow.append({"elapsed": elapsed, "quarter": event.quarter, "home": home, "away": away})
+    if not flow:
+        flow.append({"elapsed": 0, "quarter": 1, "home": 0, "away": 0})
+    return flow
@@ -0,0 +1,280 @@
+"""积分榜（胜负、胜率、得失分、连胜连败和相互战绩排名）
+
+比赛最终比分保存在 game_results 表中：
+- 比赛结束时 record_game_result 写入一场比赛的比分（只汇总这一场的统计记录）；
+- 已结束比赛补录统计时同样重新写入；
+- 比赛删除或重新开始时 remove_game_results 删除对应行；
+- 导入脚本写入已结束的比赛后同样调用 record_game_result（整个联赛批量生成时用 sync_league_results）。
+
+读取积分榜不写数据库：只读取 game_results，结果按联赛和赛季类型缓存在进程内。
+"""
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.prometheus import record_cache
+from app.models.game import Game, GameStatus, SeasonType
+from app.models.game_result import GameResult
+from app.models.player import Player
+from app.models.statistic import Statistic
+from app.models.team import Team
+from app.services.scoring import POINTS_BY_ACTION
+
+_cache_lock = threading.Lock()
+_standings_cache: Dict[Tuple[int, Optional[SeasonType]], Tuple[str, Dict]] = {}
+
+
+def _scores_by_game(db: Session, games: List[Game]) -> Dict[int, Tuple[int, int]]:
+    """一次分组查询得到多场比赛的 (主队得分, 客队得分)"""
+    if not games:
+        return {}
+    rows = db.query(
+        Statistic.game_id, Player.team_id, Statistic.action_type, func.count(Statistic.id)
+    ).join(
+        Player, Player.id == Statistic.player_id
+    ).filter(
+        Statistic.game_id.in_([game.id for game in games]),
+        Statistic.action_type.in_(list(POINTS_BY_ACTION.keys()))
+    ).group_by(Statistic.game_id, Player.team_id, Statistic.action_type).all()
+    points: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for game_id, team_id, action_type, count in rows:
+        points[game_id][team_id] += POINTS_BY_ACTION[action_type] * count
+    return {
+        game.id: (points[game.id][game.home_team_id], points[game.id][game.away_team_id])
+        for game in games
+    }
+
+
+def _write_results(db: Session, games: List[Game]) -> None:
+    if not games:
+        return
+    scores = _scores_by_game(db, games)
+    existing = {
+        result.game_id: result
+        for result in db.query(GameResult).filter(GameResult.game_id.in_([game.id for game in games])).all()
+    }
+    for game in games:
+        home_score, away_score = scores[game.id]
+        result = existing.get(game.id)
+        if result is None:
+            result = GameResult(game_id=game.id)
+            db.add(result)
+        result.league_id = game.league_id
+        result.season_type = game.season_type or SeasonType.REGULAR
+        result.home_team_id = game.home_team_id
+        result.away_team_id = game.away_team_id
+        result.home_score = home_score
+        result.away_score = away_score
+        result.date = game.date
+
+
+def record_game_result(db: Session, game: Game) -> None:
+    """比赛结束（或已结束比赛的统计发生变化）后写入最终比分，由调用方提交事务"""
+    if game.status != GameStatus.FINISHED:
+        remove_game_results(db, [game.id])
+        return
+    _write_results(db, [game])
+    invalidate_standings(game.league_id)
+
+
+def remove_game_results(db: Session, game_ids: Iterable[int]) -> None:
+    """比赛删除或重新开始前移除比分，由调用方提交事务"""
+    game_ids = list(game_ids)
+    if not game_ids:
+        return
+    league_ids = {
+        row[0] for row in db.query(GameResult.league_id).filter(GameResult.game_id.in_(game_ids)).all()
+    }
+    db.query(GameResult).filter(GameResult.game_id.in_(game_ids)).delete(synchronize_session=False)
+    for league_id in league_ids:
+        invalidate_standings(league_id)
+
+
+def sync_league_results(db: Session, league_id: int) -> None:
+    """补齐联赛中缺少比分的已结束比赛，并移除已不再是已结束状态的比赛的比分（供数据生成脚本使用）"""
+    missing = db.query(Game).outerjoin(
+        GameResult, GameResult.game_id == Game.id
+    ).filter(
+        Game.league_id == league_id,
+        Game.status == GameStatus.FINISHED,
+        GameResult.game_id.is_(None)
+    ).all()
+    stale_ids = [
+        row[0] for row in db.query(GameResult.game_id).outerjoin(
+            Game, Game.id == GameResult.game_id
+        ).filter(
+            GameResult.league_id == league_id,
+            (Game.id.is_(None)) | (Game.status != GameStatus.FINISHED) | (Game.league_id != league_id)
+        ).all()
+    ]
+    if not missing and not stale_ids:
+        return
+    if stale_ids:
+        db.query(GameResult).filter(GameResult.game_id.in_(stale_ids)).delete(synchronize_session=False)
+    _write_results(db, missing)
+    db.commit()
+    invalidate_standings(league_id)
+
+
+def invalidate_standings(league_id: Optional[int] = None) -> None:
+    """清除积分榜缓存（不传league_id时清空全部）"""
+    with _cache_lock:
+        if league_id is None:
+            _standings_cache.clear()
+        else:
+            for key in [key for key in _standings_cache if key[0] == league_id]:
+                _standings_cache.pop(key, None)
+
+
+def _standings_version(db: Session, league_id: int) -> str:
+    """积分榜数据版本号（比分或球队变化时改变，供多进程部署时校验缓存）"""
+    result_part = db.query(
+        func.count(GameResult.game_id), func.max(GameResult.game_id),
+        func.sum(GameResult.home_score), func.sum(GameResult.away_score),
+        func.max(GameResult.updated_at)
+    ).filter(GameResult.league_id == league_id).one()
+    team_part = db.query(
+        func.count(Team.id), func.max(Team.id), func.max(Team.updated_at)
+    ).filter(Team.league_id == league_id).one()
+    raw = "|".join(str(part) for part in (league_id, *result_part, *team_part))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _empty_row(team_id: int, team_name: str) -> Dict:
+    return {
+        "team_id": team_id, "team_name": team_name,
+        "games": 0, "wins": 0, "losses": 0, "ties": 0,
+        "points_for": 0, "points_against": 0,
+        "home_wins": 0, "home_losses": 0, "away_wins": 0, "away_losses": 0,
+        "results": [],  # 按时间顺序的 W/L/T，计算连胜和近况
+    }
+
+
+def _win_pct(wins: int, losses: int, ties: int) -> float:
+    games = wins + losses + ties
+    return round((wins + 0.5 * ties) / games, 3) if games else 0.0
+
+
+def _streak(results: List[str]) -> str:
+    """当前连胜/连败，例如 W3、L2"""
+    if not results:
+        return ""
+    last = results[-1]
+    count = 0
+    for result in reversed(results):
+        if result != last:
+            break
+        count += 1
+    return f"{last}{count}"
+
+
+def _head_to_head_pct(team_id: int, group: List[int], meetings: Dict[Tuple[int, int], List[int]]) -> float:
+    """球队在同分球队之间的相互胜率（没有交锋时为0.5）"""
+    wins = losses = 0
+    for opponent in group:
+        if opponent == team_id:
+            continue
+        record = meetings.get((team_id, opponent))
+        if record:
+            wins += record[0]
+            losses += record[1]
+    return wins / (wins + losses) if wins + losses else 0.5
+
+
+def compute_standings(db: Session, league_id: int, season_type: Optional[SeasonType] = None) -> Dict:
+    """根据 game_results 计算积分榜
+
+    排名依次比较：胜率、同胜率球队之间的相互胜率、净胜分、总得分、队名。
+    """
+    teams = db.query(Team.id, Team.name).filter(Team.league_id == league_id).order_by(Team.id.asc()).all()
+    rows: Dict[int, Dict] = {team_id: _empty_row(team_id, name) for team_id, name in teams}
+
+    query = db.query(GameResult).filter(GameResult.league_id == league_id)
+    if season_type is not None:
+        query = query.filter(GameResult.season_type == season_type)
+    results = query.order_by(GameResult.date.asc(), GameResult.game_id.asc()).all()
+
+    # meetings[(a, b)] = [a 胜 b 的场数, a 负 b 的场数]
+    meetings: Dict[Tuple[int, int], List[int]] = defaultdict(lambda: [0, 0])
+    for result in results:
+        for team_id, opponent_id, scored, allowed, is_home in (
+            (result.home_team_id, result.away_team_id, result.home_score, result.away_score, True),
+            (result.away_team_id, result.home_team_id, result.away_score, result.home_score, False),
+        ):
+            row = rows.get(team_id)
+            if row is None:  # 球队已转到其他联赛
+                continue
+            row["games"] += 1
+            row["points_for"] += scored
+            row["points_against"] += allowed
+            if scored > allowed:
+                row["wins"] += 1
+                row["home_wins" if is_home else "away_wins"] += 1
+                row["results"].append("W")
+                meetings[(team_id, opponent_id)][0] += 1
+            elif scored < allowed:
+                row["losses"] += 1
+                row["home_losses" if is_home else "away_losses"] += 1
+                row["results"].append("L")
+                meetings[(team_id, opponent_id)][1] += 1
+            else:
+                row["ties"] += 1
+                row["results"].append("T")
+
+    for row in rows.values():
+        row["win_pct"] = _win_pct(row["wins"], row["losses"], row["ties"])
+        row["point_diff"] = row["points_for"] - row["points_against"]
+        games = row["games"]
+        row["avg_points_for"] = round(row["points_for"] / games, 1) if games else 0.0
+        row["avg_points_against"] = round(row["points_against"] / games, 1) if games else 0.0
+        row["streak"] = _streak(row["results"])
+        row["last_five"] = "".join(row["results"][-5:])
+        del row["results"]
+
+    # 先按胜率分组，组内用相互战绩等排序
+    by_pct: Dict[float, List[int]] = defaultdict(list)
+    for team_id, row in rows.items():
+        by_pct[row["win_pct"]].append(team_id)
+    ordered: List[Dict] = []
+    for pct in sorted(by_pct, reverse=True):
+        group = by_pct[pct]
+        group.sort(key=lambda team_id: (
+            -_head_to_head_pct(team_id, group, meetings),
+            -rows[team_id]["point_diff"],
+            -rows[team_id]["points_for"],
+            rows[team_id]["team_name"],
+        ))
+        ordered.extend(rows[team_id] for team_id in group)
+
+    leader = ordered[0] if ordered else None
+    for rank, row in enumerate(ordered, start=1):
+        row["rank"] = rank
+        row["games_behind"] = (
+            ((leader["wins"] - row["wins"]) + (row["losses"] - leader["losses"])) / 2 if leader else 0.0
+        )
+
+    return {
+        "league_id": league_id,
+        "season_type": season_type.value if season_type else None,
+        "games": len(results),
+        "standings": ordered,
+    }
+
+
+def get_standings(db: Session, league_id: int, season_type: Optional[SeasonType] = None) -> Dict:
+    """获取积分榜（按数据版本号缓存，只读）"""
+    version = _standings_version(db, league_id)
+    key = (league_id, season_type)
+    with _cache_lock:
+        cached = _standings_cache.get(key)
+        if cached is not None and cached[0] == version:
+            record_cache("standings", True)
+            return cached[1]
+
+    record_cache("standings", False)
+    standings = compute_standings(db, league_id, season_type)
+    with _cache_lock:
+        _standings_cache[key] = (version, standings)
+    return standings
@@ -0,0 +1,132 @@
+"""比赛得分时间线（累计比分曲线及派生指标）
+
+替代前端 ScoreChart / GameReport 中按时间排序后逐条累加比分的计算。
+已结束比赛的结果按数据版本号缓存在进程内，数据修改后自动失效。
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.prometheus import record_cache
+from app.models.game import Game, GameStatus
+from app.models.statistic import Statistic
+from app.services.game_data import game_data_version, get_game_player_ids
+from app.services.scoring import build_score_flow
+
+TIMELINE_COLUMNS = ["elapsed", "quarter", "home", "away", "lead"]
+
+# 进程内缓存的最大比赛数
+TIMELINE_CACHE_SIZE = 256
+
+_cache_lock = threading.Lock()
+_timeline_cache: "OrderedDict[int, Tuple[str, Dict]]" = OrderedDict()
+
+
+def summarize_score_flow(flow: List[Dict]) -> Dict:
+    """根据得分曲线计算领先变换、平局、最大领先和最大得分攻势
+
+    lead 为主队比分减客队比分；领先变换只统计领先方从一队变为另一队，
+    平局统计比分从不相等变为相等的次数（不含开场 0:0）。
+    """
+    lead_changes = 0
+    ties = 0
+    last_leader = 0  # 1 主队领先，-1 客队领先，0 尚无领先方
+    largest = {
+        "home": {"lead": 0, "elapsed": None, "home": 0, "away": 0},
+        "away": {"lead": 0, "elapsed": None, "home": 0, "away": 0},
+    }
+    biggest_run: Dict[str, Optional[Dict]] = {"home": None, "away": None}
+    run_side: Optional[str] = None
+    run_points = 0
+    run_start: Optional[Dict] = None
+
+    previous = flow[0] if flow else None
+    for point in flow[1:]:
+        lead = point["home"] - point["away"]
+        if lead == 0:
+            if previous["home"] != previous["away"]:
+                ties += 1
+        else:
+            leader = 1 if lead > 0 else -1
+            if last_leader and leader != last_leader:
+                lead_changes += 1
+            last_leader = leader
+
+        side = "home" if lead > 0 else "away"
+        if lead and abs(lead) > largest[side]["lead"]:
+            largest[side] = {"lead": abs(lead), "elapsed": point["elapsed"],
+                             "home": point["home"], "away": point["away"]}
+
+        # 攻势：一方连续得分、对方未得分
+        scorer = "home" if point["home"] > previous["home"] else "away"
+        points = (point["home"] - previous["home"]) + (point["away"] - previous["away"])
+        if scorer != run_side:
+            run_side = scorer
+            run_points = 0
+            run_start = previous
+        run_points += points
+        best = biggest_run[scorer]
+        if best is None or run_points > best["points"]:
+            biggest_run[scorer] = {
+                "points": run_points,
+                "start_elapsed": run_start["elapsed"],
+                "end_elapsed": point["elapsed"],
+                "start_score": [run_start["home"], run_start["away"]],
+                "end_score": [point["home"], point["away"]],
+            }
+        previous = point
+
+    return {
+        "lead_changes": lead_changes,
+        "ties": ties,
+        "largest_lead": largest,
+        "biggest_run": biggest_run,
+    }
+
+
+def compute_game_timeline(db: Session, game: Game) -> Dict:
+    """计算单场比赛的得分时间线"""
+    home_ids, away_ids = get_game_player_ids(db, game)
+    # 只读取需要的列，不构造ORM对象
+    events = db.query(
+        Statistic.player_id, Statistic.action_type, Statistic.timestamp, Statistic.quarter
+    ).filter(
+        Statistic.game_id == game.id
+    ).order_by(Statistic.timestamp.asc(), Statistic.id.asc()).all()
+
+    flow = build_score_flow(events, home_ids, away_ids)
+    final = flow[-1]
+    return {
+        "game_id": game.id,
+        "status": game.status.value if game.status else "",
+        "columns": TIMELINE_COLUMNS,
+        "points": [
+            [p["elapsed"], p["quarter"], p["home"], p["away"], p["home"] - p["away"]]
+            for p in flow
+        ],
+        "final": {"home": final["home"], "away": final["away"]},
+        **summarize_score_flow(flow),
+    }
+
+
+def get_game_timeline(db: Session, game: Game) -> Dict:
+    """获取比赛得分时间线：已结束的比赛按数据版本号缓存，进行中的比赛每次重新计算"""
+    if game.status != GameStatus.FINISHED:
+        return compute_game_timeline(db, game)
+
+    version = game_data_version(db, game)
+    with _cache_lock:
+        cached = _timeline_cache.get(game.id)
+        if cached is not None and cached[0] == version:
+            _timeline_cache.move_to_end(game.id)
+            record_cache("timeline", True)
+            return cached[1]
+
+    record_cache("timeline", False)
+    timeline = compute_game_timeline(db, game)
+    with _cache_lock:
+        _timeline_cache[game.id] = (version, timeline)
+        _timeline_cache.move_to_end(game.id)
+        while len(_timeline_cache) > TIMELINE_CACHE_SIZE:
+            _timeline_cache.popitem(last=False)
+    return timeline
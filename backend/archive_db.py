@@ -0,0 +1,112 @@
+"""历史数据归档：把已结束赛季的统计记录和出场时间移到归档数据库（ARCHIVE_DATABASE）
+
+用法：
+    python archive_db.py                          # 列出各联赛的归档状态
+    python archive_db.py --inactive               # 归档所有已停用联赛中已结束的比赛
+    python archive_db.py --before 2025-01-01      # 归档最后一场比赛早于该日期的联赛
+    python archive_db.py --league 3               # 归档指定联赛
+    python archive_db.py --inactive --dry-run     # 只列出将要归档的联赛
+    python archive_db.py --restore --league 3     # 把联赛的记录移回热数据库（重新启用或需要修改时）
+    python archive_db.py --inactive --vacuum      # 归档后回收热数据库空间（需要独占数据库，建议停服执行）
+
+比赛、球队、球员、积分榜比分和每名球员每场的技术统计汇总留在热数据库；
+查看已归档比赛的逐条记录时，接口自动附加归档数据库读取。
+建议归档前先备份（backup_db.py）。
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime
+from app.database import SessionLocal, require_schema
+from app.services.archive import (
+    ArchiveError, archive_candidates, archive_league, archive_path, league_archive_status, restore_league,
+    vacuum_database
+)
+from app.services.backup import BackupError, database_path
+
+
+def print_status(rows) -> None:
+    print(f"  {'ID':>4}  {'联赛':<20}{'启用':>6}{'比赛':>8}{'已结束':>8}{'已归档':>8}  最后一场比赛")
+    for row in rows:
+        print(f"  {row['league_id']:>4}  {row['name']:<20}{'是' if row['is_active'] else '否':>6}"
+              f"{row['games']:>8}{row['finished']:>8}{row['archived']:>8}  {row['last_game'] or '-'}")
+
+
+def progress(done: int, total: int) -> None:
+    print(f"\r   {done}/{total} 场", end="", flush=True)
+
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法解析日期: {value}（格式 YYYY-MM-DD）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史数据归档")
+    parser.add_argument("--inactive", action="store_true", help="归档所有已停用的联赛")
+    parser.add_argument("--before", type=parse_date, help="归档最后一场比赛早于该日期的联赛")
+    parser.add_argument("--league", type=int, action="append", help="归档（或恢复）指定联赛，可多次指定")
+    parser.add_argument("--restore", action="store_true", help="把 --league 指定联赛的记录移回热数据库")
+    parser.add_argument("--dry-run", action="store_true", help="只列出将要处理的联赛")
+    parser.add_argument("--vacuum", action="store_true", help="完成后执行 VACUUM 回收热数据库空间")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    require_schema()
+    db = SessionLocal()
+    try:
+        status = league_archive_status(db)
+        if args.restore:
+            if not args.league:
+                parser.error("--restore 需要指定 --league")
+            targets = [row for row in status if row["league_id"] in args.league and row["archived"]]
+        elif args.inactive or args.before or args.league:
+            targets = archive_candidates(db, before=args.before, inactive=args.inactive)
+            if args.league:
+                targets += [
+                    row for row in status
+                    if row["league_id"] in args.league and row["finished"] > row["archived"]
+                    and row["league_id"] not in {target["league_id"] for target in targets}
+                ]
+        else:
+            print(f"热数据库: {database_path()}")
+            print(f"归档数据库: {archive_path()}{'' if archive_path().exists() else '（尚未创建）'}")
+            print_status(status)
+            return
+    finally:
+        db.close()
+
+    if not targets:
+        print("没有需要处理的联赛")
+        return
+    print("将要恢复的联赛:" if args.restore else "将要归档的联赛:")
+    print_status(targets)
+    if args.dry_run:
+        return
+
+    try:
+        for target in targets:
+            start = time.perf_counter()
+            print(f"{'♻️  恢复' if args.restore else '📦 归档'} {target['name']}（{target['league_id']}）")
+            if args.restore:
+                result = restore_league(target["league_id"], progress=progress)
+            else:
+                result = archive_league(target["league_id"], progress=progress)
+            print(f"\r✅ {result['games']} 场比赛，统计记录 {result['statistics']} 条，"
+                  f"出场时间 {result['player_times']} 条，用时 {time.perf_counter() - start:.1f}s")
+            if result.get("skipped"):
+                print(f"   ⚠️  {result['skipped']} 场比赛在归档过程中有改动，已跳过，下次执行时重新归档")
+        if args.vacuum:
+            print("🧹 正在回收热数据库空间...")
+            vacuum_database()
+            print("✅ 完成")
+    except (ArchiveError, BackupError) as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
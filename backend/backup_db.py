@@ -0,0 +1,198 @@
+"""数据库在线备份（sqlite3 备份API，服务运行、比赛录入期间也可执行）
+
+用法：
+    python backup_db.py                       # 完整备份到 BACKUP_DIR（默认gzip压缩）
+    python backup_db.py --no-compress         # 不压缩
+    python backup_db.py --list                # 列出已有备份和WAL归档状态
+    python backup_db.py --enable-wal          # 把数据库切换为WAL模式（增量归档需要，只需执行一次）
+    python backup_db.py --incremental         # 归档一次WAL新增帧到 BACKUP_WAL_DIR
+    python backup_db.py --incremental --watch 10   # 每10秒归档一次（Ctrl+C 停止）
+    python backup_db.py --points                # 列出可以恢复到的时间点
+    python backup_db.py --verify ../backups/basketball_20250101_020000.db.gz   # 校验备份
+    python backup_db.py --restore ../backups/basketball_20250101_020000.db.gz --to restored.db
+    python backup_db.py --restore ../backups/wal/<代目录> --to restored.db       # 快照 + WAL片段
+    python backup_db.py --at "2025-01-01 14:30" --to restored.db               # 自动选择来源，恢复到该时间点之前
+    python backup_db.py --restore ../backups/wal/<代目录> --at "2025-01-01 14:30" --to restored.db
+
+增量归档期间启动服务时设置 SQLITE_WAL_AUTOCHECKPOINT=0，检查点由归档进程执行。
+恢复写入新文件并校验（integrity_check、各表行数、最近事件时间），不会修改当前数据库；
+确认无误后停止服务，再用恢复的文件替换 backend/database/basketball.db。
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from app.services.backup import (
+    BackupError, WalShipper, create_backup, database_path, enable_wal, list_backups
+)
+from app.services.restore import (
+    find_restore_point, restore_backup, restore_points, verify_backup, verify_database
+)
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f}{unit}" if unit != "B" else f"{size}B"
+        size /= 1024
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}天{hours}小时"
+    if hours:
+        return f"{hours}小时{minutes}分"
+    return f"{minutes}分{seconds}秒" if minutes else f"{seconds}秒"
+
+
+def warn_missing(until, result: dict) -> None:
+    """指定的时间点晚于来源最后一次归档时提示缺少的时长"""
+    if result.get("missing_seconds"):
+        print(f"⚠️  指定的时间点 {until.isoformat(sep=' ', timespec='seconds')} 晚于该来源最后归档的时间 "
+              f"{result['restored_to']}，缺少最后 {format_duration(result['missing_seconds'])} 的提交")
+        print("   这段时间的数据没有归档（增量归档未运行，或尚未执行到该时间），需要时改用更新的备份")
+
+
+def run_backup(compress: bool) -> None:
+    print("📦 正在备份数据库...")
+    result = create_backup(compress=compress)
+    print(f"✅ 备份成功: {result['path']}")
+    print(f"📊 数据库 {format_size(result['database_size'])} -> 备份 {format_size(result['size'])}，"
+          f"复制 {result['copy_seconds']}s（{result['mode']}，重新开始 {result['restarts']} 次），"
+          f"共 {result['total_seconds']}s")
+    for name in result["deleted"]:
+        print(f"🗑️  已删除旧备份: {name}")
+
+
+def run_incremental(watch: float) -> None:
+    shipper = WalShipper()
+    try:
+        while True:
+            result = shipper.ship()
+            if result["new_generation"]:
+                print(f"📦 新的归档代 {result['generation']}（{result['reason']}）")
+            if result["frames_shipped"]:
+                print(f"✅ 已归档 {result['frames_shipped']} 帧，共 {result['segments']} 个片段")
+            if result["checkpoint"]:
+                checkpoint = result["checkpoint"]
+                print(f"🔄 检查点 {checkpoint['checkpointed_frames']}/{checkpoint['wal_frames']} 帧，"
+                      f"阻止写入 {checkpoint['writers_blocked_ms']}ms")
+            for name in result["deleted_generations"]:
+                print(f"🗑️  已删除旧的归档代: {name}")
+            if not watch:
+                return
+            time.sleep(watch)
+    except KeyboardInterrupt:
+        print("已停止")
+    finally:
+        shipper.close()
+
+
+def print_verification(result: dict, live: dict = None) -> None:
+    integrity = result.get("integrity")
+    if integrity is not None:
+        status = "✅ 通过" if result["ok"] else f"❌ 失败: {integrity}"
+        print(f"🔍 完整性检查 {status}（{result['check_seconds']}s），迁移版本 {result['schema_version'] or '无'}")
+    header = f"  {'表':<20}{'备份':>12}"
+    if live:
+        header += f"{'当前数据库':>14}{'差异':>10}"
+    print(header)
+    for table, count in result["tables"].items():
+        line = f"  {table:<20}{count:>12}"
+        if live:
+            current = live["tables"].get(table)
+            diff = "" if current is None else f"{count - current:+d}"
+            line += f"{'' if current is None else current:>14}{diff:>10}"
+        print(line)
+    for key, value in result["last_events"].items():
+        current = f"（当前数据库 {live['last_events'].get(key)}）" if live else ""
+        print(f"  最近 {key}: {value}{current}")
+
+
+def live_summary(target: Path):
+    """当前数据库的行数和最近事件时间（与恢复结果对比；当前数据库不存在时返回None）"""
+    try:
+        path = database_path()
+    except BackupError:
+        return None
+    if not path.exists() or path == target.resolve():
+        return None
+    return verify_database(path, check=None, live=True)
+
+
+def run_restore(source, until, target: str, check: str) -> None:
+    if source is None:
+        source, effective = find_restore_point(until)
+        print(f"📍 选择 {source}（可恢复到 {effective.isoformat(sep=' ', timespec='seconds')}）")
+    print("♻️  正在恢复...")
+    result = restore_backup(source, target, until=until, check=check)
+    timings = result["timings"]
+    print(f"✅ 已恢复到 {result['target']}，数据截至 {result['restored_to'] or '未知'}"
+          f"（重放 {result['segments']} 个WAL片段，{result['frames']} 帧）")
+    print("⏱️  " + "，".join(f"{name} {seconds}s" for name, seconds in timings.items()))
+    warn_missing(until, result)
+    print_verification(result["verification"], live_summary(Path(target)))
+    print("   确认无误后停止服务，用该文件替换 backend/database/basketball.db")
+
+
+def parse_time(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法解析时间: {value}（格式 YYYY-MM-DD HH:MM[:SS]）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库在线备份")
+    parser.add_argument("--no-compress", action="store_true", help="完整备份不压缩")
+    parser.add_argument("--list", action="store_true", help="列出已有备份")
+    parser.add_argument("--enable-wal", action="store_true", help="把数据库切换为WAL模式")
+    parser.add_argument("--incremental", action="store_true", help="归档WAL新增帧（需要WAL模式）")
+    parser.add_argument("--watch", type=float, default=0, help="与 --incremental 一起使用，每隔若干秒归档一次")
+    parser.add_argument("--points", action="store_true", help="列出可以恢复到的时间点")
+    parser.add_argument("--verify", help="校验备份文件或WAL归档的一代目录")
+    parser.add_argument("--restore", help="要恢复的备份文件或WAL归档的一代目录")
+    parser.add_argument("--at", type=parse_time, help="恢复到该时间点之前（未指定 --restore 时自动选择来源）")
+    parser.add_argument("--to", help="恢复到的新数据库文件（不能已存在）")
+    parser.add_argument("--quick", action="store_true", help="用 quick_check 代替 integrity_check（大数据库更快）")
+    args = parser.parse_args()
+    check = "quick" if args.quick else "full"
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    try:
+        if args.list:
+            print(json.dumps(list_backups(), ensure_ascii=False, indent=2))
+        elif args.enable_wal:
+            print(f"✅ 日志模式: {enable_wal()}")
+        elif args.points:
+            print(json.dumps(restore_points(), ensure_ascii=False, indent=2))
+        elif args.verify:
+            result = verify_backup(args.verify, until=args.at, check=check)
+            if result.get("timings"):
+                print(f"⏱️  数据截至 {result['restored_to'] or '未知'}，"
+                      + "，".join(f"{name} {seconds}s" for name, seconds in result["timings"].items()))
+                warn_missing(args.at, result)
+            print_verification(result)
+            if not result["ok"]:
+                sys.exit(1)
+        elif args.restore or args.at:
+            if not args.to:
+                parser.error("恢复需要指定 --to")
+            run_restore(args.restore, args.at, args.to, check)
+        elif args.incremental:
+            run_incremental(args.watch)
+        else:
+            run_backup(compress=not args.no_compress)
+    except BackupError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from sqlalchemy.orm import Session
-from app.database.base import get_db, init_db
+from app.database.base import get_db, require_schema
 from app.models.team import Team
 from app.models.player import Player
 from app.models.game import Game, GameStatus, GamePlayer
@@ -17,6 +17,8 @@ from app.models.statistic import Statistic
 from app.models.league import League
 from app.models.user import User, UserRole
 from app.models.player_time import PlayerTime  # 导入PlayerTime以解决关系映射问题
+from app.services.game_data import bump_stats_version
+from app.services.standings import record_game_result
 
 # 事件类型映射
 EVENT_MAPPING = {
@@ -125,7 +127,7 @@ def import_game_from_csv(csv_path: str, db: Session, league_id: int = None, team
     try:
         print(f"\n处理文件: {os.path.basename(csv_path)}")
         
-        with open(csv_path, 'r', encoding='utf-8') as f:
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:  # 兼容带BOM的导出文件
             reader = csv.DictReader(f)
             rows = list(reader)
         
@@ -463,6 +465,10 @@ def import_game_from_csv(csv_path: str, db: Session, league_id: int = None, team
                         )
                         db.add(player_time)
         
+        # 写入积分榜比分（读取积分榜时不会补齐），更新联赛数据版本号
+        db.flush()  # 会话不自动flush，先写入统计记录再汇总比分
+        record_game_result(db, game)
+        bump_stats_version(db, game.id)
         db.commit()
         print(f"  导入 {stats_count} 条统计数据")
         print(f"  导入 {len(player_substitutions)} 个替换事件")
@@ -478,8 +484,8 @@ def import_game_from_csv(csv_path: str, db: Session, league_id: int = None, team
 
 def main():
     """批量导入CSV文件"""
-    # 初始化数据库
-    init_db()
+    # 检查数据库表（建表由 init_db.py 完成）
+    require_schema()
     
     # 获取数据库会话
     db = next(get_db())
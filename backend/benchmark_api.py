@@ -0,0 +1,372 @@
+"""热点接口基准测试
+
+在生成的基准数据（generate_benchmark_data.py）上，通过 httpx 的 ASGI 传输直接驱动
+app.main:app（不经过网络），对每个接口记录：
+- 延迟 p50 / p95 / 平均值（毫秒）
+- 吞吐量（并发请求下每秒完成的请求数）
+- 单次请求执行的 SQL 语句数
+
+结果写入 JSON；与基线比较时，p95 变慢超过阈值或 SQL 语句数增加都视为性能回退，
+退出码为1（可用于 CI）。
+
+基线 benchmark_baseline.json 随仓库提交。SQL 语句数与机器无关，可以直接比较；
+延迟与机器有关，在其他机器上比较前先在同一台机器上用 --save-baseline 重新记录。
+
+注意：写接口（记录统计、上/下场）会写入目标数据库，请只对基准测试数据库运行。
+
+用法：
+    python generate_benchmark_data.py --reset --games 500
+    python benchmark_api.py --save-baseline          # 记录基线
+    python benchmark_api.py                          # 与基线比较
+    python benchmark_api.py --only games_list,login  # 只测部分接口
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+BACKEND_DIR = Path(__file__).parent
+DEFAULT_DATABASE_URL = f"sqlite:///{BACKEND_DIR / 'database' / 'benchmark.db'}"
+DEFAULT_BASELINE = BACKEND_DIR / "benchmark_baseline.json"
+DEFAULT_OUTPUT = BACKEND_DIR / "cache" / "benchmarks" / "latest.json"
+
+# p95 变慢小于该毫秒数时视为噪声，不判定回退
+NOISE_FLOOR_MS = 2.0
+
+
+class Step:
+    """一次请求：name 为统计名，build(i, ctx) 返回 (method, url, 请求参数)"""
+
+    def __init__(self, name: str, build: Callable[[int, Dict], Tuple[str, str, Dict]], auth: bool = True):
+        self.name = name
+        self.build = build
+        self.auth = auth
+
+
+class Scenario:
+    """一个测试场景：每次迭代按顺序执行若干请求（例如上场后下场）"""
+
+    def __init__(self, name: str, steps: List[Step], requests: Optional[int] = None):
+        self.name = name
+        self.steps = steps
+        self.requests = requests  # 覆盖默认请求次数（例如登录较慢）
+
+
+def build_scenarios(ctx: Dict) -> List[Scenario]:
+    players = ctx["live_players"]
+    return [
+        Scenario("team_statistics", [Step(
+            "team_statistics", lambda i, c: ("GET", f"/api/v1/teams/{c['team_id']}/statistics", {})
+        )]),
+        Scenario("league_statistics", [Step(
+            "league_statistics", lambda i, c: ("GET", f"/api/v1/statistics/league/{c['league_id']}", {})
+        )]),
+        Scenario("game_statistics_summary", [Step(
+            "game_statistics_summary", lambda i, c: ("GET", f"/api/v1/games/{c['game_id']}/statistics", {})
+        )]),
+        Scenario("games_list", [Step(
+            "games_list", lambda i, c: ("GET", "/api/v1/games/", {"params": {"limit": 50}})
+        )]),
+        Scenario("create_statistic", [Step(
+            "create_statistic", lambda i, c: ("POST", "/api/v1/statistics/", {"json": {
+                "game_id": c["live_game_id"],
+                "player_id": players[i % len(players)],
+                "quarter": 1 + i % 4,
+                "action_type": ("2PM", "2PA", "3PA", "DREB", "AST", "FTM")[i % 6],
+                "shot_x": 50.0, "shot_y": 80.0,
+                "timestamp": datetime.now().isoformat(),
+            }})
+        )]),
+        Scenario("player_time", [
+            Step("player_time_enter", lambda i, c: ("POST", "/api/v1/player-time/enter", {"params": {
+                "game_id": c["live_game_id"], "player_id": players[c["worker"] % len(players)], "quarter": 1,
+            }})),
+            Step("player_time_exit", lambda i, c: ("POST", "/api/v1/player-time/exit", {"params": {
+                "game_id": c["live_game_id"], "player_id": players[c["worker"] % len(players)],
+            }})),
+            Step("player_time_total", lambda i, c: (
+                "GET", f"/api/v1/player-time/game/{c['live_game_id']}/total", {}
+            )),
+        ]),
+        Scenario("login", [Step(
+            "login", lambda i, c: ("POST", "/api/v1/auth/login", {"json": {
+                "username": c["username"], "password": c["password"],
+            }}), auth=False
+        )], requests=10),
+    ]
+
+
+class QueryCounter:
+    """统计引擎执行的SQL语句数"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(*_args, **_kwargs):
+            self.count += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def send(client, step: Step, i: int, ctx: Dict, headers: Dict) -> float:
+    method, url, kwargs = step.build(i, ctx)
+    start = time.perf_counter()
+    response = await client.request(method, url, headers=headers if step.auth else None, **kwargs)
+    elapsed = time.perf_counter() - start
+    if response.status_code >= 400:
+        raise RuntimeError(f"{step.name}: {method} {url} -> {response.status_code} {response.text[:200]}")
+    return elapsed
+
+
+async def run_scenario(client, scenario: Scenario, ctx: Dict, headers: Dict, requests: int,
+                       concurrency: int, counter: QueryCounter) -> Dict[str, Dict]:
+    # 预热并逐个请求统计SQL语句数（并发时无法区分归属）
+    queries: Dict[str, int] = {}
+    for step in scenario.steps:
+        await send(client, step, 0, dict(ctx, worker=0), headers)
+    for step in scenario.steps:
+        before = counter.count
+        await send(client, step, 1, dict(ctx, worker=0), headers)
+        queries[step.name] = counter.count - before
+
+    latencies: Dict[str, List[float]] = {step.name: [] for step in scenario.steps}
+    iterations = iter(range(requests))
+
+    async def worker(worker_id: int):
+        # 每个worker使用自己的球员，避免上/下场请求互相冲突
+        worker_ctx = dict(ctx, worker=worker_id)
+        for i in iterations:
+            for step in scenario.steps:
+                latencies[step.name].append(await send(client, step, i, worker_ctx, headers))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    results = {}
+    for step in scenario.steps:
+        values = latencies[step.name]
+        results[step.name] = {
+            "requests": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+            "throughput_rps": round(len(values) / wall, 1) if wall else 0.0,
+            "queries": queries[step.name],
+        }
+    return results
+
+
+def prepare_context(args) -> Dict:
+    """从基准数据库中选取测试对象，并创建一场进行中的比赛用于写接口"""
+    from sqlalchemy import func
+    from app.database.base import SessionLocal
+    from app.models.game import Game, GameStatus
+    from app.models.player import Player
+    from app.models.statistic import Statistic
+
+    db = SessionLocal()
+    try:
+        row = db.query(Game.league_id, func.count(Game.id)).group_by(Game.league_id).order_by(
+            func.count(Game.id).desc()
+        ).first()
+        if row is None:
+            raise SystemExit("基准数据库中没有比赛，请先运行 generate_benchmark_data.py")
+        league_id = row[0]
+        game = db.query(Game).filter(
+            Game.league_id == league_id, Game.status == GameStatus.FINISHED
+        ).order_by(Game.id.asc()).first()
+        # 统计记录最多的球员所在球队
+        team_id = db.query(Player.team_id).join(Statistic, Statistic.player_id == Player.id).filter(
+            Statistic.game_id == game.id
+        ).first()[0]
+
+        live_game = Game(
+            league_id=league_id, home_team_id=game.home_team_id, away_team_id=game.away_team_id,
+            date=datetime.now(), duration=40, quarters=4, status=GameStatus.LIVE,
+            season_type=game.season_type,
+        )
+        db.add(live_game)
+        db.commit()
+        live_players = [
+            player_id for (player_id,) in db.query(Player.id).filter(
+                Player.team_id.in_([game.home_team_id, game.away_team_id])
+            ).order_by(Player.id.asc()).all()
+        ]
+        return {
+            "league_id": league_id,
+            "team_id": team_id,
+            "game_id": game.id,
+            "live_game_id": live_game.id,
+            "live_players": live_players,
+            "username": args.username,
+            "password": args.password,
+        }
+    finally:
+        db.close()
+
+
+def cleanup_context(ctx: Dict) -> None:
+    """删除本次创建的比赛及其数据，使多次运行的数据规模保持一致"""
+    from app.database.base import SessionLocal
+    from app.models.game import Game
+    from app.models.player_time import PlayerTime
+    from app.models.statistic import Statistic
+
+    db = SessionLocal()
+    try:
+        game_id = ctx["live_game_id"]
+        db.query(Statistic).filter(Statistic.game_id == game_id).delete()
+        db.query(PlayerTime).filter(PlayerTime.game_id == game_id).delete()
+        game = db.query(Game).filter(Game.id == game_id).first()
+        if game:
+            db.delete(game)
+        db.commit()
+    finally:
+        db.close()
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """与基线比较，返回回退说明"""
+    regressions = []
+    base_endpoints = baseline.get("endpoints", {})
+    for name, current in results["endpoints"].items():
+        base = base_endpoints.get(name)
+        if not base:
+            continue
+        limit = base["p95_ms"] * (1 + threshold)
+        if current["p95_ms"] > limit and current["p95_ms"] - base["p95_ms"] > NOISE_FLOOR_MS:
+            regressions.append(
+                f"{name}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms (阈值 +{threshold:.0%})"
+            )
+        if current["queries"] > base["queries"]:
+            regressions.append(f"{name}: SQL语句数 {base['queries']} -> {current['queries']}")
+    return regressions
+
+
+def print_table(results: Dict, baseline: Optional[Dict]) -> None:
+    base_endpoints = (baseline or {}).get("endpoints", {})
+    print(f"{'接口':<26}{'p50(ms)':>10}{'p95(ms)':>10}{'mean(ms)':>10}{'rps':>9}{'SQL':>6}{'基线p95':>10}")
+    for name, r in results["endpoints"].items():
+        base = base_endpoints.get(name)
+        base_p95 = f"{base['p95_ms']:.1f}" if base else "-"
+        print(f"{name:<26}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['mean_ms']:>10.1f}"
+              f"{r['throughput_rps']:>9.1f}{r['queries']:>6}{base_p95:>10}")
+
+
+async def run(args) -> Dict:
+    import httpx
+    from app.database.base import engine
+    from app.main import app
+
+    counter = QueryCounter(engine)
+    ctx = prepare_context(args)
+    selected = set(args.only.split(",")) if args.only else None
+    endpoints: Dict[str, Dict] = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            response = await client.post("/api/v1/auth/login", json={
+                "username": args.username, "password": args.password,
+            })
+            if response.status_code != 200:
+                raise SystemExit(f"登录失败（{response.status_code}），请检查 --username/--password")
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            for scenario in build_scenarios(ctx):
+                if selected and scenario.name not in selected:
+                    continue
+                requests = min(args.requests, scenario.requests or args.requests)
+                print(f"运行 {scenario.name}（{requests} 次，并发 {args.concurrency}）...")
+                endpoints.update(await run_scenario(
+                    client, scenario, ctx, headers, requests, args.concurrency, counter
+                ))
+    finally:
+        cleanup_context(ctx)
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "database_url": args.database_url.replace(f"{BACKEND_DIR.resolve()}/", ""),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热点接口基准测试")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL, help="基准测试数据库")
+    parser.add_argument("--requests", type=int, default=50, help="每个接口的请求次数")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发请求数")
+    parser.add_argument("--only", default="", help="只运行指定场景（逗号分隔）")
+    parser.add_argument("--username", default="admin", help="登录用户名")
+    parser.add_argument("--password", default="admin123", help="登录密码")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="本次结果JSON路径")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线JSON路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 允许变慢的比例")
+    args = parser.parse_args()
+
+    if args.concurrency < 1 or args.requests < 2:
+        parser.error("--concurrency 至少为1，--requests 至少为2")
+
+    # 必须在导入 app 之前设置数据库
+    os.environ["DATABASE_URL"] = args.database_url
+    if args.database_url.startswith("sqlite:///") and not Path(args.database_url[len("sqlite:///"):]).exists():
+        raise SystemExit("基准数据库不存在，请先运行 generate_benchmark_data.py")
+
+    results = asyncio.run(run(args))
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+    print()
+    print_table(results, baseline)
+    print(f"\n结果已写入 {output}")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"✅ 基线已保存到 {baseline_path}")
+        return
+
+    if baseline is None:
+        print("没有基线，使用 --save-baseline 保存本次结果作为基线")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\n❌ 性能回退：")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n✅ 与基线相比没有性能回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""登录吞吐量基准测试
+
+模拟一批并发登录（bcrypt 验证密码），同时用一个心跳协程测量事件循环的卡顿：
+- inline：在协程中直接调用 verify_password（旧实现，阻塞事件循环）
+- executor：通过密码线程池调用 verify_password_async（当前实现）
+
+用法：
+    python benchmark_login.py [--logins 20] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    """每隔 interval 秒醒来一次，记录实际延迟（即事件循环被阻塞的时间）"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(mode: str, logins: int, hashed: str, password: str):
+    from app.core.security import verify_password, verify_password_async
+
+    async def login_inline():
+        return verify_password(password, hashed)
+
+    async def login_executor():
+        return await verify_password_async(password, hashed)
+
+    login = login_inline if mode == "inline" else login_executor
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, 0.01, lags))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+
+    assert all(results)
+    max_lag = max(lags) * 1000 if lags else elapsed * 1000
+    print(f"{mode:>8}: {logins} 次登录 {elapsed:.2f}s，"
+          f"{logins / elapsed:.1f} 次/秒，事件循环最大卡顿 {max_lag:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录吞吐量基准测试")
+    parser.add_argument("--logins", type=int, default=20, help="并发登录次数")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt 计算成本（默认使用配置）")
+    args = parser.parse_args()
+
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    from app.core.config import settings
+    from app.core.security import get_password_hash
+
+    password = "benchmark-password"
+    hashed = get_password_hash(password)
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}，密码线程数={settings.PASSWORD_HASH_WORKERS}")
+
+    for mode in ("inline", "executor"):
+        asyncio.run(run(mode, args.logins, hashed, password))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""启动时间基准测试（导入耗时审计）
+
+分别在新的 Python 进程中测量：
+- api：uvicorn 工作进程加载 app.main:app 的耗时；
+- cli：命令行脚本的典型启动路径（导入模型并检查表结构）。
+
+每个目标运行多次取中位数，并用 python -X importtime 统计耗时最多的模块（累计耗时）
+和按顶层包汇总的耗时，结果写入 JSON；与基线比较时启动变慢超过阈值视为回退，退出码为1。
+
+基线 benchmark_startup_baseline.json 随仓库提交。启动耗时与机器有关，在其他机器上比较前
+先在同一台机器上用 --save-baseline 重新记录。cli 目标会检查 DATABASE_URL 指向的数据库表结构，
+数据库需要已迁移到最新版本。
+
+用法：
+    python benchmark_startup.py --save-baseline   # 记录基线
+    python benchmark_startup.py                   # 与基线比较
+    python benchmark_startup.py --top 40          # 显示更多模块
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BACKEND_DIR / "benchmark_startup_baseline.json"
+DEFAULT_OUTPUT = BACKEND_DIR / "cache" / "benchmarks" / "startup.json"
+
+# 启动变慢小于该毫秒数时视为噪声，不判定回退
+NOISE_FLOOR_MS = 30.0
+
+TARGETS = {
+    "api": "import app.main",
+    "cli": "from app.database.base import require_schema; require_schema()",
+}
+
+
+def run_once(code: str, importtime: bool = False) -> Tuple[float, str]:
+    """在新进程中执行代码，返回 (耗时秒, stderr)"""
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", code]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, env=os.environ.copy())
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise SystemExit(f"执行失败：{code}\n{completed.stderr[-2000:]}")
+    return elapsed, completed.stderr
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    """解析 -X importtime 输出，返回 [(模块, 自身耗时微秒, 累计耗时微秒)]"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def audit(code: str, top: int) -> Dict:
+    _, output = run_once(code, importtime=True)
+    modules = parse_importtime(output)
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    slowest = sorted(modules, key=lambda item: item[2], reverse=True)[:top]
+    return {
+        "modules_imported": len(modules),
+        "top_modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+            for name, self_us, cumulative_us in slowest
+        ],
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+def measure(runs: int, top: int) -> Dict:
+    targets = {}
+    for target, code in TARGETS.items():
+        print(f"测量 {target}（{runs} 次）...")
+        timings = [run_once(code)[0] * 1000 for _ in range(runs)]
+        targets[target] = {
+            "median_ms": round(statistics.median(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "max_ms": round(max(timings), 1),
+            **audit(code, top),
+        }
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "runs": runs,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "targets": targets,
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for target, current in results["targets"].items():
+        base = baseline.get("targets", {}).get(target)
+        if not base:
+            continue
+        limit = base["median_ms"] * (1 + threshold)
+        if current["median_ms"] > limit and current["median_ms"] - base["median_ms"] > NOISE_FLOOR_MS:
+            regressions.append(
+                f"{target}: 启动耗时 {base['median_ms']}ms -> {current['median_ms']}ms (阈值 +{threshold:.0%})"
+            )
+    return regressions
+
+
+def print_report(results: Dict, baseline: Dict, show: int) -> None:
+    for target, result in results["targets"].items():
+        base = (baseline or {}).get("targets", {}).get(target)
+        base_text = f"，基线 {base['median_ms']}ms" if base else ""
+        print(f"\n[{target}] 中位数 {result['median_ms']}ms（最快 {result['min_ms']}ms{base_text}），"
+              f"导入 {result['modules_imported']} 个模块")
+        print(f"  {'模块':<48}{'自身(ms)':>10}{'累计(ms)':>10}")
+        for item in result["top_modules"][:show]:
+            print(f"  {item['module']:<48}{item['self_ms']:>10.1f}{item['cumulative_ms']:>10.1f}")
+        packages = ", ".join(f"{name} {ms}ms" for name, ms in list(result["packages_ms"].items())[:8])
+        print(f"  按包汇总：{packages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动时间基准测试")
+    parser.add_argument("--runs", type=int, default=5, help="每个目标的测量次数")
+    parser.add_argument("--top", type=int, default=20, help="显示累计耗时最多的模块数")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="本次结果JSON路径")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线JSON路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.2, help="启动耗时允许变慢的比例")
+    args = parser.parse_args()
+
+    if args.runs < 1:
+        parser.error("--runs 至少为1")
+
+    results = measure(args.runs, args.top)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+
+    print_report(results, baseline, args.top)
+    print(f"\n结果已写入 {output}")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"✅ 基线已保存到 {baseline_path}")
+        return
+
+    if baseline is None:
+        print("没有基线，使用 --save-baseline 保存本次结果作为基线")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\n❌ 启动时间回退：")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n✅ 与基线相比没有启动时间回退")
+
+
+if __name__ == "__main__":
+    main()
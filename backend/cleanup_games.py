@@ -6,7 +6,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from sqlalchemy.orm import Session
-from app.database.base import get_db, init_db
+from app.database.base import get_db, require_schema
 from app.models.game import Game, GamePlayer
 from app.models.statistic import Statistic
 from app.models.player_time import PlayerTime
@@ -14,8 +14,8 @@ from app.models.league import League
 
 def cleanup_games_for_league(league_name: str = 'auba-s2', auto_confirm: bool = False):
     """清理指定联赛的所有比赛数据"""
-    # 初始化数据库
-    init_db()
+    # 检查数据库表（建表由 init_db.py 完成）
+    require_schema()
     
     # 获取数据库会话
     db = next(get_db())
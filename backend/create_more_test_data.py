@@ -7,6 +7,8 @@ from app.models.team import Team
 from app.models.player import Player
 from app.models.game import Game, GameStatus, GamePlayer
 from app.models.statistic import Statistic
+from app.services.game_data import bump_stats_version
+from app.services.standings import record_game_result
 
 # 随机中文名字
 CHINESE_NAMES = [
@@ -103,6 +105,9 @@ def create_random_game(db: Session, home_team: Team, away_team: Team, date: date
             db.add(stat)
             stats_count += 1
     
+    db.flush()  # 会话不自动flush，先写入统计记录再汇总比分
+    record_game_result(db, game)  # 写入积分榜比分
+    bump_stats_version(db, game.id)  # 更新联赛数据版本号
     db.commit()
     print(f"创建比赛: {home_team.name} vs {away_team.name} (ID: {game.id}), {stats_count}条统计")
     return game
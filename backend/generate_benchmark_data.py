@@ -0,0 +1,414 @@
+"""生成大规模基准测试数据
+
+按 联赛 × 球队 × 球员 × 比赛 × 每场事件数 生成可复现（固定随机种子）的模拟数据：
+- 按比例生成的动作（投篮、罚球、篮板、助攻、抢断、盖帽、失误、犯规），
+  投篮带坐标，命中后可能有助攻、未命中后可能有篮板；
+- 每节开始和比赛中途换人，生成 SUB_IN/SUB_OUT 记录和对应的 PlayerTime 出场时段；
+- 所有数据通过 Core 批量插入写入，百万级事件只需数秒。
+
+默认写入单独的 database/benchmark.db，不影响正式数据库。启动后端时设置
+DATABASE_URL 指向该文件即可在大数据量下测试各个接口。
+
+用法：
+    python generate_benchmark_data.py --leagues 2 --teams 12 --games 1700 --events 300
+    DATABASE_URL=sqlite:///database/benchmark.db uvicorn app.main:app
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from bisect import bisect
+from itertools import accumulate, count
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine, event, func, select
+
+from app.database.base import Base, DATABASE_DIR, stamp_database
+import app.models  # noqa: F401  确保所有模型都已注册到Base.metadata
+from app.models.game import Game, GamePlayer, GameStatus, SeasonType
+from app.models.league import League
+from app.models.player import Player
+from app.models.player_time import PlayerTime
+from app.models.statistic import Statistic
+from app.models.team import Team
+from app.models.user import User, UserRole
+
+QUARTERS = 4
+QUARTER_SECONDS = 600  # 每节10分钟
+QUARTER_BREAK_SECONDS = 120  # 节间休息
+SUB_INTERVAL_SECONDS = 150  # 大约每2分半检查一次换人
+BATCH_SIZE = 50000
+
+# 每个事件的基础动作比例（助攻、篮板作为投篮的后续事件另外生成）
+ACTION_WEIGHTS = {
+    "2PM": 16, "2PA": 18, "3PM": 6, "3PA": 12, "FTM": 7, "FTA": 3,
+    "STL": 3, "BLK": 2, "TOV": 6, "PF": 8, "PFD": 5,
+}
+ASSIST_RATE = 0.55  # 投篮命中后有助攻的比例
+DEFENSIVE_REBOUND_RATE = 0.72  # 投篮未命中后防守篮板的比例
+REBOUND_RATE = 0.85  # 投篮未命中后记录到篮板的比例
+USAGE_WEIGHTS = [1.6, 1.4, 1.2, 1.0, 0.8]  # 场上五人出手倾向
+
+SURNAMES = "王李张刘陈杨黄赵周吴徐孙马朱胡郭何林罗高郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘蒋蔡余杜叶程魏苏吕丁任沈姚卢"
+GIVEN_NAMES = "伟强磊军洋勇杰涛明超亮刚平辉鹏华飞鑫波斌宇浩凯健俊帆帅旭宁龙林欢阳建峰"
+POSITIONS = ["PG", "SG", "SF", "PF", "C"]
+
+# 球场坐标（与报告投篮图一致：500×470，y轴向下，篮筐在 (250, 440)）
+COURT_WIDTH = 500.0
+COURT_HEIGHT = 470.0
+BASKET = (250.0, 440.0)
+THREE_CENTER = (250.0, 370.4 + math.sqrt(225 ** 2 - 220 ** 2))
+THREE_RADIUS = 225.0
+
+
+def shot_location(rng: random.Random, three: bool):
+    """随机投篮点位，返回百分比坐标 (x, y)"""
+    while True:
+        if three:
+            angle = rng.uniform(math.pi * 1.02, math.pi * 1.98)
+            radius = THREE_RADIUS + rng.uniform(8, 70)
+            x = THREE_CENTER[0] + radius * math.cos(angle)
+            y = THREE_CENTER[1] + radius * math.sin(angle)
+            if rng.random() < 0.15:  # 底角三分
+                x = rng.choice([rng.uniform(5, 28), rng.uniform(472, 495)])
+                y = rng.uniform(380, 465)
+        else:
+            angle = rng.uniform(math.pi, math.pi * 2)
+            radius = abs(rng.gauss(0, 90))
+            if radius > 200:
+                continue
+            x = BASKET[0] + radius * math.cos(angle)
+            y = BASKET[1] + radius * math.sin(angle)
+        if 0 <= x <= COURT_WIDTH and 0 <= y <= COURT_HEIGHT:
+            return round(x / COURT_WIDTH * 100, 2), round(y / COURT_HEIGHT * 100, 2)
+
+
+def random_name(rng: random.Random) -> str:
+    return rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_NAMES) for _ in range(rng.choice([1, 2])))
+
+
+class IdAllocator:
+    """在现有最大ID之后分配主键，批量插入时不需要回读自增ID"""
+
+    def __init__(self, conn, *tables):
+        self.counters = {}
+        for table in tables:
+            current = conn.execute(select(func.max(table.__table__.c.id))).scalar() or 0
+            self.counters[table] = count(current + 1)
+
+    def __call__(self, table) -> int:
+        return next(self.counters[table])
+
+
+# 事件级的大表跳过逐行类型处理，以固定列顺序的元组通过驱动层 executemany 写入
+RAW_COLUMNS = {
+    GamePlayer: ("id", "game_id", "player_id", "is_starter"),
+    Statistic: ("id", "game_id", "player_id", "quarter", "action_type", "shot_x", "shot_y",
+                "assisted_by_player_id", "rebounded_by_player_id", "timestamp"),
+    PlayerTime: ("id", "game_id", "player_id", "quarter", "enter_time", "exit_time", "duration_seconds"),
+}
+POSITIONAL_PARAMSTYLES = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+
+
+class BulkWriter:
+    """按表缓存行，达到批量大小时批量写入（按表首次出现的顺序，先写被引用的表）
+
+    RAW_COLUMNS 中的表以元组缓存，其余表以字典缓存并通过 Core insert 写入。
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = {}
+        self.counts = {}
+        self.dialect = conn.dialect
+        placeholder = POSITIONAL_PARAMSTYLES.get(self.dialect.paramstyle)
+        self.raw_sql = {}
+        if placeholder:
+            for table, columns in RAW_COLUMNS.items():
+                self.raw_sql[table] = "INSERT INTO {} ({}) VALUES ({})".format(
+                    table.__tablename__, ", ".join(columns), ", ".join([placeholder] * len(columns))
+                )
+
+    def datetime_value(self, value: datetime):
+        """SQLite 按 SQLAlchemy 的存储格式写字符串，其他数据库直接传 datetime"""
+        if self.dialect.name == "sqlite":
+            return value.isoformat(sep=" ", timespec="microseconds")
+        return value
+
+    def add(self, table, row) -> None:
+        rows = self.rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        for table, rows in self.rows.items():
+            if not rows:
+                continue
+            if table in RAW_COLUMNS:
+                if table in self.raw_sql:
+                    self.conn.exec_driver_sql(self.raw_sql[table], rows)
+                else:
+                    columns = RAW_COLUMNS[table]
+                    self.conn.execute(table.__table__.insert(), [dict(zip(columns, row)) for row in rows])
+            else:
+                self.conn.execute(table.__table__.insert(), rows)
+            self.counts[table] = self.counts.get(table, 0) + len(rows)
+            self.rows[table] = []
+
+
+ACTION_NAMES = list(ACTION_WEIGHTS)
+ACTION_CUM_WEIGHTS = list(accumulate(ACTION_WEIGHTS.values()))
+USAGE_CUM_WEIGHTS = list(accumulate(USAGE_WEIGHTS))
+
+
+class GameSimulator:
+    """模拟一场比赛：生成统计事件、换人和出场时段"""
+
+    def __init__(self, rng: random.Random, ids: IdAllocator, writer: BulkWriter):
+        self.rng = rng
+        self.ids = ids
+        self.writer = writer
+        self.stat_ids = ids.counters[Statistic]
+        self.game_id = None
+        self.quarter_start = None
+
+    def simulate(self, game_id: int, tipoff: datetime, rosters, events: int) -> None:
+        rng = self.rng
+        self.game_id = game_id
+        on_court = [list(roster[:5]) for roster in rosters]
+        bench = [list(roster[5:]) for roster in rosters]
+        for roster in rosters:
+            for index, player_id in enumerate(roster):
+                self.writer.add(GamePlayer, (self.ids(GamePlayer), game_id, player_id, index < 5))
+
+        per_quarter = [events // QUARTERS + (1 if q < events % QUARTERS else 0) for q in range(QUARTERS)]
+        for quarter in range(1, QUARTERS + 1):
+            self.quarter_start = tipoff + timedelta(seconds=(quarter - 1) * (QUARTER_SECONDS + QUARTER_BREAK_SECONDS))
+            # 每节开始时在场球员的出场时段（值为本节内的秒数）
+            stints = {player_id: 0.0 for side in range(2) for player_id in on_court[side]}
+            count = per_quarter[quarter - 1]
+            times = sorted(rng.uniform(0, QUARTER_SECONDS - 1) for _ in range(count))
+            next_sub = rng.uniform(SUB_INTERVAL_SECONDS * 0.6, SUB_INTERVAL_SECONDS * 1.4)
+            remaining = count
+            for offset in times:
+                if remaining <= 0:
+                    break
+                while offset >= next_sub:
+                    self._substitute(quarter, next_sub, on_court, bench, stints)
+                    next_sub += rng.uniform(SUB_INTERVAL_SECONDS * 0.6, SUB_INTERVAL_SECONDS * 1.4)
+                remaining -= self._play(quarter, offset, on_court, remaining)
+
+            for player_id, enter in stints.items():
+                self._stint(player_id, quarter, enter, QUARTER_SECONDS)
+
+    def _timestamp(self, offset: float):
+        return self.writer.datetime_value(self.quarter_start + timedelta(seconds=offset))
+
+    def _stat(self, player_id: int, quarter: int, action: str, offset: float,
+              shot=None, assisted_by=None, rebounded_by=None) -> None:
+        self.writer.add(Statistic, (
+            next(self.stat_ids), self.game_id, player_id, quarter, action,
+            shot[0] if shot else None, shot[1] if shot else None,
+            assisted_by, rebounded_by, self._timestamp(offset),
+        ))
+
+    def _stint(self, player_id: int, quarter: int, enter: float, exit: float) -> None:
+        self.writer.add(PlayerTime, (
+            self.ids(PlayerTime), self.game_id, player_id, quarter,
+            self._timestamp(enter), self._timestamp(exit), round(exit - enter, 3),
+        ))
+
+    def _substitute(self, quarter, offset, on_court, bench, stints) -> None:
+        rng = self.rng
+        for side in range(2):
+            if not bench[side] or rng.random() < 0.35:
+                continue
+            for _ in range(rng.choice([1, 1, 2])):
+                out_index = rng.randrange(5)
+                in_index = rng.randrange(len(bench[side]))
+                player_out = on_court[side][out_index]
+                player_in = bench[side][in_index]
+                on_court[side][out_index] = player_in
+                bench[side][in_index] = player_out
+                self._stat(player_out, quarter, "SUB_OUT", offset)
+                self._stat(player_in, quarter, "SUB_IN", offset)
+                self._stint(player_out, quarter, stints.pop(player_out), offset)
+                stints[player_in] = offset
+
+    def _play(self, quarter, offset, on_court, budget: int) -> int:
+        """生成一次进攻的事件（投篮及其后续助攻/篮板），返回生成的事件数"""
+        rng = self.rng
+        side = rng.randrange(2)
+        players = on_court[side]
+        shooter = players[bisect(USAGE_CUM_WEIGHTS, rng.random() * USAGE_CUM_WEIGHTS[-1])]
+        action = ACTION_NAMES[bisect(ACTION_CUM_WEIGHTS, rng.random() * ACTION_CUM_WEIGHTS[-1])]
+
+        shot = None
+        if action in ("2PM", "2PA", "3PM", "3PA"):
+            shot = shot_location(rng, action[0] == "3")
+
+        assisted_by = rebounded_by = None
+        follow_up = None
+        if budget > 1 and action in ("2PM", "3PM") and rng.random() < ASSIST_RATE:
+            assisted_by = rng.choice([p for p in players if p != shooter])
+            follow_up = (assisted_by, "AST")
+        elif budget > 1 and action in ("2PA", "3PA") and rng.random() < REBOUND_RATE:
+            if rng.random() < DEFENSIVE_REBOUND_RATE:
+                rebounded_by = rng.choice(on_court[1 - side])
+                follow_up = (rebounded_by, "DREB")
+            else:
+                rebounded_by = rng.choice(players)
+                follow_up = (rebounded_by, "OREB")
+
+        self._stat(shooter, quarter, action, offset, shot, assisted_by, rebounded_by)
+        if follow_up is None:
+            return 1
+        self._stat(follow_up[0], quarter, follow_up[1], offset + 1)
+        return 2
+
+
+def drop_bulk_indexes(conn):
+    """删除事件级大表的二级索引，写入完成后一次性重建（比逐行维护索引快得多）"""
+    indexes = [index for table in RAW_COLUMNS for index in table.__table__.indexes]
+    for index in indexes:
+        index.drop(bind=conn, checkfirst=True)
+    return indexes
+
+
+def configure_sqlite(engine) -> None:
+    """批量写入时关闭同步落盘（仅用于生成基准数据）"""
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+
+def generate(args) -> None:
+    rng = random.Random(args.seed)
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == "sqlite":
+        configure_sqlite(engine)
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        stamp_database(conn)  # create_all 已建到最新结构，之后 alembic upgrade head 无需再执行
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        ids = IdAllocator(conn, League, Team, Player, Game, GamePlayer, Statistic, PlayerTime, User)
+        writer = BulkWriter(conn)
+        bulk_indexes = drop_bulk_indexes(conn)
+        simulator = GameSimulator(rng, ids, writer)
+
+        # 没有用户时创建一个管理员，便于登录测试
+        if not conn.execute(select(func.count(User.__table__.c.id))).scalar():
+            from app.core.security import get_password_hash
+            writer.add(User, {
+                "id": ids(User), "username": "admin", "email": "admin@example.com",
+                "hashed_password": get_password_hash(args.admin_password),
+                "role": UserRole.ADMIN, "is_active": True,
+            })
+
+        season_start = datetime(2025, 9, 1, 19, 0)
+        for league_index in range(args.leagues):
+            league_id = ids(League)
+            writer.add(League, {
+                "id": league_id, "name": f"基准联赛{league_index + 1}",
+                "description": f"generate_benchmark_data.py seed={args.seed}",
+                "regular_season_name": "小组赛", "playoff_name": "季后赛", "is_active": True,
+            })
+
+            rosters = []
+            for team_index in range(args.teams):
+                team_id = ids(Team)
+                writer.add(Team, {
+                    "id": team_id, "name": f"基准联赛{league_index + 1}-球队{team_index + 1:02d}",
+                    "league_id": league_id,
+                })
+                roster = []
+                numbers = rng.sample(range(0, 100), args.players)
+                for order in range(args.players):
+                    player_id = ids(Player)
+                    writer.add(Player, {
+                        "id": player_id, "team_id": team_id, "name": random_name(rng),
+                        "number": numbers[order], "position": POSITIONS[order % 5], "display_order": order,
+                    })
+                    roster.append(player_id)
+                rosters.append((team_id, roster))
+
+            playoff_from = int(args.games * (1 - args.playoff_ratio))
+            for game_index in range(args.games):
+                home, away = rng.sample(rosters, 2)
+                game_id = ids(Game)
+                tipoff = season_start + timedelta(days=game_index * 180 // max(args.games, 1),
+                                                  minutes=rng.randrange(0, 4) * 90)
+                writer.add(Game, {
+                    "id": game_id, "league_id": league_id,
+                    "home_team_id": home[0], "away_team_id": away[0], "date": tipoff,
+                    "duration": QUARTERS * QUARTER_SECONDS // 60, "quarters": QUARTERS,
+                    "status": GameStatus.FINISHED,
+                    "season_type": SeasonType.PLAYOFF if game_index >= playoff_from else SeasonType.REGULAR,
+                })
+                simulator.simulate(game_id, tipoff, (home[1], away[1]), args.events)
+
+        writer.flush()
+        for index in bulk_indexes:
+            index.create(bind=conn)
+
+    elapsed = time.perf_counter() - started
+    for table, rows in writer.counts.items():
+        print(f"{table.__tablename__:>14}: {rows}")
+    print(f"✅ 生成完成，用时 {elapsed:.1f}s")
+
+    if not args.no_results:
+        from sqlalchemy.orm import sessionmaker
+        from app.services.standings import sync_league_results
+        session = sessionmaker(bind=engine)()
+        try:
+            league_ids = session.execute(
+                select(League.__table__.c.id).where(League.__table__.c.description.like("generate_benchmark_data.py%"))
+            ).scalars().all()
+            for league_id in league_ids:
+                sync_league_results(session, league_id)
+        finally:
+            session.close()
+        print("✅ 比赛结果（积分榜）已写入")
+
+    print(f"使用方法: DATABASE_URL={args.database_url} uvicorn app.main:app")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成大规模基准测试数据")
+    parser.add_argument("--leagues", type=int, default=1, help="联赛数量")
+    parser.add_argument("--teams", type=int, default=12, help="每个联赛的球队数量")
+    parser.add_argument("--players", type=int, default=12, help="每支球队的球员数量（至少6人）")
+    parser.add_argument("--games", type=int, default=200, help="每个联赛的比赛场数")
+    parser.add_argument("--events", type=int, default=300, help="每场比赛的统计事件数（不含换人）")
+    parser.add_argument("--playoff-ratio", type=float, default=0.1, help="季后赛比赛所占比例")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子（相同参数生成相同数据）")
+    parser.add_argument("--database-url", default=f"sqlite:///{DATABASE_DIR}/benchmark.db",
+                        help="目标数据库（默认 database/benchmark.db）")
+    parser.add_argument("--reset", action="store_true", help="先删除目标数据库中的所有表")
+    parser.add_argument("--no-results", action="store_true",
+                        help="不写入积分榜使用的比赛结果（读取积分榜时不会补齐，积分榜为空）")
+    parser.add_argument("--admin-password", default="admin123", help="目标数据库没有用户时创建的管理员密码")
+    args = parser.parse_args()
+
+    if args.teams < 2:
+        parser.error("--teams 至少为2")
+    if args.players < 6:
+        parser.error("--players 至少为6（5名首发 + 替补）")
+
+    generate(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from sqlalchemy.orm import Session
-from app.database.base import get_db, init_db
+from app.database.base import get_db, require_schema
 from app.models.team import Team
 from app.models.player import Player
 from app.models.game import Game, GameStatus
 from app.models.statistic import Statistic
 from app.models.game import GamePlayer
+from app.services.game_data import bump_stats_version
+from app.services.standings import record_game_result
 
 # 事件类型映射
 EVENT_MAPPING = {
@@ -101,7 +103,7 @@ def import_game_from_csv(csv_path: str):
     db = next(get_db())
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
+        with open(csv_path, 'r', encoding='utf-8-sig') as f:  # 兼容带BOM的导出文件
             reader = csv.DictReader(f)
             rows = list(reader)
         
@@ -262,6 +264,10 @@ def import_game_from_csv(csv_path: str):
             db.add(statistic)
             stats_count += 1
         
+        # 写入积分榜比分（读取积分榜时不会补齐），更新联赛数据版本号
+        db.flush()  # 会话不自动flush，先写入统计记录再汇总比分
+        record_game_result(db, game)
+        bump_stats_version(db, game.id)
         db.commit()
         print(f"导入 {stats_count} 条统计数据")
         print(f"比赛导入完成！比赛ID: {game.id}")
@@ -275,8 +281,8 @@ def import_game_from_csv(csv_path: str):
         db.close()
 
 if __name__ == '__main__':
-    # 初始化数据库
-    init_db()
+    # 检查数据库表（建表由 init_db.py 完成）
+    require_schema()
     
     # CSV文件路径
     csv_path = '../reference/auba-s2-mail_vs_auba-s2-小关_(2025-12-03_9:6)_play_by_play.csv'
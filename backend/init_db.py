@@ -1,9 +1,43 @@
-"""初始化数据库脚本"""
-from app.database import init_db
-from app.database.base import engine
+"""初始化数据库脚本：执行全部迁移，没有用户时创建默认联赛和管理员"""
+from app.database import init_db, SessionLocal
+from app.core.security import get_password_hash
+from app.models.league import League
+from app.models.user import User, UserRole
+
+
+def create_default_admin():
+    """没有任何用户时创建默认联赛和管理员（原 migrate_add_user_league.py）"""
+    db = SessionLocal()
+    try:
+        if db.query(User).count() > 0:
+            return
+        league = db.query(League).filter(League.name == "默认联赛").first()
+        if not league:
+            league = League(
+                name="默认联赛",
+                description="默认联赛",
+                regular_season_name="小组赛",
+                playoff_name="季后赛"
+            )
+            db.add(league)
+            db.flush()
+        db.add(User(
+            username="admin",
+            email="admin@example.com",
+            hashed_password=get_password_hash("admin123"),  # 默认密码，请修改！
+            role=UserRole.ADMIN,
+            league_id=league.id,
+            is_active=True
+        ))
+        db.commit()
+        print("✅ 已创建默认管理员用户 (username: admin, password: admin123)")
+        print("⚠️  请尽快修改默认管理员密码！")
+    finally:
+        db.close()
+
 
 if __name__ == "__main__":
     print("正在初始化数据库...")
     init_db()
+    create_default_admin()
     print("数据库初始化完成！")
-
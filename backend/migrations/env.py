@@ -0,0 +1,64 @@
+"""Alembic 迁移环境
+
+- 目标结构为 app.database.base.Base.metadata（自动生成迁移时比较）；
+- 数据库连接使用应用的 engine（支持 DATABASE_URL 环境变量），
+  也可以由调用方通过 config.attributes["connection"] 传入已有连接；
+- SQLite 使用 batch 模式：需要重建的表通过一条 INSERT ... SELECT 整表复制，
+  迁移期间关闭外键检查并加大页缓存。
+"""
+from logging.config import fileConfig
+from alembic import context
+import app.models  # noqa: F401  确保所有模型都已注册到Base.metadata
+from app.database.base import Base, engine
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """生成SQL脚本（alembic upgrade head --sql）"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_migrations(connection) -> None:
+    if connection.dialect.name == "sqlite":
+        # 重建表时旧表会被删除，需要关闭外键检查；加大缓存加快整表复制和建索引
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        connection.exec_driver_sql("PRAGMA cache_size=-200000")
+        connection.exec_driver_sql("PRAGMA temp_store=MEMORY")
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        # SQLite 按类型亲和性存储，VARCHAR 长度、Enum 与 VARCHAR、REAL 与 Float 的差异没有意义，
+        # 比较类型只会生成不必要的整表重建
+        compare_type=connection.dialect.name != "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+    with engine.connect() as connection:
+        _run_migrations(connection)
+        connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
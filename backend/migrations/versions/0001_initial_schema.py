@@ -0,0 +1,151 @@
+"""初始结构：联赛、用户、球队、球员、比赛、统计和出场时间
+
+已存在的表（早期由 create_all 建立的数据库）保持不变，
+缺少的列和索引由后续迁移补齐。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import has_table
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+USER_ROLES = ("PLAYER", "TEAM_ADMIN", "ADMIN")
+GAME_STATUSES = ("PENDING", "LIVE", "PAUSED", "FINISHED")
+SEASON_TYPES = ("regular", "playoff")
+
+
+def _id_column() -> sa.Column:
+    return sa.Column("id", sa.Integer(), primary_key=True)
+
+
+def _timestamps(updated: bool = True):
+    columns = [sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())]
+    if updated:
+        columns.append(sa.Column("updated_at", sa.DateTime(timezone=True)))
+    return columns
+
+
+def _create(table: str, *columns, indexes=()) -> None:
+    if has_table(table):
+        return
+    op.create_table(table, *columns)
+    for column, unique in indexes:
+        op.create_index(f"ix_{table}_{column}", table, [column], unique=unique)
+
+
+def upgrade() -> None:
+    _create(
+        "leagues",
+        _id_column(),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("description", sa.String(500)),
+        sa.Column("regular_season_name", sa.String(50), nullable=False),
+        sa.Column("playoff_name", sa.String(50), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        *_timestamps(),
+        indexes=[("id", False), ("name", False)],
+    )
+    _create(
+        "users",
+        _id_column(),
+        sa.Column("username", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(100)),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("role", sa.Enum(*USER_ROLES, name="userrole"), nullable=False),
+        sa.Column("league_id", sa.Integer(), sa.ForeignKey("leagues.id")),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        *_timestamps(),
+        indexes=[("id", False), ("username", True), ("email", True), ("league_id", False)],
+    )
+    _create(
+        "user_leagues",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("league_id", sa.Integer(), sa.ForeignKey("leagues.id"), primary_key=True),
+        *_timestamps(updated=False),
+    )
+    _create(
+        "teams",
+        _id_column(),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("logo", sa.String(255)),
+        sa.Column("league_id", sa.Integer(), sa.ForeignKey("leagues.id"), nullable=False),
+        sa.Column("team_admin_id", sa.Integer(), sa.ForeignKey("users.id")),
+        *_timestamps(),
+        indexes=[("id", False), ("name", False), ("league_id", False), ("team_admin_id", False)],
+    )
+    _create(
+        "players",
+        _id_column(),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=False),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.Column("avatar", sa.String(255)),
+        sa.Column("position", sa.String(20)),
+        sa.Column("display_order", sa.Integer(), nullable=False, server_default="0"),
+        *_timestamps(),
+        indexes=[("id", False), ("team_id", False)],
+    )
+    _create(
+        "games",
+        _id_column(),
+        sa.Column("league_id", sa.Integer(), sa.ForeignKey("leagues.id"), nullable=False),
+        sa.Column("home_team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=False),
+        sa.Column("away_team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=False),
+        sa.Column("date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duration", sa.Integer(), nullable=False),
+        sa.Column("quarters", sa.Integer(), nullable=False),
+        sa.Column("status", sa.Enum(*GAME_STATUSES, name="gamestatus"), nullable=False),
+        sa.Column("season_type", sa.Enum(*SEASON_TYPES, name="seasontype"), nullable=False),
+        *_timestamps(),
+        indexes=[("id", False), ("league_id", False), ("home_team_id", False),
+                 ("away_team_id", False), ("season_type", False)],
+    )
+    _create(
+        "game_players",
+        _id_column(),
+        sa.Column("game_id", sa.Integer(), sa.ForeignKey("games.id"), nullable=False),
+        sa.Column("player_id", sa.Integer(), sa.ForeignKey("players.id"), nullable=False),
+        sa.Column("is_starter", sa.Boolean(), nullable=False),
+        *_timestamps(updated=False),
+        indexes=[("id", False), ("game_id", False), ("player_id", False)],
+    )
+    _create(
+        "statistics",
+        _id_column(),
+        sa.Column("game_id", sa.Integer(), sa.ForeignKey("games.id"), nullable=False),
+        sa.Column("player_id", sa.Integer(), sa.ForeignKey("players.id"), nullable=False),
+        sa.Column("quarter", sa.Integer(), nullable=False),
+        sa.Column("action_type", sa.String(20), nullable=False),
+        sa.Column("shot_x", sa.Float()),
+        sa.Column("shot_y", sa.Float()),
+        sa.Column("assisted_by_player_id", sa.Integer(), sa.ForeignKey("players.id")),
+        sa.Column("rebounded_by_player_id", sa.Integer(), sa.ForeignKey("players.id")),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        *_timestamps(updated=False),
+        indexes=[("id", False), ("game_id", False), ("player_id", False)],
+    )
+    _create(
+        "player_times",
+        _id_column(),
+        sa.Column("game_id", sa.Integer(), sa.ForeignKey("games.id"), nullable=False),
+        sa.Column("player_id", sa.Integer(), sa.ForeignKey("players.id"), nullable=False),
+        sa.Column("quarter", sa.Integer(), nullable=False),
+        sa.Column("enter_time", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("exit_time", sa.DateTime(timezone=True)),
+        sa.Column("duration_seconds", sa.Float()),
+        *_timestamps(updated=False),
+        indexes=[("id", False), ("game_id", False), ("player_id", False)],
+    )
+
+
+def downgrade() -> None:
+    for table in ("player_times", "statistics", "game_players", "games", "players",
+                  "teams", "user_leagues", "users", "leagues"):
+        op.drop_table(table)
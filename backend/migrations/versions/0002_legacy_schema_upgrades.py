@@ -0,0 +1,127 @@
+"""合并早期的手动迁移脚本
+
+原 migrate_add_league_id.py、migrate_add_team_admin_id.py、migrate_update_user_roles.py、
+migrate_season_type_enum.py、migrate_add_user_league.py、migrate_add_user_leagues.py：
+- 补齐早期通过 ALTER TABLE 添加的列；
+- 没有联赛的球队和比赛归入“默认联赛”；
+- 角色和赛季类型统一为当前枚举的存储值；
+- 用户主联赛写入 user_leagues；
+- 补齐索引；teams/games 的 league_id 改为 NOT NULL 并添加外键，
+  players.display_order 改为 NOT NULL，statistics 补齐助攻/篮板球员外键
+  （SQLite batch 模式重建表，数据用一条 INSERT ... SELECT 复制，百万级统计记录只需数秒）。
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import (
+    add_column_if_missing, column_is_nullable, create_index_if_missing, has_foreign_key
+)
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+DEFAULT_LEAGUE_NAME = "默认联赛"
+
+
+def _add_missing_columns() -> None:
+    add_column_if_missing("teams", sa.Column("league_id", sa.Integer()))
+    add_column_if_missing("teams", sa.Column("team_admin_id", sa.Integer()))
+    add_column_if_missing("games", sa.Column("league_id", sa.Integer()))
+    add_column_if_missing("games", sa.Column("season_type", sa.String(20), server_default="regular"))
+    add_column_if_missing("users", sa.Column("role", sa.String(20), server_default="PLAYER"))
+    add_column_if_missing("players", sa.Column("display_order", sa.Integer(), server_default="0"))
+    add_column_if_missing("statistics", sa.Column("shot_x", sa.Float()))
+    add_column_if_missing("statistics", sa.Column("shot_y", sa.Float()))
+    add_column_if_missing("statistics", sa.Column("assisted_by_player_id", sa.Integer()))
+    add_column_if_missing("statistics", sa.Column("rebounded_by_player_id", sa.Integer()))
+
+
+def _assign_default_league(bind) -> None:
+    orphans = bind.execute(sa.text(
+        "SELECT (SELECT COUNT(*) FROM teams WHERE league_id IS NULL)"
+        " + (SELECT COUNT(*) FROM games WHERE league_id IS NULL)"
+    )).scalar()
+    if not orphans:
+        return
+    league_id = bind.execute(
+        sa.text("SELECT id FROM leagues WHERE name = :name ORDER BY id LIMIT 1"), {"name": DEFAULT_LEAGUE_NAME}
+    ).scalar()
+    if league_id is None:
+        bind.execute(sa.text(
+            "INSERT INTO leagues (name, description, regular_season_name, playoff_name, is_active)"
+            " VALUES (:name, :name, '小组赛', '季后赛', 1)"
+        ), {"name": DEFAULT_LEAGUE_NAME})
+        league_id = bind.execute(
+            sa.text("SELECT id FROM leagues WHERE name = :name ORDER BY id DESC LIMIT 1"), {"name": DEFAULT_LEAGUE_NAME}
+        ).scalar()
+    bind.execute(sa.text("UPDATE teams SET league_id = :id WHERE league_id IS NULL"), {"id": league_id})
+    bind.execute(sa.text("UPDATE games SET league_id = :id WHERE league_id IS NULL"), {"id": league_id})
+
+
+def _normalize_enums(bind) -> None:
+    # UserRole 按枚举名存储（PLAYER/TEAM_ADMIN/ADMIN）
+    bind.execute(sa.text("UPDATE users SET role = 'PLAYER' WHERE role IN ('user', 'USER', 'player')"))
+    bind.execute(sa.text("UPDATE users SET role = 'TEAM_ADMIN' WHERE role = 'team_admin'"))
+    bind.execute(sa.text("UPDATE users SET role = 'ADMIN' WHERE role = 'admin'"))
+    # SeasonType 按枚举值存储（regular/playoff）
+    bind.execute(sa.text("UPDATE games SET season_type = 'regular' WHERE season_type = 'REGULAR'"))
+    bind.execute(sa.text("UPDATE games SET season_type = 'playoff' WHERE season_type = 'PLAYOFF'"))
+    bind.execute(sa.text(
+        "UPDATE games SET season_type = 'regular'"
+        " WHERE season_type IS NULL OR season_type NOT IN ('regular', 'playoff')"
+    ))
+
+
+def _backfill_user_leagues(bind) -> None:
+    bind.execute(sa.text(
+        "INSERT INTO user_leagues (user_id, league_id)"
+        " SELECT u.id, u.league_id FROM users u"
+        " WHERE u.league_id IS NOT NULL AND NOT EXISTS ("
+        "   SELECT 1 FROM user_leagues ul WHERE ul.user_id = u.id AND ul.league_id = u.league_id"
+        " )"
+    ))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    _add_missing_columns()
+    _assign_default_league(bind)
+    _normalize_enums(bind)
+    _backfill_user_leagues(bind)
+
+    create_index_if_missing("ix_teams_league_id", "teams", ["league_id"])
+    create_index_if_missing("ix_teams_team_admin_id", "teams", ["team_admin_id"])
+    create_index_if_missing("ix_games_league_id", "games", ["league_id"])
+    create_index_if_missing("ix_games_season_type", "games", ["season_type"])
+
+    if column_is_nullable("teams", "league_id"):
+        with op.batch_alter_table("teams", recreate="always") as batch_op:
+            batch_op.alter_column("league_id", existing_type=sa.Integer(), nullable=False)
+            batch_op.create_foreign_key("fk_teams_league_id_leagues", "leagues", ["league_id"], ["id"])
+    if column_is_nullable("games", "league_id") or column_is_nullable("games", "season_type"):
+        with op.batch_alter_table("games", recreate="always") as batch_op:
+            batch_op.alter_column("league_id", existing_type=sa.Integer(), nullable=False)
+            batch_op.alter_column("season_type", existing_type=sa.String(20), nullable=False)
+            batch_op.create_foreign_key("fk_games_league_id_leagues", "leagues", ["league_id"], ["id"])
+    if column_is_nullable("players", "display_order"):
+        bind.execute(sa.text("UPDATE players SET display_order = 0 WHERE display_order IS NULL"))
+        with op.batch_alter_table("players", recreate="always") as batch_op:
+            batch_op.alter_column("display_order", existing_type=sa.Integer(), nullable=False)
+    missing_fks = [
+        column for column in ("assisted_by_player_id", "rebounded_by_player_id")
+        if not has_foreign_key("statistics", column)
+    ]
+    if missing_fks:
+        with op.batch_alter_table("statistics", recreate="always") as batch_op:
+            for column in missing_fks:
+                batch_op.create_foreign_key(f"fk_statistics_{column}_players", "players", [column], ["id"])
+
+
+def downgrade() -> None:
+    # 数据修正无法撤销；列和约束与 0001 的结构一致，保持不变
+    pass
@@ -0,0 +1,45 @@
+"""后台任务表（联赛批量导出）
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import has_table
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+JOB_STATUSES = ("PENDING", "RUNNING", "FINISHED", "FAILED")
+
+
+def upgrade() -> None:
+    if has_table("jobs"):
+        return
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_type", sa.String(50), nullable=False),
+        sa.Column("status", sa.Enum(*JOB_STATUSES, name="jobstatus"), nullable=False),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("league_id", sa.Integer(), sa.ForeignKey("leagues.id")),
+        sa.Column("season_type", sa.String(20)),
+        sa.Column("include_csv", sa.Boolean(), nullable=False),
+        sa.Column("include_pdf", sa.Boolean(), nullable=False),
+        sa.Column("progress_current", sa.Integer(), nullable=False),
+        sa.Column("progress_total", sa.Integer(), nullable=False),
+        sa.Column("result_path", sa.String(500)),
+        sa.Column("error", sa.String(1000)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+    )
+    for column in ("id", "job_type", "status", "created_by", "league_id"):
+        op.create_index(f"ix_jobs_{column}", "jobs", [column])
+
+
+def downgrade() -> None:
+    op.drop_table("jobs")
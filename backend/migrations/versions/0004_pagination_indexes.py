@@ -0,0 +1,34 @@
+"""游标分页使用的复合索引（原 migrate_add_pagination_indexes.py）
+
+- games: (date, id)、(league_id, date, id)
+- teams: (name, id)、(league_id, name, id)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+from app.database.migration_utils import create_index_if_missing, has_index
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_games_date_id", "games", ["date", "id"]),
+    ("ix_games_league_date_id", "games", ["league_id", "date", "id"]),
+    ("ix_teams_name_id", "teams", ["name", "id"]),
+    ("ix_teams_league_name_id", "teams", ["league_id", "name", "id"]),
+]
+
+
+def upgrade() -> None:
+    for index, table, columns in INDEXES:
+        create_index_if_missing(index, table, columns)
+
+
+def downgrade() -> None:
+    for index, table, _ in INDEXES:
+        if has_index(table, index):
+            op.drop_index(index, table_name=table)
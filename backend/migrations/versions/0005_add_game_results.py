@@ -0,0 +1,58 @@
+"""比赛结果表（积分榜使用的最终比分，原 migrate_add_game_results.py）
+
+已结束比赛的比分在数据库中用一条 INSERT ... SELECT 汇总写入，
+不需要逐场读取统计记录。
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import has_table
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+SEASON_TYPES = ("regular", "playoff")
+
+# 与 app.services.scoring.POINTS_BY_ACTION 一致
+POINTS = "CASE s.action_type WHEN '2PM' THEN 2 WHEN '3PM' THEN 3 WHEN 'FTM' THEN 1 ELSE 0 END"
+
+
+def upgrade() -> None:
+    if not has_table("game_results"):
+        op.create_table(
+            "game_results",
+            sa.Column("game_id", sa.Integer(), sa.ForeignKey("games.id"), primary_key=True),
+            sa.Column("league_id", sa.Integer(), sa.ForeignKey("leagues.id"), nullable=False),
+            sa.Column("season_type", sa.Enum(*SEASON_TYPES, name="seasontype"), nullable=False),
+            sa.Column("home_team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=False),
+            sa.Column("away_team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=False),
+            sa.Column("home_score", sa.Integer(), nullable=False),
+            sa.Column("away_score", sa.Integer(), nullable=False),
+            sa.Column("date", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_game_results_league_season", "game_results", ["league_id", "season_type"])
+
+    op.execute(
+        "INSERT INTO game_results"
+        " (game_id, league_id, season_type, home_team_id, away_team_id, home_score, away_score, date)"
+        " SELECT g.id, g.league_id, COALESCE(g.season_type, 'regular'), g.home_team_id, g.away_team_id,"
+        f"  COALESCE(SUM(CASE WHEN p.team_id = g.home_team_id THEN {POINTS} ELSE 0 END), 0),"
+        f"  COALESCE(SUM(CASE WHEN p.team_id = g.away_team_id THEN {POINTS} ELSE 0 END), 0),"
+        "  g.date"
+        " FROM games g"
+        " LEFT JOIN statistics s ON s.game_id = g.id AND s.action_type IN ('2PM', '3PM', 'FTM')"
+        " LEFT JOIN players p ON p.id = s.player_id"
+        " WHERE g.status = 'FINISHED'"
+        "  AND NOT EXISTS (SELECT 1 FROM game_results r WHERE r.game_id = g.id)"
+        " GROUP BY g.id, g.league_id, g.season_type, g.home_team_id, g.away_team_id, g.date"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("game_results")
@@ -0,0 +1,37 @@
+"""历史数据归档：比赛归档时间和归档比赛的技术统计汇总
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import add_column_if_missing, create_index_if_missing, has_index, has_table
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("games", sa.Column("archived_at", sa.DateTime(timezone=True)))
+    create_index_if_missing("ix_games_archived_at", "games", ["archived_at"])
+    if not has_table("box_scores"):
+        op.create_table(
+            "box_scores",
+            sa.Column("game_id", sa.Integer(), sa.ForeignKey("games.id"), primary_key=True),
+            sa.Column("player_id", sa.Integer(), sa.ForeignKey("players.id"), primary_key=True),
+            sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id")),
+            sa.Column("counts", sa.JSON(), nullable=False),
+            sa.Column("seconds", sa.Float(), nullable=False),
+        )
+        op.create_index("ix_box_scores_player_id", "box_scores", ["player_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("box_scores")
+    if has_index("games", "ix_games_archived_at"):
+        op.drop_index("ix_games_archived_at", table_name="games")
+    with op.batch_alter_table("games") as batch_op:
+        batch_op.drop_column("archived_at")
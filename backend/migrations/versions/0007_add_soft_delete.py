@@ -0,0 +1,36 @@
+"""软删除：比赛、球队和球员的删除时间
+
+索引是只包含已删除记录的部分索引（deleted_at IS NOT NULL）：清理任务和过滤条件的子查询
+用它查找已删除的记录；普通索引会被查询计划器用于 deleted_at IS NULL 的条件，导致联接顺序变差。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import add_column_if_missing, has_index
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+SOFT_DELETE_TABLES = ("games", "teams", "players")
+
+
+def upgrade() -> None:
+    for table in SOFT_DELETE_TABLES:
+        add_column_if_missing(table, sa.Column("deleted_at", sa.DateTime(timezone=True)))
+        if not has_index(table, f"ix_{table}_deleted_at"):
+            op.create_index(
+                f"ix_{table}_deleted_at", table, ["deleted_at"], sqlite_where=sa.text("deleted_at IS NOT NULL")
+            )
+
+
+def downgrade() -> None:
+    for table in SOFT_DELETE_TABLES:
+        if has_index(table, f"ix_{table}_deleted_at"):
+            op.drop_index(f"ix_{table}_deleted_at", table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("deleted_at")
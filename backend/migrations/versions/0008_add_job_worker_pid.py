@@ -0,0 +1,23 @@
+"""后台任务的执行进程ID（启动时只中断所属进程已退出的任务）
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import add_column_if_missing
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("jobs", sa.Column("worker_pid", sa.Integer()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch_op:
+        batch_op.drop_column("worker_pid")
@@ -0,0 +1,47 @@
+"""补齐比赛结果表（积分榜读取时不再补齐遗漏的比赛）
+
+之前读取积分榜时会写入缺少比分的已结束比赛并删除过期的比分，
+现在由比赛结束/重新开始/删除和导入脚本维护；这里一次性修正已有数据。
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# 与 app.services.scoring.POINTS_BY_ACTION 一致
+POINTS = "CASE s.action_type WHEN '2PM' THEN 2 WHEN '3PM' THEN 3 WHEN 'FTM' THEN 1 ELSE 0 END"
+
+
+def upgrade() -> None:
+    # 已删除、未结束或联赛已变化的比赛
+    op.execute(
+        "DELETE FROM game_results WHERE NOT EXISTS ("
+        " SELECT 1 FROM games g WHERE g.id = game_results.game_id AND g.status = 'FINISHED'"
+        "  AND g.deleted_at IS NULL AND g.league_id = game_results.league_id)"
+    )
+    op.execute(
+        "INSERT INTO game_results"
+        " (game_id, league_id, season_type, home_team_id, away_team_id, home_score, away_score, date)"
+        " SELECT g.id, g.league_id, COALESCE(g.season_type, 'regular'), g.home_team_id, g.away_team_id,"
+        f"  COALESCE(SUM(CASE WHEN p.team_id = g.home_team_id THEN {POINTS} ELSE 0 END), 0),"
+        f"  COALESCE(SUM(CASE WHEN p.team_id = g.away_team_id THEN {POINTS} ELSE 0 END), 0),"
+        "  g.date"
+        " FROM games g"
+        " LEFT JOIN statistics s ON s.game_id = g.id AND s.action_type IN ('2PM', '3PM', 'FTM')"
+        " LEFT JOIN players p ON p.id = s.player_id"
+        # 已归档比赛的统计记录在归档数据库中，无法在这里汇总（归档前已写入比分）
+        " WHERE g.status = 'FINISHED' AND g.deleted_at IS NULL AND g.archived_at IS NULL"
+        "  AND g.league_id IS NOT NULL"
+        "  AND NOT EXISTS (SELECT 1 FROM game_results r WHERE r.game_id = g.id)"
+        " GROUP BY g.id, g.league_id, g.season_type, g.home_team_id, g.away_team_id, g.date"
+    )
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,25 @@
+"""比赛的统计版本号（联赛数据版本号不再扫描统计记录）
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.database.migration_utils import add_column_if_missing
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_if_missing(
+        "games", sa.Column("stats_version", sa.Integer(), nullable=False, server_default="0")
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("games") as batch_op:
+        batch_op.drop_column("stats_version")
@@ -0,0 +1,43 @@
+"""清理已删除的比赛、球队和球员（服务运行期间由后台线程自动执行，PURGE_INTERVAL_SECONDS=0 时使用本脚本）
+
+用法：
+    python purge_deleted.py                 # 分批物理删除所有已删除的记录
+    python purge_deleted.py --status        # 只列出等待清理的数量
+    python purge_deleted.py --batch 5000    # 指定每批删除的行数
+
+每批单独一个事务，服务运行期间也可执行。
+"""
+import argparse
+import logging
+import time
+from app.database import SessionLocal, require_schema
+from app.services.purge import pending_deletions, purge_deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="清理已删除的记录")
+    parser.add_argument("--status", action="store_true", help="只列出等待清理的比赛、球队和球员数量")
+    parser.add_argument("--batch", type=int, help="每批删除的行数（默认 PURGE_BATCH_ROWS）")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    require_schema()
+    db = SessionLocal()
+    try:
+        pending = pending_deletions(db)
+    finally:
+        db.close()
+    print(f"等待清理: 比赛 {pending['games']} 场，球队 {pending['teams']} 支，球员 {pending['players']} 名")
+    if args.status or not any(pending.values()):
+        return
+
+    start = time.perf_counter()
+    print("🧹 正在清理...")
+    result = purge_deleted(batch_rows=args.batch)
+    for table, count in result.items():
+        print(f"   {table}: {count} 行")
+    print(f"✅ 完成，用时 {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from sqlalchemy.orm import Session
-from app.database.base import get_db, init_db
+from app.database.base import get_db, require_schema
 from app.models.game import Game
 from app.models.statistic import Statistic
 from app.models.player_time import PlayerTime
@@ -17,8 +17,8 @@ from app.models.user import User, UserRole
 from batch_import_games import import_game_from_csv
 
 def main():
-    # 初始化数据库
-    init_db()
+    # 检查数据库表（建表由 init_db.py 完成）
+    require_schema()
     
     # 获取数据库会话
     db = next(get_db())
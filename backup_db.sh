@@ -1,45 +1,26 @@
 #!/bin/bash
 # 数据库备份脚本
+# 使用 SQLite 备份API在线复制（服务运行、比赛录入期间也能得到一致的备份），
+# 备份目录、压缩和保留份数见 backend/app/core/config.py 中的 BACKUP_* 配置。
+# 参数原样传给 backend/backup_db.py，例如：
+#   ./backup_db.sh                       完整备份
+#   ./backup_db.sh --incremental --watch 10   每10秒归档WAL新增帧
+#   ./backup_db.sh --list                列出已有备份
 
-BACKUP_DIR="./backups"
-DB_FILE="backend/database/basketball.db"
-TIMESTAMP=$(date +%Y%m%d_%H%M%S)
-BACKUP_FILE="${BACKUP_DIR}/basketball_${TIMESTAMP}.db"
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+cd "${SCRIPT_DIR}/backend" || exit 1
 
-# 创建备份目录
-mkdir -p ${BACKUP_DIR}
-
-# 检查数据库文件是否存在
-if [ ! -f "${DB_FILE}" ]; then
-    echo "❌ 数据库文件不存在: ${DB_FILE}"
-    exit 1
+if [ -d "../venv" ]; then
+    source ../venv/bin/activate
 fi
 
-# 备份数据库
-echo "📦 正在备份数据库..."
-cp "${DB_FILE}" "${BACKUP_FILE}"
+python backup_db.py "$@"
+status=$?
 
-if [ $? -eq 0 ]; then
-    echo "✅ 备份成功: ${BACKUP_FILE}"
-    
-    # 显示备份文件大小
-    echo "📊 备份文件大小: $(du -h ${BACKUP_FILE} | cut -f1)"
-    
-    # 压缩备份（可选，取消注释以启用）
-    # gzip "${BACKUP_FILE}"
-    # echo "✅ 压缩完成: ${BACKUP_FILE}.gz"
-    
-    # 删除7天前的备份（可选，取消注释以启用）
-    # find ${BACKUP_DIR} -name "basketball_*.db" -mtime +7 -delete
-    # echo "🗑️  已删除7天前的备份"
-    
+if [ $status -eq 0 ] && [ $# -eq 0 ]; then
     echo ""
     echo "💡 提示："
-    echo "   - 备份文件位置: ${BACKUP_FILE}"
-    echo "   - 要上传到服务器，使用: scp ${BACKUP_FILE} user@server:/path/to/backend/database/basketball.db"
-else
-    echo "❌ 备份失败"
-    exit 1
+    echo "   - 恢复: cd backend && python backup_db.py --restore <备份文件> --to <新数据库文件>"
+    echo "   - 要上传到服务器，使用: scp backups/basketball_<时间>.db.gz user@server:/path/to/backups/"
 fi
-
-
+exit $status
@@ -118,8 +118,11 @@ function GameReport() {
         playersApi.getByTeam(gameData.away_team_id),
       ]);
 
-      // 加载统计数据
-      const statsResponse = await statisticsApi.getByGame(Number(gameId));
+      // 加载统计数据和得分时间线（累计比分由服务端计算）
+      const [statsResponse, timelineResponse] = await Promise.all([
+        statisticsApi.getByGame(Number(gameId)),
+        gamesApi.getTimeline(Number(gameId)),
+      ]);
       const allStats = statsResponse.data;
 
       // 计算主队统计
@@ -143,16 +146,12 @@ function GameReport() {
       setAwayStats(awayStatsData);
 
       // 计算比赛摘要
-      const homePlayerIds = homePlayersResponse.data.map((p: Player) => p.id);
-      const awayPlayerIds = awayPlayersResponse.data.map((p: Player) => p.id);
       const summary = calculateGameSummary(
         homeStatsData,
         awayStatsData,
         homePlayersResponse.data,
         awayPlayersResponse.data,
-        allStats,
-        homePlayerIds,
-        awayPlayerIds
+        timelineResponse.data.points
       );
       setGameSummary(summary);
 
@@ -402,9 +401,7 @@ function GameReport() {
     awayStats: TeamStats,
     homePlayers: Player[],
     awayPlayers: Player[],
-    allStats: Statistic[],
-    homePlayerIds: number[],
-    _awayPlayerIds: number[]
+    timelinePoints: number[][]
   ): GameSummary => {
     // 计算球队领袖
     const homeLeaders = {
@@ -427,44 +424,12 @@ function GameReport() {
       }, { player: awayPlayers[0] || { id: 0, name: '', number: 0, team_id: 0 } as Player, value: 0 }),
     };
 
-    // 计算累积得分曲线（按时间顺序）
-    const scoreProgression: ScorePoint[] = [];
-    let homeCumulativeScore = 0;
-    let awayCumulativeScore = 0;
-    let playIndex = 0;
-
-    // 按时间戳排序统计数据
-    const sortedStats = [...allStats].sort((a, b) => {
-      const timeA = new Date(a.timestamp).getTime();
-      const timeB = new Date(b.timestamp).getTime();
-      return timeA - timeB;
-    });
-
-    // 初始点
-    scoreProgression.push({ x: 0, homeScore: 0, awayScore: 0 });
-
-    sortedStats.forEach((stat) => {
-      const isHomePlayer = homePlayerIds.includes(stat.player_id);
-      let points = 0;
-      
-      if (stat.action_type === '2PM') points = 2;
-      else if (stat.action_type === '3PM') points = 3;
-      else if (stat.action_type === 'FTM') points = 1;
-
-      if (points > 0) {
-        if (isHomePlayer) {
-          homeCumulativeScore += points;
-        } else {
-          awayCumulativeScore += points;
-        }
-        playIndex++;
-        scoreProgression.push({
-          x: playIndex,
-          homeScore: homeCumulativeScore,
-          awayScore: awayCumulativeScore,
-        });
-      }
-    });
+    // 累积得分曲线：服务端时间线每项为 [elapsed, quarter, home, away, lead]
+    const scoreProgression: ScorePoint[] = timelinePoints.map(([elapsed, , home, away]) => ({
+      x: elapsed,
+      homeScore: home,
+      awayScore: away,
+    }));
 
     return {
       homeQuarterPoints: homeStats.quarterPoints,
@@ -1,7 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { statisticsApi, playersApi } from '../utils/api';
-import { Statistic } from '../types';
+import { playersApi } from '../utils/api';
 import Court from '../components/Court';
 
 interface ShotData {
@@ -15,7 +14,7 @@ function PlayerStatistics() {
   const { playerId } = useParams<{ playerId: string }>();
   const navigate = useNavigate();
   const [player, setPlayer] = useState<any>(null);
-  const [statistics, setStatistics] = useState<Statistic[]>([]);
+  const [profile, setProfile] = useState<any>(null);
   const [loading, setLoading] = useState(true);
   const [seasonType, setSeasonType] = useState<'all' | 'regular' | 'playoff'>('all');
   const [shots, setShots] = useState<ShotData[]>([]);
@@ -42,26 +41,17 @@ function PlayerStatistics() {
     try {
       setLoading(true);
       const seasonTypeParam = seasonType === 'all' ? undefined : seasonType;
-      const response = await statisticsApi.getPlayerAllStatistics(Number(playerId), seasonTypeParam);
-      const stats: Statistic[] = response.data;
-      setStatistics(stats);
-
-      // 提取投篮点位
-      const shotData: ShotData[] = [];
-      stats.forEach((stat) => {
-        if (stat.shot_x !== null && stat.shot_x !== undefined && 
-            stat.shot_y !== null && stat.shot_y !== undefined) {
-          const action = stat.action_type;
-          if (action === '2PM' || action === '2PA' || action === '3PM' || action === '3PA') {
-            shotData.push({
-              x: stat.shot_x,
-              y: stat.shot_y,
-              made: action === '2PM' || action === '3PM',
-              type: (action === '2PM' || action === '2PA') ? '2P' : '3P'
-            });
-          }
-        }
-      });
+      // 赛季档案由后端汇总，投篮点位以 [x, y, 是否命中, 是否三分] 返回
+      const response = await playersApi.getProfile(Number(playerId), seasonTypeParam, true);
+      setProfile(response.data);
+      const shotData: ShotData[] = (response.data.shots || []).map(
+        ([x, y, made, isThree]: [number, number, boolean, boolean]) => ({
+          x,
+          y,
+          made,
+          type: (isThree ? '3P' : '2P') as ShotData['type'],
+        })
+      );
       setShots(shotData);
     } catch (error) {
       console.error('加载统计数据失败:', error);
@@ -70,45 +60,31 @@ function PlayerStatistics() {
     }
   };
 
-  // 计算统计数据
-  const calculateStats = () => {
-    const stats = {
-      '2PM': 0, '2PA': 0, '3PM': 0, '3PA': 0,
-      'FTM': 0, 'FTA': 0, 'OREB': 0, 'DREB': 0,
-      'AST': 0, 'STL': 0, 'BLK': 0, 'TOV': 0, 'PF': 0, 'PFD': 0
-    };
-
-    statistics.forEach((stat) => {
-      const action = stat.action_type;
-      if (action in stats) {
-        stats[action as keyof typeof stats]++;
-      }
-    });
-
-    const fgMade = stats['2PM'] + stats['3PM'];
-    const fgAttempted = stats['2PA'] + stats['3PA'];
-    const fgPercentage = fgAttempted > 0 ? ((fgMade / fgAttempted) * 100).toFixed(1) : '0.0';
-    const twoPointPercentage = stats['2PA'] > 0 ? ((stats['2PM'] / stats['2PA']) * 100).toFixed(1) : '0.0';
-    const threePointPercentage = stats['3PA'] > 0 ? ((stats['3PM'] / stats['3PA']) * 100).toFixed(1) : '0.0';
-    const ftPercentage = stats['FTA'] > 0 ? ((stats['FTM'] / stats['FTA']) * 100).toFixed(1) : '0.0';
-    const points = stats['2PM'] * 2 + stats['3PM'] * 3 + stats['FTM'];
-    const rebounds = stats['OREB'] + stats['DREB'];
-
-    return {
-      ...stats,
-      fgMade,
-      fgAttempted,
-      fgPercentage,
-      twoPointPercentage,
-      threePointPercentage,
-      ftPercentage,
-      points,
-      rebounds
-    };
+  // 赛季总计（后端已按 出手 = 命中 + 未命中 计算）
+  const totals = profile?.totals;
+  const shooting = profile?.shooting;
+  const stats = {
+    points: totals?.points ?? 0,
+    rebounds: totals?.reb ?? 0,
+    AST: totals?.ast ?? 0,
+    STL: totals?.stl ?? 0,
+    BLK: totals?.blk ?? 0,
+    TOV: totals?.tov ?? 0,
+    PF: totals?.pf ?? 0,
+    fgMade: totals?.fgm ?? 0,
+    fgAttempted: totals?.fga ?? 0,
+    fgPercentage: (shooting?.fg_pct ?? 0).toFixed(1),
+    twoPointPercentage: (shooting?.fg2_pct ?? 0).toFixed(1),
+    threePointPercentage: (shooting?.fg3_pct ?? 0).toFixed(1),
+    ftPercentage: (shooting?.ft_pct ?? 0).toFixed(1),
+    '2PM': totals?.fg2m ?? 0,
+    '2PA': totals?.fg2a ?? 0,
+    '3PM': totals?.fg3m ?? 0,
+    '3PA': totals?.fg3a ?? 0,
+    FTM: totals?.ftm ?? 0,
+    FTA: totals?.fta ?? 0,
   };
 
-  const stats = calculateStats();
-
   if (loading) {
     return (
       <div className="min-h-screen bg-gray-50 flex items-center justify-center">
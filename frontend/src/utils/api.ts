@@ -49,7 +49,7 @@ api.interceptors.response.use(
 
 // Teams API
 export const teamsApi = {
-  getAll: () => api.get('/teams/'),
+  getAll: (params?: { limit?: number; cursor?: string }) => api.get('/teams/', { params }),
   getById: (id: number) => api.get(`/teams/${id}`),
   create: (data: { name: string; logo?: string; league_id?: number; team_admin_id?: number | null }) => api.post('/teams/', data),
   update: (id: number, data: { name: string; logo?: string; league_id?: number; team_admin_id?: number | null }) => api.put(`/teams/${id}`, data),
@@ -70,6 +70,15 @@ export const teamsApi = {
 export const playersApi = {
   getByTeam: (teamId: number) => api.get(`/players/team/${teamId}`),
   getById: (id: number) => api.get(`/players/${id}`),
+  getProfile: (id: number, seasonType?: 'regular' | 'playoff', includeShots: boolean = false) => {
+    const params: any = { include_shots: includeShots };
+    if (seasonType) params.season_type = seasonType;
+    return api.get(`/players/${id}/profile`, { params });
+  },
+  getOpponentSplits: (id: number, seasonType?: 'regular' | 'playoff') => {
+    const params = seasonType ? { season_type: seasonType } : {};
+    return api.get(`/players/${id}/opponents`, { params });
+  },
   create: (data: {
     team_id: number;
     name: string;
@@ -93,8 +102,8 @@ export const playersApi = {
 
 // Games API
 export const gamesApi = {
-  getAll: (seasonType?: 'regular' | 'playoff') => {
-    const params = seasonType ? { season_type: seasonType } : {};
+  getAll: (seasonType?: 'regular' | 'playoff', page?: { limit?: number; cursor?: string }) => {
+    const params = { ...(seasonType ? { season_type: seasonType } : {}), ...page };
     return api.get('/games/', { params });
   },
   getById: (id: number) => api.get(`/games/${id}`),
@@ -114,6 +123,11 @@ export const gamesApi = {
   delete: (id: number) => api.delete(`/games/${id}`),
   batchDelete: (gameIds: number[]) => api.post('/games/batch-delete', gameIds),
   getStatistics: (id: number) => api.get(`/games/${id}/statistics`),
+  // 服务端生成的矢量PDF报告
+  getTimeline: (id: number) => api.get(`/games/${id}/timeline`),
+  getReportPdf: (id: number) => api.get(`/games/${id}/report.pdf`, { responseType: 'blob' }),
+  getPlayByPlayCsv: (id: number, excel?: boolean) =>
+    api.get(`/games/${id}/play-by-play.csv`, { params: excel ? { excel: true } : {}, responseType: 'blob' }),
 };
 
 // Statistics API
@@ -135,12 +149,38 @@ export const statisticsApi = {
     const params = seasonType ? { season_type: seasonType } : {};
     return api.get(`/statistics/league/${leagueId}`, { params });
   },
+  getGameQuarterSplits: (gameId: number) => api.get(`/statistics/game/${gameId}/quarters`),
+  getLeagueQuarterSplits: (leagueId: number, seasonType?: 'regular' | 'playoff') => {
+    const params = seasonType ? { season_type: seasonType } : {};
+    return api.get(`/statistics/league/${leagueId}/quarters`, { params });
+  },
+  getLeagueHeadToHead: (leagueId: number, seasonType?: 'regular' | 'playoff') => {
+    const params = seasonType ? { season_type: seasonType } : {};
+    return api.get(`/statistics/league/${leagueId}/head-to-head`, { params });
+  },
+  getHeadToHead: (teamAId: number, teamBId: number, seasonType?: 'regular' | 'playoff') => {
+    const params = seasonType ? { season_type: seasonType } : {};
+    return api.get(`/statistics/head-to-head/${teamAId}/${teamBId}`, { params });
+  },
   getPlayerAllStatistics: (playerId: number, seasonType?: 'regular' | 'playoff') => {
     const params = seasonType ? { season_type: seasonType } : {};
     return api.get(`/statistics/player/${playerId}`, { params });
   },
 };
 
+// Jobs API（后台批量导出）
+export const jobsApi = {
+  createLeagueExport: (data: {
+    league_id: number;
+    season_type?: 'regular' | 'playoff';
+    include_csv?: boolean;
+    include_pdf?: boolean;
+  }) => api.post('/jobs/league-export', data),
+  getAll: () => api.get('/jobs/'),
+  getById: (id: number) => api.get(`/jobs/${id}`),
+  download: (id: number) => api.get(`/jobs/${id}/download`, { responseType: 'blob' }),
+};
+
 // Player Time API
 export const playerTimeApi = {
   enter: (gameId: number, playerId: number, quarter: number) =>
@@ -243,5 +283,15 @@ export const leaguesApi = {
     is_active?: boolean;
   }) => api.put(`/leagues/${id}`, data),
   delete: (id: number) => api.delete(`/leagues/${id}`),
+  getStandings: (id: number, seasonType?: 'regular' | 'playoff') => {
+    const params = seasonType ? { season_type: seasonType } : {};
+    return api.get(`/leagues/${id}/standings`, { params });
+  },
+  getPlayByPlayCsv: (id: number, seasonType?: 'regular' | 'playoff', excel?: boolean) => {
+    const params: any = {};
+    if (seasonType) params.season_type = seasonType;
+    if (excel) params.excel = true;
+    return api.get(`/leagues/${id}/play-by-play.csv`, { params, responseType: 'blob' });
+  },
 };
 